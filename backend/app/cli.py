@@ -0,0 +1,49 @@
+"""Maintenance commands for the mindfulness database.
+
+Usage (from the backend directory):
+    python -m app.cli migrate
+    python -m app.cli rebuild-rollups
+"""
+
+import argparse
+
+from sqlmodel import Session
+
+from . import migrations
+from .database import engine, init_db
+from .services import rollup
+
+
+def migrate() -> None:
+    """Apply pending schema migrations."""
+    applied = migrations.run(engine)
+    for name in applied:
+        print(f"Applied {name}")
+    print(f"Schema at version {migrations.LATEST_VERSION}")
+
+
+def rebuild_rollups() -> None:
+    """Recompute the daily rollup table from the raw session history."""
+    init_db()
+    with Session(engine) as db:
+        days = rollup.rebuild(db)
+        db.commit()
+    print(f"Rebuilt daily rollups for {days} days")
+
+
+COMMANDS = {
+    "migrate": migrate,
+    "rebuild-rollups": rebuild_rollups,
+}
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Parse arguments and run the selected command."""
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args(argv)
+    COMMANDS[args.command]()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,134 @@
+import os
+import re
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Any
 
 from fastapi import Depends
-from sqlmodel import Session, SQLModel, create_engine
+from sqlalchemy import Engine, event, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import Session, create_engine
 
-# Import models so SQLModel registers them
-from .models import session as _session_model  # noqa: F401
-from .models import goal as _goal_model  # noqa: F401
-from .models import tag as _tag_model  # noqa: F401
-from .models import generated_music as _music_model  # noqa: F401
-from .models import settings as _settings_model  # noqa: F401
+# Importing migrations registers every model with SQLModel
+from . import migrations
+from .config import CONFIG_PATH, get_config
 
-# Database path relative to this file's location
-_DB_DIR = Path(__file__).parent.parent / "data"
-_DB_DIR.mkdir(exist_ok=True)
-DATABASE_URL = f"sqlite:///{_DB_DIR}/mindfulness.db"
-engine = create_engine(DATABASE_URL, echo=False)
+# Relative SQLite paths in config.yaml are relative to the project root
+PROJECT_ROOT = CONFIG_PATH.parent.parent
+DEFAULT_DATABASE_URL = "sqlite:///./backend/data/mindfulness.db"
+
+
+def resolve_database_url(url: str) -> str:
+    """Anchor a relative SQLite path to the project root, creating its directory."""
+    parsed = make_url(url)
+    if not parsed.drivername.startswith("sqlite"):
+        return url
+    if not parsed.database or parsed.database == ":memory:":
+        return url
+
+    path = Path(parsed.database)
+    if not path.is_absolute():
+        path = (PROJECT_ROOT / path).resolve()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return parsed.set(database=str(path)).render_as_string(hide_password=False)
+
+
+def database_url() -> str:
+    """Database URL from MINDFULNESS_DATABASE_URL or config.yaml."""
+    url = os.environ.get("MINDFULNESS_DATABASE_URL") or get_config().get(
+        "database", {}
+    ).get("url", DEFAULT_DATABASE_URL)
+    return resolve_database_url(url)
+
+
+# Applied in this order on every new connection; busy_timeout goes first so
+# switching journal_mode waits for other connections instead of failing.
+SQLITE_PRAGMAS = (
+    "busy_timeout",
+    "journal_mode",
+    "synchronous",
+    "mmap_size",
+    "cache_size",
+    "temp_store",
+)
+SQLITE_POOL_OPTIONS = ("pool_size", "max_overflow", "pool_timeout", "pool_recycle")
+_PRAGMA_VALUE = re.compile(r"^-?[A-Za-z0-9_]+$")
+
+
+def _pragma_statements(settings: dict[str, Any]) -> list[str]:
+    """Build PRAGMA statements for the configured SQLite settings."""
+    statements = []
+    for name in SQLITE_PRAGMAS:
+        if settings.get(name) is None:
+            continue
+        value = str(settings[name])
+        if not _PRAGMA_VALUE.match(value):
+            raise ValueError(f"Invalid value for PRAGMA {name}: {value!r}")
+        statements.append(f"PRAGMA {name} = {value}")
+    return statements
+
+
+def _install_pragmas(sync_engine: Engine, settings: dict[str, Any]) -> None:
+    """Run the tuning PRAGMAs on every new DBAPI connection of an engine."""
+    statements = _pragma_statements(settings)
+
+    @event.listens_for(sync_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
+
+
+def _install_transaction_control(sync_engine: Engine) -> None:
+    """Let SQLAlchemy, not pysqlite, emit BEGIN so SAVEPOINTs nest correctly."""
+
+    @event.listens_for(sync_engine, "connect")
+    def _disable_driver_transactions(dbapi_connection, connection_record) -> None:
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(sync_engine, "begin")
+    def _begin(conn) -> None:
+        conn.exec_driver_sql("BEGIN")
+
+
+def _pool_options(settings: dict[str, Any]) -> dict[str, Any]:
+    return {key: settings[key] for key in SQLITE_POOL_OPTIONS if key in settings}
+
+
+def create_sqlite_engine(url: str, settings: dict[str, Any] | None = None) -> Engine:
+    """Create an engine that applies the SQLite tuning profile to each connection."""
+    settings = settings or {}
+    new_engine = create_engine(url, echo=False, **_pool_options(settings))
+    _install_transaction_control(new_engine)
+    _install_pragmas(new_engine, settings)
+    return new_engine
+
+
+def create_async_sqlite_engine(
+    url: str, settings: dict[str, Any] | None = None
+) -> AsyncEngine:
+    """Async (aiosqlite) counterpart of create_sqlite_engine for the same file."""
+    settings = settings or {}
+    async_url = make_url(url).set(drivername="sqlite+aiosqlite")
+    new_engine = create_async_engine(async_url, echo=False, **_pool_options(settings))
+    _install_transaction_control(new_engine.sync_engine)
+    _install_pragmas(new_engine.sync_engine, settings)
+    return new_engine
+
+
+# The engines (and connection pools) shared by routes, background jobs and the
+# CLI. Routes and the write coordinator use `engine`; scheduler jobs, the webhook
+# outbox and music workers read on the event loop through `async_engine`, whose
+# I/O runs on aiosqlite's own thread.
+_url = database_url()
+_sqlite_settings = get_config().get("database", {}).get("sqlite", {})
+engine = create_sqlite_engine(_url, _sqlite_settings)
+async_engine = create_async_sqlite_engine(_url, _sqlite_settings)
 
 
 def init_db() -> None:
-    """Initialize database by creating all tables."""
-    SQLModel.metadata.create_all(engine)
+    """Bring the database schema up to date."""
+    migrations.run(engine)
 
 
 def get_session():
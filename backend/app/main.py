@@ -15,17 +15,41 @@ from .routes import (
     discord,
     music,
     reminders,
+    dashboard,
+    metrics,
+    imports,
+    sync,
+    changes,
 )
+from .services import notifications  # noqa: F401  (registers event subscribers)
+from .services import outbox
+from .services.cache import ReadCacheMiddleware
+from .services.events import bus
+from .services.export_jobs import export_jobs
+from .services.music_jobs import music_jobs
+from .services.outbound import outbound
 from .services.scheduler import init_scheduler, shutdown_scheduler
+from .services.writer import writer
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize database and scheduler on startup."""
     init_db()
+    writer.start()
+    export_jobs.start()
+    await outbound.start()
+    outbox.dispatcher.start()
+    await music_jobs.start()
     init_scheduler()
     yield
     shutdown_scheduler()
+    await music_jobs.stop()
+    await bus.drain()
+    await outbox.dispatcher.stop()
+    await outbound.aclose()
+    export_jobs.shutdown()
+    writer.stop()
 
 
 app = FastAPI(title="Mindfulness API", lifespan=lifespan)
@@ -33,12 +57,15 @@ app = FastAPI(title="Mindfulness API", lifespan=lifespan)
 config = get_config()
 origins = config.get("server", {}).get("cors_origins", ["http://localhost:5173"])
 
+# Added before CORS so 304s from the cache still get CORS headers
+app.add_middleware(ReadCacheMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Total-Estimate"],
 )
 
 app.include_router(sessions.router)
@@ -50,6 +77,11 @@ app.include_router(export.router)
 app.include_router(discord.router)
 app.include_router(music.router)
 app.include_router(reminders.router)
+app.include_router(dashboard.router)
+app.include_router(metrics.router)
+app.include_router(imports.router)
+app.include_router(sync.router)
+app.include_router(changes.router)
 
 
 @app.get("/api/health")
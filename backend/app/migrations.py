@@ -0,0 +1,247 @@
+"""Versioned schema migrations for the SQLite database.
+
+The applied version is stored in ``PRAGMA user_version``. ``run`` compares it
+with the newest migration and returns immediately when the schema is current,
+so startup on an up-to-date database costs a single pragma read.
+
+New tables, columns and indexes must be added here as a new migration at
+the end of ``MIGRATIONS``; never edit a migration that has already shipped.
+"""
+
+import logging
+from typing import Callable, NamedTuple
+
+from sqlalchemy import Connection, Engine, text
+from sqlmodel import Session, SQLModel
+
+# Import models so SQLModel registers them
+from .models import session as _session_model  # noqa: F401
+from .models import goal as _goal_model  # noqa: F401
+from .models import tag as _tag_model  # noqa: F401
+from .models import generated_music as _music_model  # noqa: F401
+from .models import settings as _settings_model  # noqa: F401
+from .models import rollup as _rollup_model  # noqa: F401
+from .models import streak as _streak_model  # noqa: F401
+from .models import sync as _sync_model  # noqa: F401
+from .models import change as _change_model  # noqa: F401
+from .models import outbox as _outbox_model  # noqa: F401
+from .services import rollup
+
+logger = logging.getLogger(__name__)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+
+
+def _create_tables(conn: Connection) -> None:
+    """Create any table that doesn't exist yet."""
+    SQLModel.metadata.create_all(conn)
+
+
+def _hot_path_indexes(conn: Connection) -> None:
+    """Indexes for stats range scans, history paging, tag and library lookups."""
+    statements = [
+        # Covers completed + started_at range aggregates without touching rows
+        "CREATE INDEX IF NOT EXISTS ix_session_completed_started_at "
+        "ON session (completed, started_at, actual_duration_seconds, mood_after)",
+        # Keyset pagination order for the history listing
+        "CREATE INDEX IF NOT EXISTS ix_session_started_at_id "
+        "ON session (started_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_sessiontag_tag_id "
+        "ON sessiontag (tag_id, session_id)",
+        "CREATE INDEX IF NOT EXISTS ix_generatedmusic_status_created_at "
+        "ON generatedmusic (status, created_at)",
+    ]
+    for statement in statements:
+        conn.execute(text(statement))
+
+
+def _backfill_rollups(conn: Connection) -> None:
+    """Build daily rollups and streak state from existing sessions."""
+    with Session(bind=conn) as db:
+        rollup.rebuild(db)
+        db.flush()
+
+
+def _session_dedupe_index(conn: Connection) -> None:
+    """Unique (started_at, planned_duration_seconds) so imports can skip repeats."""
+    duplicates = (
+        "SELECT id FROM session AS s WHERE EXISTS ("
+        "SELECT 1 FROM session AS o WHERE o.started_at = s.started_at "
+        "AND o.planned_duration_seconds = s.planned_duration_seconds "
+        "AND o.id < s.id)"
+    )
+    # Keep the oldest copy of any session recorded twice
+    conn.execute(text(f"DELETE FROM sessiontag WHERE session_id IN ({duplicates})"))
+    removed = conn.execute(text(f"DELETE FROM session WHERE id IN ({duplicates})"))
+    if removed.rowcount:
+        logger.info(f"Removed {removed.rowcount} duplicate sessions")
+        _backfill_rollups(conn)
+
+    conn.execute(
+        text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_session_started_at_planned "
+            "ON session (started_at, planned_duration_seconds)"
+        )
+    )
+
+
+def _sync_receipts(conn: Connection) -> None:
+    """Dedupe table for idempotent sync operations."""
+    _sync_model.SyncReceipt.__table__.create(conn, checkfirst=True)
+    # Later operations refer to sessions created offline by their client id
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_sync_receipt_client_id "
+            "ON sync_receipt (client_id)"
+        )
+    )
+
+
+# Synced table -> (feed entity, key expression over the NEW/OLD row)
+_CHANGE_TRACKED = {
+    "session": ("session", "{row}.id"),
+    "tag": ("tag", "{row}.id"),
+    "goal": ("goal", "{row}.id"),
+    "sessiontag": ("session_tag", "{row}.session_id || ':' || {row}.tag_id"),
+}
+
+
+def _change_triggers(conn: Connection) -> None:
+    """(Re)create the triggers that stamp writes into ``change_log``.
+
+    Triggers also catch Core bulk statements (imports, tag replacement) that
+    ORM events never see. Each deletes the entry for its row and inserts a
+    fresh one rather than using INSERT OR REPLACE: SQLite applies an outer
+    statement's conflict policy to trigger bodies, so under the importer's
+    INSERT OR IGNORE a replace would silently keep a stale tombstone.
+    """
+    for table, (entity, key) in _CHANGE_TRACKED.items():
+        for event, row, deleted in (
+            ("INSERT", "NEW", 0),
+            ("UPDATE", "NEW", 0),
+            ("DELETE", "OLD", 1),
+        ):
+            name = f"trg_{table}_{event.lower()}_change"
+            row_key = key.format(row=row)
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+            conn.execute(
+                text(
+                    f"CREATE TRIGGER {name} AFTER {event} ON {table} BEGIN "
+                    "DELETE FROM change_log "
+                    f"WHERE entity = '{entity}' AND key = {row_key}; "
+                    "INSERT INTO change_log (entity, key, deleted) "
+                    f"VALUES ('{entity}', {row_key}, {deleted}); END"
+                )
+            )
+
+
+def _change_log(conn: Connection) -> None:
+    """Change log stamped by triggers on every write to synced tables."""
+    _change_model.ChangeLog.__table__.create(conn, checkfirst=True)
+
+    # Links left behind by sessions deleted before deletes cleaned them up
+    conn.execute(
+        text(
+            "DELETE FROM sessiontag WHERE session_id NOT IN (SELECT id FROM session) "
+            "OR tag_id NOT IN (SELECT id FROM tag)"
+        )
+    )
+
+    _change_triggers(conn)
+    for table, (entity, key) in _CHANGE_TRACKED.items():
+        # Existing rows appear in the feed from sequence 0
+        conn.execute(
+            text(
+                "INSERT OR IGNORE INTO change_log (entity, key, deleted) "
+                f"SELECT '{entity}', {key.format(row=table)}, 0 FROM {table}"
+            )
+        )
+
+
+def _webhook_outbox(conn: Connection) -> None:
+    """Durable queue of webhook messages, scanned by due time."""
+    _outbox_model.WebhookMessage.__table__.create(conn, checkfirst=True)
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_webhook_outbox_status_next_attempt_at "
+            "ON webhook_outbox (status, next_attempt_at)"
+        )
+    )
+
+
+def _music_job_errors(conn: Connection) -> None:
+    """Failure reason of background music generation jobs."""
+    columns = {
+        row[1] for row in conn.execute(text("PRAGMA table_info(generatedmusic)"))
+    }
+    if "error" not in columns:
+        conn.execute(text("ALTER TABLE generatedmusic ADD COLUMN error VARCHAR"))
+
+
+def _music_request_keys(conn: Connection) -> None:
+    """Lookup key so repeated generation requests reuse an existing track."""
+    columns = {
+        row[1] for row in conn.execute(text("PRAGMA table_info(generatedmusic)"))
+    }
+    if "request_key" not in columns:
+        conn.execute(text("ALTER TABLE generatedmusic ADD COLUMN request_key VARCHAR"))
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_generatedmusic_request_key "
+            "ON generatedmusic (request_key)"
+        )
+    )
+
+
+def _change_log_triggers(conn: Connection) -> None:
+    """Change log triggers that hold up under INSERT OR IGNORE statements."""
+    _change_triggers(conn)
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "create_tables", _create_tables),
+    Migration(2, "hot_path_indexes", _hot_path_indexes),
+    Migration(3, "backfill_rollups", _backfill_rollups),
+    Migration(4, "session_dedupe_index", _session_dedupe_index),
+    Migration(5, "sync_receipts", _sync_receipts),
+    Migration(6, "change_log", _change_log),
+    Migration(7, "webhook_outbox", _webhook_outbox),
+    Migration(8, "music_job_errors", _music_job_errors),
+    Migration(9, "music_request_keys", _music_request_keys),
+    Migration(10, "change_log_triggers", _change_log_triggers),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(conn: Connection) -> int:
+    """Return the schema version recorded in the database."""
+    return conn.execute(text("PRAGMA user_version")).scalar_one()
+
+
+def run(engine: Engine) -> list[str]:
+    """Apply pending migrations in order; returns the names that ran."""
+    with engine.connect() as conn:
+        if current_version(conn) >= LATEST_VERSION:
+            return []
+
+    applied = []
+    for migration in MIGRATIONS:
+        # Each step and its version bump commit together
+        with engine.begin() as conn:
+            if current_version(conn) >= migration.version:
+                continue
+            logger.info(f"Applying migration {migration.version}: {migration.name}")
+            migration.apply(conn)
+            conn.execute(text(f"PRAGMA user_version = {migration.version}"))
+        applied.append(migration.name)
+
+    if applied:
+        # Refresh planner statistics so the new indexes are used
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+    return applied
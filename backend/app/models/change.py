@@ -0,0 +1,47 @@
+"""Change log models for the delta sync feed."""
+
+from typing import List, Literal, Optional
+
+from sqlalchemy import UniqueConstraint
+from sqlmodel import Field, SQLModel
+
+
+class ChangeLog(SQLModel, table=True):
+    """Latest change to each synced row, stamped by database triggers.
+
+    A row is replaced (and gets a new ``seq``) every time its entity changes,
+    so the log holds one entry per live row plus one tombstone per deleted
+    row. AUTOINCREMENT keeps ``seq`` from ever being reused when the entry
+    with the highest value is replaced.
+    """
+
+    __tablename__ = "change_log"
+    __table_args__ = (
+        UniqueConstraint("entity", "key", name="ux_change_log_entity_key"),
+        {"sqlite_autoincrement": True},
+    )
+
+    seq: Optional[int] = Field(default=None, primary_key=True)
+    entity: str
+    # Row id, or "session_id:tag_id" for session tags
+    key: str
+    deleted: bool = False
+
+
+class Change(SQLModel):
+    """One changed row; ``data`` is absent for deletes."""
+
+    seq: int
+    entity: Literal["session", "tag", "session_tag", "goal"]
+    key: str
+    op: Literal["upsert", "delete"]
+    data: Optional[dict] = None
+
+
+class ChangeFeed(SQLModel):
+    """Changes after the requested sequence, oldest first."""
+
+    changes: List[Change]
+    # Pass as `since` on the next request
+    last_seq: int
+    has_more: bool
@@ -23,6 +23,9 @@ class GeneratedMusic(GeneratedMusicBase, table=True):
 
     id: Optional[int] = Field(default=None, primary_key=True)
     status: str = "pending"  # pending, generating, completed, failed
+    error: Optional[str] = None
+    # Hash of the normalized prompt and duration; equal keys share one track
+    request_key: Optional[str] = None
     created_at: datetime = Field(default_factory=_utc_now)
 
 
@@ -38,4 +41,5 @@ class GeneratedMusicRead(GeneratedMusicBase):
 
     id: int
     status: str
+    error: Optional[str] = None
     created_at: datetime
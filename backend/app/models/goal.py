@@ -62,3 +62,14 @@ class GoalProgress(SQLModel):
     target_value: int
     current_value: int
     progress_percent: float
+
+
+class GoalPeriod(SQLModel):
+    """Schema for a goal's attainment over the days [start, end)."""
+
+    start: date
+    end: date
+    value: int
+    target_value: int
+    achieved: bool
+    progress_percent: float
@@ -0,0 +1,27 @@
+"""Outbox model for webhook messages awaiting delivery."""
+
+from datetime import UTC, datetime
+from typing import Optional
+
+from sqlalchemy import JSON, Column
+from sqlmodel import Field, SQLModel
+
+
+def _utc_now() -> datetime:
+    return datetime.now(UTC)
+
+
+class WebhookMessage(SQLModel, table=True):
+    """A queued webhook embed; the row is deleted once it is delivered."""
+
+    __tablename__ = "webhook_outbox"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    url: str
+    content: str = ""
+    embed: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    status: str = "pending"  # pending, failed
+    attempts: int = 0
+    next_attempt_at: datetime = Field(default_factory=_utc_now)
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=_utc_now)
@@ -0,0 +1,18 @@
+"""Daily rollup model for pre-aggregated meditation stats."""
+
+from datetime import date
+
+from sqlalchemy import JSON, Column
+from sqlmodel import Field, SQLModel
+
+
+class DailyRollup(SQLModel, table=True):
+    """Per-day totals of completed sessions, kept in sync on every session write."""
+
+    __tablename__ = "daily_rollup"
+
+    day: date = Field(primary_key=True)
+    minutes: int = 0
+    sessions: int = 0
+    # {"calm": 2, "tired": 1, ...} keyed by mood_after
+    mood_counts: dict = Field(default_factory=dict, sa_column=Column(JSON))
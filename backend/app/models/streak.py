@@ -0,0 +1,18 @@
+"""Streak state model for incremental streak tracking."""
+
+from datetime import date
+from typing import Optional
+
+from sqlmodel import Field, SQLModel
+
+
+class StreakState(SQLModel, table=True):
+    """Single-row table holding the current and longest meditation streak."""
+
+    __tablename__ = "streak_state"
+
+    id: int = Field(default=1, primary_key=True)
+    run_start: Optional[date] = None
+    current_length: int = 0
+    longest: int = 0
+    last_active: Optional[date] = None
@@ -0,0 +1,59 @@
+"""Sync models for batched offline writes from the PWA."""
+
+from datetime import UTC, datetime
+from typing import List, Literal, Optional
+
+from sqlmodel import Field, SQLModel
+
+
+def _utc_now() -> datetime:
+    return datetime.now(UTC)
+
+
+class SyncReceipt(SQLModel, table=True):
+    """Idempotency key of an applied sync operation and the session it touched."""
+
+    __tablename__ = "sync_receipt"
+
+    key: str = Field(primary_key=True, max_length=64)
+    op: str
+    client_id: Optional[str] = Field(default=None, max_length=64)
+    session_id: Optional[int] = None
+    created_at: datetime = Field(default_factory=_utc_now)
+
+
+class SyncOperation(SQLModel):
+    """One queued client write.
+
+    Sessions are referred to by ``session_id`` once the server id is known,
+    or by the ``client_id`` the client gave them when they were created.
+    """
+
+    key: str = Field(min_length=1, max_length=64)
+    op: Literal["create", "update", "tag", "delete"]
+    client_id: Optional[str] = Field(default=None, max_length=64)
+    session_id: Optional[int] = None
+    data: dict = {}
+    tag_ids: List[int] = []
+
+
+class SyncRequest(SQLModel):
+    """Ordered batch of operations applied in one transaction."""
+
+    operations: List[SyncOperation] = Field(max_length=500)
+
+
+class SyncResult(SQLModel):
+    """Outcome of a single operation."""
+
+    key: str
+    status: Literal["applied", "replayed", "not_found"]
+    client_id: Optional[str] = None
+    session_id: Optional[int] = None
+
+
+class SyncResponse(SQLModel):
+    """Per-operation results plus the server id of every client id seen."""
+
+    results: List[SyncResult]
+    id_map: dict[str, int]
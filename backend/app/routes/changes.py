@@ -0,0 +1,23 @@
+"""Delta sync feed API routes."""
+
+from fastapi import APIRouter, Query
+
+from ..database import SessionDep
+from ..models.change import ChangeFeed
+from ..services.changes import changes_since
+
+router = APIRouter(prefix="/api/changes", tags=["changes"])
+
+
+@router.get("/", response_model=ChangeFeed)
+def list_changes(
+    db: SessionDep,
+    since: int = Query(0, ge=0, description="Last sequence number already synced"),
+    limit: int = Query(500, ge=1, le=5000),
+) -> ChangeFeed:
+    """Sessions, tags, session tags and goals changed after ``since``.
+
+    Deleted rows come back as ``delete`` tombstones. Keep requesting with
+    ``since=last_seq`` while ``has_more`` is true.
+    """
+    return changes_since(db, since, limit)
@@ -0,0 +1,76 @@
+"""Dashboard API route combining everything the home screen needs."""
+
+from datetime import UTC, datetime, timedelta
+from typing import List
+
+from fastapi import APIRouter, Query
+from pydantic import BaseModel
+from sqlalchemy import func
+from sqlmodel import select
+
+from ..database import SessionDep
+from ..models.goal import Goal, GoalProgress
+from ..models.rollup import DailyRollup
+from ..models.session import Session, SessionRead
+from ..services import progress, streaks
+from .stats import HeatmapEntry, StatsSummary, StreakInfo
+
+router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
+
+
+class Dashboard(BaseModel):
+    """Summary, heatmap, streak, goal progress and recent sessions in one payload."""
+
+    summary: StatsSummary
+    heatmap: List[HeatmapEntry]
+    streak: StreakInfo
+    goals: List[GoalProgress]
+    recent_sessions: List[SessionRead]
+
+
+@router.get("/", response_model=Dashboard)
+def get_dashboard(
+    db: SessionDep,
+    days: int = Query(365, ge=1, description="Heatmap window in days"),
+    recent: int = Query(10, ge=0, le=100, description="Number of latest sessions"),
+) -> Dashboard:
+    """Get all home screen data from the rollups in a single request."""
+    today = datetime.now(UTC).date()
+    goals = db.exec(select(Goal).where(Goal.is_active == True)).all()
+
+    cutoff = (datetime.now(UTC) - timedelta(days=days)).date()
+    rows = db.exec(
+        select(DailyRollup).where(DailyRollup.day >= cutoff).order_by(DailyRollup.day)
+    ).all()
+
+    total_minutes, total_sessions = db.exec(
+        select(
+            func.coalesce(func.sum(DailyRollup.minutes), 0),
+            func.coalesce(func.sum(DailyRollup.sessions), 0),
+        )
+    ).one()
+    current_streak, longest_streak = streaks.current_and_longest(db)
+
+    goal_progress = progress.current_progress(db, goals, today)
+
+    recent_sessions = db.exec(
+        select(Session).order_by(Session.started_at.desc()).limit(recent)
+    ).all()
+
+    return Dashboard(
+        summary=StatsSummary(
+            total_sessions=total_sessions,
+            total_minutes=total_minutes,
+            current_streak=current_streak,
+            longest_streak=longest_streak,
+        ),
+        heatmap=[
+            HeatmapEntry(
+                date=row.day.isoformat(), minutes=row.minutes, sessions=row.sessions
+            )
+            for row in rows
+        ],
+        streak=StreakInfo(current=current_streak, longest=longest_streak),
+        goals=goal_progress,
+        recent_sessions=[SessionRead.model_validate(s) for s in recent_sessions],
+    )
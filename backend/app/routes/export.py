@@ -1,110 +1,193 @@
 """Export API routes for data export functionality."""
 
-from datetime import datetime
-from typing import Optional
+from typing import Iterator, Optional
 
-from fastapi import APIRouter, Query
-from fastapi.responses import Response
-from sqlmodel import select
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import FileResponse, StreamingResponse
 
 from ..database import SessionDep
-from ..models.session import Session
-from ..services.export import export_json, export_csv, export_ical, export_markdown
+from ..services import columnar, compression
+from ..services.bundle import export_bundle
+from ..services.export import (
+    buffered,
+    export_csv,
+    export_ical,
+    export_json,
+    export_markdown,
+    export_stats,
+    stream_sessions,
+)
+from ..services.export_jobs import ExportJob, ExportJobCreate, export_jobs, validate
 
 router = APIRouter(prefix="/api/export", tags=["export"])
 
 
-def get_filtered_sessions(
-    db: SessionDep,
-    from_date: Optional[str],
-    to_date: Optional[str],
-) -> list[Session]:
-    """Get sessions filtered by date range."""
-    query = select(Session).where(Session.completed == True)
-
-    if from_date:
-        query = query.where(Session.started_at >= datetime.fromisoformat(from_date))
-    if to_date:
-        query = query.where(Session.started_at <= datetime.fromisoformat(to_date))
-
-    query = query.order_by(Session.started_at.desc())
-    return list(db.exec(query).all())
-
-
-def get_stats(sessions: list[Session]) -> dict:
-    """Calculate stats from sessions."""
-    return {
-        "total_sessions": len(sessions),
-        "total_minutes": sum((s.actual_duration_seconds or 0) // 60 for s in sessions),
-    }
+def attachment(
+    pieces: Iterator[str],
+    media_type: str,
+    filename: str,
+    request: Request,
+    compress: Optional[str] = None,
+) -> StreamingResponse:
+    """Stream an export to the client as a file download.
+
+    ``compress`` (gzip or zstd) downloads a compressed file; otherwise the
+    body is compressed on the fly when the client's Accept-Encoding allows it.
+    """
+    chunks = buffered(pieces)
+    headers = {"Vary": "Accept-Encoding"}
+
+    if compress and compress != "none":
+        if compress not in compression.ENCODINGS:
+            raise HTTPException(
+                status_code=400, detail=f"Unsupported compression: {compress}"
+            )
+        chunks = compression.compress(chunks, compress)
+        media_type = compression.MEDIA_TYPES[compress]
+        filename += compression.FILE_SUFFIXES[compress]
+    elif compress is None:
+        encoding = compression.accepted_encoding(request.headers.get("accept-encoding"))
+        if encoding:
+            chunks = compression.compress(chunks, encoding)
+            headers["Content-Encoding"] = encoding
+
+    headers["Content-Disposition"] = f"attachment; filename={filename}"
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
 
 
 @router.get("/json")
 def export_data_json(
     db: SessionDep,
+    request: Request,
     from_date: Optional[str] = Query(None, alias="from"),
     to_date: Optional[str] = Query(None, alias="to"),
-) -> Response:
+    compress: Optional[str] = Query(
+        None, description="gzip, zstd or none; defaults to Accept-Encoding"
+    ),
+) -> StreamingResponse:
     """Export all data as JSON."""
-    sessions = get_filtered_sessions(db, from_date, to_date)
-    stats = get_stats(sessions)
-    content = export_json(sessions, stats)
-
-    return Response(
-        content=content,
-        media_type="application/json",
-        headers={"Content-Disposition": "attachment; filename=mindfulness-export.json"},
+    stats = export_stats(db, from_date, to_date)
+    sessions = stream_sessions(from_date, to_date)
+    return attachment(
+        export_json(sessions, stats),
+        "application/json",
+        "mindfulness-export.json",
+        request,
+        compress,
     )
 
 
 @router.get("/csv")
 def export_data_csv(
-    db: SessionDep,
+    request: Request,
     from_date: Optional[str] = Query(None, alias="from"),
     to_date: Optional[str] = Query(None, alias="to"),
-) -> Response:
+    compress: Optional[str] = Query(
+        None, description="gzip, zstd or none; defaults to Accept-Encoding"
+    ),
+) -> StreamingResponse:
     """Export sessions as CSV."""
-    sessions = get_filtered_sessions(db, from_date, to_date)
-    content = export_csv(sessions)
-
-    return Response(
-        content=content,
-        media_type="text/csv",
-        headers={
-            "Content-Disposition": "attachment; filename=mindfulness-sessions.csv"
-        },
+    sessions = stream_sessions(from_date, to_date)
+    return attachment(
+        export_csv(sessions), "text/csv", "mindfulness-sessions.csv", request, compress
     )
 
 
 @router.get("/ical")
 def export_data_ical(
-    db: SessionDep,
+    request: Request,
     from_date: Optional[str] = Query(None, alias="from"),
     to_date: Optional[str] = Query(None, alias="to"),
-) -> Response:
+) -> StreamingResponse:
     """Export as iCal format."""
-    sessions = get_filtered_sessions(db, from_date, to_date)
-    content = export_ical(sessions)
-
-    return Response(
-        content=content,
-        media_type="text/calendar",
-        headers={"Content-Disposition": "attachment; filename=mindfulness.ics"},
+    sessions = stream_sessions(from_date, to_date)
+    return attachment(
+        export_ical(sessions), "text/calendar", "mindfulness.ics", request
     )
 
 
 @router.get("/markdown")
 def export_data_markdown(
-    db: SessionDep,
+    request: Request,
     from_date: Optional[str] = Query(None, alias="from"),
     to_date: Optional[str] = Query(None, alias="to"),
-) -> Response:
+) -> StreamingResponse:
     """Export as markdown journal."""
-    sessions = get_filtered_sessions(db, from_date, to_date)
-    content = export_markdown(sessions)
+    sessions = stream_sessions(from_date, to_date)
+    return attachment(
+        export_markdown(sessions), "text/markdown", "mindfulness-journal.md", request
+    )
+
 
-    return Response(
-        content=content,
-        media_type="text/markdown",
-        headers={"Content-Disposition": "attachment; filename=mindfulness-journal.md"},
+@router.get("/bundle")
+def export_data_bundle() -> StreamingResponse:
+    """Export a ZIP backup with every format, goals and tags from one pass."""
+    return StreamingResponse(
+        export_bundle(),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=mindfulness-backup.zip"},
     )
+
+
+def columnar_export(
+    fmt: str, from_date: Optional[str], to_date: Optional[str]
+) -> StreamingResponse:
+    """Stream sessions in a columnar format, or 501 without pyarrow."""
+    if not columnar.available():
+        raise HTTPException(
+            status_code=501, detail=f"{fmt.title()} export requires pyarrow"
+        )
+    media_type, filename = columnar.FORMATS[fmt]
+    return StreamingResponse(
+        columnar.export_columnar(stream_sessions(from_date, to_date), fmt),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+@router.get("/parquet")
+def export_data_parquet(
+    from_date: Optional[str] = Query(None, alias="from"),
+    to_date: Optional[str] = Query(None, alias="to"),
+) -> StreamingResponse:
+    """Export sessions as a Parquet file."""
+    return columnar_export("parquet", from_date, to_date)
+
+
+@router.get("/arrow")
+def export_data_arrow(
+    from_date: Optional[str] = Query(None, alias="from"),
+    to_date: Optional[str] = Query(None, alias="to"),
+) -> StreamingResponse:
+    """Export sessions as an Arrow IPC stream."""
+    return columnar_export("arrow", from_date, to_date)
+
+
+@router.post("/jobs", response_model=ExportJob, status_code=202)
+def create_export_job(request: ExportJobCreate) -> ExportJob:
+    """Render an export in the background; cached results complete at once."""
+    error = validate(request)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    return export_jobs.submit(request)
+
+
+@router.get("/jobs/{job_id}", response_model=ExportJob)
+def get_export_job(job_id: str) -> ExportJob:
+    """Check an export job's status and progress."""
+    job = export_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}/download")
+def download_export_job(job_id: str) -> FileResponse:
+    """Download a finished export; supports Range requests for resuming."""
+    job = get_export_job(job_id)
+    if job.status != "completed":
+        raise HTTPException(status_code=409, detail=f"Export job is {job.status}")
+    path = export_jobs.artifact(job)
+    if path is None:
+        raise HTTPException(status_code=410, detail="Export expired, start a new job")
+    return FileResponse(path, media_type=job.media_type, filename=job.filename)
@@ -1,49 +1,26 @@
 """Goals API routes for meditation goals management."""
 
-from datetime import UTC, datetime, timedelta
-from typing import List
+from datetime import UTC, date, datetime, timedelta
+from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import select
+from fastapi import APIRouter, HTTPException, Query
+from sqlmodel import Session as DBSession, select
 
 from ..database import SessionDep
-from ..models.goal import Goal, GoalCreate, GoalRead, GoalUpdate, GoalProgress
-from ..models.session import Session
+from ..models.goal import (
+    Goal,
+    GoalCreate,
+    GoalPeriod,
+    GoalProgress,
+    GoalRead,
+    GoalUpdate,
+)
+from ..services import progress
+from ..services.writer import writer
 
 router = APIRouter(prefix="/api/goals", tags=["goals"])
 
 
-def get_current_value(db: SessionDep, goal: Goal) -> int:
-    """Calculate current progress value for a goal."""
-    now = datetime.now(UTC)
-    today = now.date()
-
-    if goal.goal_type.startswith("daily_"):
-        start = datetime.combine(today, datetime.min.time()).replace(tzinfo=UTC)
-        end = start + timedelta(days=1)
-    elif goal.goal_type.startswith("weekly_"):
-        # Week starts on Monday
-        start_of_week = today - timedelta(days=today.weekday())
-        start = datetime.combine(start_of_week, datetime.min.time()).replace(tzinfo=UTC)
-        end = start + timedelta(days=7)
-    else:
-        return 0
-
-    sessions = db.exec(
-        select(Session).where(
-            Session.completed == True,
-            Session.started_at >= start,
-            Session.started_at < end,
-        )
-    ).all()
-
-    if goal.goal_type.endswith("_minutes"):
-        return sum((s.actual_duration_seconds or 0) // 60 for s in sessions)
-    elif goal.goal_type.endswith("_sessions"):
-        return len(sessions)
-    return 0
-
-
 @router.get("/", response_model=List[GoalRead])
 def list_goals(db: SessionDep, active_only: bool = True) -> List[Goal]:
     """List all goals, optionally filtered by active status."""
@@ -54,13 +31,16 @@ def list_goals(db: SessionDep, active_only: bool = True) -> List[Goal]:
 
 
 @router.post("/", response_model=GoalRead)
-def create_goal(goal: GoalCreate, db: SessionDep) -> Goal:
+def create_goal(goal: GoalCreate) -> Goal:
     """Create a new goal."""
-    db_goal = Goal.model_validate(goal)
-    db.add(db_goal)
-    db.commit()
-    db.refresh(db_goal)
-    return db_goal
+
+    def write(db: DBSession) -> Goal:
+        db_goal = Goal.model_validate(goal)
+        db.add(db_goal)
+        db.flush()
+        return db_goal
+
+    return writer.run(write)
 
 
 @router.get("/{goal_id}", response_model=GoalRead)
@@ -73,30 +53,34 @@ def get_goal(goal_id: int, db: SessionDep) -> Goal:
 
 
 @router.patch("/{goal_id}", response_model=GoalRead)
-def update_goal(goal_id: int, goal_update: GoalUpdate, db: SessionDep) -> Goal:
+def update_goal(goal_id: int, goal_update: GoalUpdate) -> Goal:
     """Update a goal."""
-    goal = db.get(Goal, goal_id)
-    if not goal:
-        raise HTTPException(status_code=404, detail="Goal not found")
-
     update_data = goal_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(goal, key, value)
 
-    db.add(goal)
-    db.commit()
-    db.refresh(goal)
-    return goal
+    def write(db: DBSession) -> Goal:
+        goal = db.get(Goal, goal_id)
+        if not goal:
+            raise HTTPException(status_code=404, detail="Goal not found")
+        for key, value in update_data.items():
+            setattr(goal, key, value)
+        db.add(goal)
+        db.flush()
+        return goal
+
+    return writer.run(write)
 
 
 @router.delete("/{goal_id}")
-def delete_goal(goal_id: int, db: SessionDep) -> dict:
+def delete_goal(goal_id: int) -> dict:
     """Delete a goal."""
-    goal = db.get(Goal, goal_id)
-    if not goal:
-        raise HTTPException(status_code=404, detail="Goal not found")
-    db.delete(goal)
-    db.commit()
+
+    def write(db: DBSession) -> None:
+        goal = db.get(Goal, goal_id)
+        if not goal:
+            raise HTTPException(status_code=404, detail="Goal not found")
+        db.delete(goal)
+
+    writer.run(write)
     return {"ok": True}
 
 
@@ -104,23 +88,34 @@ def delete_goal(goal_id: int, db: SessionDep) -> dict:
 def get_goals_progress(db: SessionDep) -> List[GoalProgress]:
     """Get progress for all active goals."""
     goals = db.exec(select(Goal).where(Goal.is_active == True)).all()
-    progress_list = []
-
-    for goal in goals:
-        current = get_current_value(db, goal)
-        percent = (
-            min(100.0, (current / goal.target_value) * 100)
-            if goal.target_value > 0
-            else 0
-        )
-        progress_list.append(
-            GoalProgress(
-                goal_id=goal.id,
-                goal_type=goal.goal_type,
-                target_value=goal.target_value,
-                current_value=current,
-                progress_percent=round(percent, 1),
-            )
-        )
+    return progress.current_progress(db, goals, datetime.now(UTC).date())
+
 
-    return progress_list
+@router.get("/{goal_id}/history", response_model=List[GoalPeriod])
+def get_goal_history(
+    goal_id: int,
+    db: SessionDep,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+) -> List[GoalPeriod]:
+    """Get a goal's attainment per day or week, oldest first.
+
+    Defaults to the goal's start date through today (or its end date), at
+    most the last two years of it.
+    """
+    goal = db.get(Goal, goal_id)
+    if not goal:
+        raise HTTPException(status_code=404, detail="Goal not found")
+
+    today = datetime.now(UTC).date()
+    end = to_date or min(today, goal.end_date or today)
+    longest = timedelta(days=progress.MAX_HISTORY_DAYS - 1)
+    start = from_date or max(goal.start_date, end - longest)
+    if end < start:
+        raise HTTPException(status_code=400, detail="'to' is before 'from'")
+    if end - start > longest:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range is longer than {progress.MAX_HISTORY_DAYS} days",
+        )
+    return progress.history(db, goal, start, end)
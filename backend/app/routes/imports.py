@@ -0,0 +1,61 @@
+"""Import API route for loading session history in bulk."""
+
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from ..services.importer import (
+    PARSERS,
+    ImportReport,
+    InvalidImport,
+    UploadPipe,
+    import_sessions,
+)
+
+router = APIRouter(prefix="/api/import", tags=["import"])
+
+
+def detect_format(content_type: Optional[str]) -> str:
+    """Guess the upload format from its Content-Type, defaulting to JSON."""
+    if content_type and "csv" in content_type:
+        return "csv"
+    return "json"
+
+
+@router.post("/", response_model=ImportReport)
+async def import_data(
+    request: Request,
+    format: Optional[str] = Query(
+        None, description="json or csv; defaults to the request's Content-Type"
+    ),
+) -> ImportReport:
+    """Import sessions from a JSON or CSV export sent as the request body.
+
+    The body is parsed and inserted while it is still uploading; sessions that
+    already exist are skipped.
+    """
+    fmt = format or detect_format(request.headers.get("content-type"))
+    if fmt not in PARSERS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {fmt}")
+
+    pipe = UploadPipe()
+
+    def run() -> ImportReport:
+        try:
+            return import_sessions(pipe, fmt)
+        finally:
+            pipe.abandoned = True
+
+    worker = asyncio.create_task(asyncio.to_thread(run))
+    try:
+        async for chunk in request.stream():
+            await pipe.feed(chunk)
+    finally:
+        # Also ends the reader if the client disconnects mid-upload
+        await pipe.finish()
+
+    try:
+        return await worker
+    except InvalidImport as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,21 @@
+"""Metrics API route exposing internal counters."""
+
+from fastapi import APIRouter
+
+from ..services.cache import response_cache
+from ..services.outbound import outbound
+from ..services.outbox import dispatcher
+from ..services.writer import writer
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+
+@router.get("/")
+def get_metrics() -> dict:
+    """Get write coordinator, read cache, outbound HTTP and webhook statistics."""
+    return {
+        "writer": writer.stats.snapshot(),
+        "read_cache": {"hits": response_cache.hits, "misses": response_cache.misses},
+        "outbound": outbound.snapshot(),
+        "webhooks": dict(dispatcher.stats),
+    }
@@ -2,8 +2,8 @@
 
 from typing import List
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import select
+from fastapi import APIRouter, HTTPException, Response
+from sqlmodel import Session as DBSession, select
 
 from ..database import SessionDep
 from ..models.generated_music import (
@@ -11,7 +11,9 @@ from ..models.generated_music import (
     GeneratedMusicCreate,
     GeneratedMusicRead,
 )
-from ..services.music_gen import music_gen_service, MUSIC_PRESETS
+from ..services.music_gen import MUSIC_PRESETS, music_gen_service, request_key
+from ..services.music_jobs import music_jobs
+from ..services.writer import writer
 
 router = APIRouter(prefix="/api/music", tags=["music"])
 
@@ -22,45 +24,56 @@ def list_presets() -> List[dict]:
     return MUSIC_PRESETS
 
 
-@router.post("/generate", response_model=GeneratedMusicRead)
+@router.post("/generate", response_model=GeneratedMusicRead, status_code=202)
 async def generate_music(
-    data: GeneratedMusicCreate,
-    db: SessionDep,
+    data: GeneratedMusicCreate, response: Response
 ) -> GeneratedMusic:
-    """Start music generation (async).
+    """Queue music generation and return the pending track right away.
 
-    Note: Requires SUNO_API_KEY environment variable to be configured.
+    A request matching an earlier one (same normalized prompt and duration)
+    returns that track instead: the finished track with 200, or the job
+    still in progress. Otherwise poll /api/music/status/{id} until it is
+    completed or failed.
+    Note: Requires GEMINI_API_KEY environment variable to be configured.
     """
-    # Create record with pending status
-    music = GeneratedMusic(
-        prompt=data.prompt,
-        duration_seconds=data.duration_seconds,
-        filename="",
-        status="pending",
-    )
-    db.add(music)
-    db.commit()
-    db.refresh(music)
-
-    # Attempt generation
-    result = await music_gen_service.generate(data.prompt, data.duration_seconds)
-
-    if result:
-        music.filename = result
-        music.status = "completed"
-    else:
-        music.status = "failed"
-
-    db.add(music)
-    db.commit()
-    db.refresh(music)
-
+    key = request_key(data.prompt, data.duration_seconds)
+
+    def write(db: DBSession) -> tuple[GeneratedMusic, bool]:
+        existing = db.exec(
+            select(GeneratedMusic)
+            .where(GeneratedMusic.request_key == key, GeneratedMusic.status != "failed")
+            .order_by(GeneratedMusic.id.desc())
+        ).first()
+        if existing and (
+            existing.status != "completed"
+            or music_gen_service.has_track(existing.filename)
+        ):
+            return existing, False
+
+        music = GeneratedMusic(
+            prompt=data.prompt,
+            duration_seconds=data.duration_seconds,
+            filename="",
+            status="pending",
+            request_key=key,
+        )
+        db.add(music)
+        db.flush()
+        return music, True
+
+    # The coordinator runs writes one at a time, so concurrent identical
+    # requests can't both miss and start two generations
+    music, created = await writer.run_async(write)
+    if created:
+        music_jobs.submit(music.id)
+    elif music.status == "completed":
+        response.status_code = 200
     return music
 
 
 @router.get("/status/{music_id}", response_model=GeneratedMusicRead)
 def get_status(music_id: int, db: SessionDep) -> GeneratedMusic:
-    """Check generation status."""
+    """Check generation status: pending, generating, completed or failed."""
     music = db.get(GeneratedMusic, music_id)
     if not music:
         raise HTTPException(status_code=404, detail="Music not found")
@@ -1,66 +1,139 @@
 """Sessions API routes for meditation session CRUD operations."""
 
-from datetime import datetime
+import base64
+from datetime import UTC, datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Query
-from sqlmodel import select
+from fastapi import APIRouter, HTTPException, Query, Response
+from sqlalchemy import func, or_
+from sqlmodel import Session as DBSession, select
 
 from ..database import SessionDep
+from ..models.rollup import DailyRollup
 from ..models.session import Session, SessionCreate, SessionRead, SessionUpdate
 from ..models.tag import SessionTag
-from ..services.discord import discord_service
-from .stats import calculate_streaks
+from ..services import notifications, progress, session_store, streaks
+from ..services.events import SessionCompleted, bus
+from ..services.writer import writer
 
 router = APIRouter(prefix="/api/sessions", tags=["sessions"])
 
 
 @router.post("/", response_model=SessionRead)
-def create_session(session: SessionCreate, db: SessionDep) -> Session:
+def create_session(session: SessionCreate) -> Session:
     """Create a new meditation session."""
-    db_session = Session.model_validate(session)
-    db.add(db_session)
-    db.commit()
-    db.refresh(db_session)
-    return db_session
+    return writer.run(lambda db: session_store.create(db, session))
+
+
+def encode_cursor(session: Session) -> str:
+    """Encode the keyset position just after a session."""
+    raw = f"{session.started_at.isoformat()}|{session.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a cursor into its (started_at, id) position."""
+    try:
+        started_at, session_id = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        )
+        position = datetime.fromisoformat(started_at), int(session_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if position[0].tzinfo is None:
+        position = position[0].replace(tzinfo=UTC), position[1]
+    return position
+
+
+def estimate_total(
+    db: SessionDep,
+    from_dt: Optional[datetime],
+    to_dt: Optional[datetime],
+    tag_id: Optional[int],
+    completed_only: bool,
+) -> int:
+    """Cheaply estimate how many sessions match a listing's filters."""
+    if tag_id:
+        return db.exec(select(func.count()).where(SessionTag.tag_id == tag_id)).one()
+    if completed_only:
+        # Completed sessions per day are already rolled up
+        query = select(func.coalesce(func.sum(DailyRollup.sessions), 0))
+        if from_dt:
+            query = query.where(DailyRollup.day >= from_dt.date())
+        if to_dt:
+            query = query.where(DailyRollup.day <= to_dt.date())
+        return db.exec(query).one()
+    if from_dt or to_dt:
+        # The rollups only count completed sessions; the range index covers this
+        query = select(func.count()).select_from(Session)
+        if from_dt:
+            query = query.where(Session.started_at >= from_dt)
+        if to_dt:
+            query = query.where(Session.started_at <= to_dt)
+        return db.exec(query).one()
+    # Ids are distinct positive integers, so the highest one bounds the row
+    # count; gaps left by deletes only make it an overestimate
+    return db.exec(select(func.coalesce(func.max(Session.id), 0))).one()
 
 
 @router.get("/", response_model=List[SessionRead])
 def list_sessions(
     db: SessionDep,
+    response: Response,
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = Query(
+        None, description="Opaque cursor from X-Next-Cursor; replaces offset"
+    ),
     from_date: Optional[str] = Query(None, description="Filter from date (ISO format)"),
     to_date: Optional[str] = Query(None, description="Filter to date (ISO format)"),
     tag_id: Optional[int] = Query(None, description="Filter by tag ID"),
     completed_only: bool = Query(False, description="Only completed sessions"),
 ) -> List[Session]:
-    """List meditation sessions ordered by most recent first."""
+    """List meditation sessions ordered by most recent first.
+
+    The X-Next-Cursor response header holds the cursor for the following page
+    (absent on the last page) and X-Total-Estimate an approximate match count.
+    """
     query = select(Session)
+    from_dt = datetime.fromisoformat(from_date) if from_date else None
+    to_dt = datetime.fromisoformat(to_date) if to_date else None
 
-    if from_date:
-        query = query.where(Session.started_at >= datetime.fromisoformat(from_date))
-    if to_date:
-        query = query.where(Session.started_at <= datetime.fromisoformat(to_date))
+    if from_dt:
+        query = query.where(Session.started_at >= from_dt)
+    if to_dt:
+        query = query.where(Session.started_at <= to_dt)
     if completed_only:
         query = query.where(Session.completed == True)
     if tag_id:
-        # Join with session_tag to filter by tag
-        session_ids = [
-            st.session_id
-            for st in db.exec(
-                select(SessionTag).where(SessionTag.tag_id == tag_id)
-            ).all()
-        ]
-        if session_ids:
-            query = query.where(Session.id.in_(session_ids))
-        else:
-            return []
-
-    sessions = db.exec(
-        query.order_by(Session.started_at.desc()).offset(offset).limit(limit)
-    ).all()
-    return list(sessions)
+        query = query.where(
+            Session.id.in_(
+                select(SessionTag.session_id).where(SessionTag.tag_id == tag_id)
+            )
+        )
+
+    if cursor:
+        # Keyset pagination: resume right after the last row of the previous page
+        started_at, session_id = decode_cursor(cursor)
+        query = query.where(
+            Session.started_at <= started_at,
+            or_(Session.started_at < started_at, Session.id < session_id),
+        )
+    else:
+        query = query.offset(offset)
+
+    sessions = list(
+        db.exec(
+            query.order_by(Session.started_at.desc(), Session.id.desc()).limit(limit)
+        ).all()
+    )
+
+    if sessions and len(sessions) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(sessions[-1])
+    response.headers["X-Total-Estimate"] = str(
+        estimate_total(db, from_dt, to_dt, tag_id, completed_only)
+    )
+    return sessions
 
 
 @router.get("/{session_id}", response_model=SessionRead)
@@ -73,49 +146,41 @@ def get_session(session_id: int, db: SessionDep) -> Session:
 
 
 @router.patch("/{session_id}", response_model=SessionRead)
-async def update_session(
-    session_id: int,
-    session_update: SessionUpdate,
-    db: SessionDep,
-    background_tasks: BackgroundTasks,
-) -> Session:
+async def update_session(session_id: int, session_update: SessionUpdate) -> Session:
     """Update an existing meditation session."""
-    session = db.get(Session, session_id)
-    if not session:
+    changes = session_update.model_dump(exclude_unset=True)
+
+    def write(db: DBSession) -> Optional[tuple[Session, Optional[SessionCompleted]]]:
+        streak_before, _ = streaks.current_and_longest(db)
+        updated = session_store.update(db, session_id, changes)
+        if not updated:
+            return None
+        session, just_completed = updated
+        if not just_completed:
+            return session, None
+        # Streak state is kept current by the rollup, so this is a row read
+        streak, _ = streaks.current_and_longest(db)
+        # Checked here, not by a subscriber after the commit, so concurrent
+        # completions each see only the sessions written before them
+        goals = progress.goals_reached(db, session)
+        event = SessionCompleted(session, streak, streak > streak_before, tuple(goals))
+        notifications.queue_notifications(db, event)
+        return session, event
+
+    result = await writer.run_async(write)
+    if not result:
         raise HTTPException(status_code=404, detail="Session not found")
+    session, completed = result
 
-    was_incomplete = not session.completed
-    update_data = session_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(session, key, value)
-
-    db.add(session)
-    db.commit()
-    db.refresh(session)
-
-    # Trigger Discord notifications on completion
-    if was_incomplete and session.completed and discord_service.webhook_url:
-        background_tasks.add_task(discord_service.notify_session_complete, session)
-
-        # Check for streak milestone
-        all_sessions = db.exec(select(Session).where(Session.completed == True)).all()
-        session_dates = [s.started_at for s in all_sessions]
-        current_streak, _ = calculate_streaks(session_dates)
-
-        if current_streak in [7, 14, 30, 60, 100, 365]:
-            background_tasks.add_task(
-                discord_service.notify_streak_milestone, current_streak
-            )
-
+    # Subscribers run as their own tasks, off the request path
+    if completed:
+        bus.publish(completed)
     return session
 
 
 @router.delete("/{session_id}")
-def delete_session(session_id: int, db: SessionDep) -> dict:
+def delete_session(session_id: int) -> dict:
     """Delete a meditation session."""
-    session = db.get(Session, session_id)
-    if not session:
+    if not writer.run(lambda db: session_store.remove(db, session_id)):
         raise HTTPException(status_code=404, detail="Session not found")
-    db.delete(session)
-    db.commit()
     return {"ok": True}
@@ -0,0 +1,27 @@
+"""Sync API route for batched offline writes."""
+
+from fastapi import APIRouter, HTTPException
+
+from ..models.sync import SyncRequest, SyncResponse
+from ..services import sync as sync_service
+from ..services.writer import writer
+
+router = APIRouter(prefix="/api/sync", tags=["sync"])
+
+
+@router.post("/", response_model=SyncResponse)
+async def sync_operations(batch: SyncRequest) -> SyncResponse:
+    """Apply an ordered batch of session operations in one transaction.
+
+    Operations whose idempotency key was already applied are skipped, so a
+    retried batch returns the same server ids without writing twice.
+    """
+    try:
+        return await writer.run_async(
+            lambda db: sync_service.apply_batch(db, batch.operations)
+        )
+    except sync_service.InvalidOperation as e:
+        raise HTTPException(
+            status_code=409 if e.conflict else 422,
+            detail={"index": e.index, "error": str(e)},
+        )
@@ -3,10 +3,13 @@
 from typing import List
 
 from fastapi import APIRouter, HTTPException
-from sqlmodel import select
+from sqlalchemy import delete
+from sqlmodel import Session as DBSession, select
 
 from ..database import SessionDep
 from ..models.tag import Tag, TagCreate, TagRead, SessionTag
+from ..services import session_store
+from ..services.writer import writer
 
 router = APIRouter(prefix="/api/tags", tags=["tags"])
 
@@ -18,48 +21,39 @@ def list_tags(db: SessionDep) -> List[Tag]:
 
 
 @router.post("/", response_model=TagRead)
-def create_tag(tag: TagCreate, db: SessionDep) -> Tag:
+def create_tag(tag: TagCreate) -> Tag:
     """Create a new tag."""
-    db_tag = Tag.model_validate(tag)
-    db.add(db_tag)
-    db.commit()
-    db.refresh(db_tag)
-    return db_tag
+
+    def write(db: DBSession) -> Tag:
+        db_tag = Tag.model_validate(tag)
+        db.add(db_tag)
+        db.flush()
+        return db_tag
+
+    return writer.run(write)
 
 
 @router.delete("/{tag_id}")
-def delete_tag(tag_id: int, db: SessionDep) -> dict:
+def delete_tag(tag_id: int) -> dict:
     """Delete a tag."""
-    tag = db.get(Tag, tag_id)
-    if not tag:
-        raise HTTPException(status_code=404, detail="Tag not found")
 
-    # Delete session-tag associations
-    session_tags = db.exec(select(SessionTag).where(SessionTag.tag_id == tag_id)).all()
-    for st in session_tags:
-        db.delete(st)
+    def write(db: DBSession) -> None:
+        tag = db.get(Tag, tag_id)
+        if not tag:
+            raise HTTPException(status_code=404, detail="Tag not found")
 
-    db.delete(tag)
-    db.commit()
+        # Delete session-tag associations
+        db.exec(delete(SessionTag).where(SessionTag.tag_id == tag_id))
+        db.delete(tag)
+
+    writer.run(write)
     return {"ok": True}
 
 
 @router.post("/sessions/{session_id}/tags")
-def add_tags_to_session(session_id: int, tag_ids: List[int], db: SessionDep) -> dict:
+def add_tags_to_session(session_id: int, tag_ids: List[int]) -> dict:
     """Add tags to a session."""
-    # Remove existing tags for this session
-    existing = db.exec(
-        select(SessionTag).where(SessionTag.session_id == session_id)
-    ).all()
-    for st in existing:
-        db.delete(st)
-
-    # Add new tags
-    for tag_id in tag_ids:
-        session_tag = SessionTag(session_id=session_id, tag_id=tag_id)
-        db.add(session_tag)
-
-    db.commit()
+    writer.run(lambda db: session_store.set_tags(db, session_id, tag_ids))
     return {"ok": True}
 
 
@@ -0,0 +1,93 @@
+"""Shared aggregation queries over completed sessions.
+
+All totals are computed by SQLite (COUNT/SUM/GROUP BY) so only small result
+tuples cross the driver boundary instead of full Session objects.
+"""
+
+from datetime import date, datetime
+from typing import NamedTuple, Optional
+
+from sqlalchemy import func
+from sqlmodel import Session as DBSession, select
+
+from ..models.session import Session
+
+# Per-session whole minutes, matching the `actual_duration_seconds // 60` rule
+_MINUTES = func.coalesce(Session.actual_duration_seconds, 0) // 60
+_DAY = func.date(Session.started_at)
+
+
+class Totals(NamedTuple):
+    """Session count and minutes for a range."""
+
+    sessions: int
+    minutes: int
+
+
+class DailyTotals(NamedTuple):
+    """Session count and minutes for one day."""
+
+    day: date
+    sessions: int
+    minutes: int
+
+
+def _completed_in_range(
+    query, start: Optional[datetime] = None, end: Optional[datetime] = None
+):
+    """Restrict a query to completed sessions with start <= started_at < end."""
+    query = query.where(Session.completed == True)
+    if start is not None:
+        query = query.where(Session.started_at >= start)
+    if end is not None:
+        query = query.where(Session.started_at < end)
+    return query
+
+
+def completed_totals(
+    db: DBSession,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Totals:
+    """Count completed sessions and sum their minutes in [start, end)."""
+    sessions, minutes = db.exec(
+        _completed_in_range(
+            select(func.count(), func.coalesce(func.sum(_MINUTES), 0)), start, end
+        )
+    ).one()
+    return Totals(sessions=sessions, minutes=minutes)
+
+
+def daily_totals(
+    db: DBSession,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> list[DailyTotals]:
+    """Per-day session counts and minutes in [start, end), oldest first."""
+    rows = db.exec(
+        _completed_in_range(select(_DAY, func.count(), func.sum(_MINUTES)), start, end)
+        .group_by(_DAY)
+        .order_by(_DAY)
+    ).all()
+    return [
+        DailyTotals(day=date.fromisoformat(day), sessions=count, minutes=minutes or 0)
+        for day, count, minutes in rows
+    ]
+
+
+def daily_mood_counts(
+    db: DBSession,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> dict[date, dict[str, int]]:
+    """Per-day counts of each post-session mood in [start, end)."""
+    rows = db.exec(
+        _completed_in_range(select(_DAY, Session.mood_after, func.count()), start, end)
+        .where(Session.mood_after.is_not(None))
+        .group_by(_DAY, Session.mood_after)
+    ).all()
+
+    moods: dict[date, dict[str, int]] = {}
+    for day, mood, count in rows:
+        moods.setdefault(date.fromisoformat(day), {})[mood] = count
+    return moods
@@ -0,0 +1,132 @@
+"""Backup bundle: every export format plus goals and tags in one ZIP.
+
+Unlike the single-format exports, the bundle holds every session, completed
+or not, so it is a faithful copy that the session tags can refer to.
+
+All session exporters are fed from a single cursor pass. The cursor is teed
+into one branch per format and the exporters are advanced in lockstep, one
+row at a time, so the tee never buffers more than a row or two however
+differently the formats grow. The JSON export is written into the ZIP as it
+is produced; the other formats are spooled to temporary files (in memory
+until they grow large) and appended once the pass is done, because ZIP
+entries can't be interleaved.
+"""
+
+import itertools
+import json
+import tempfile
+import zipfile
+from typing import BinaryIO, Callable, Iterable, Iterator
+
+from sqlmodel import Session as DBSession, select
+
+from ..database import engine
+from ..models.goal import Goal
+from ..models.session import Session
+from ..models.tag import SessionTag, Tag
+from .columnar import ChunkSink
+from .export import (
+    CHUNK_SIZE,
+    export_csv,
+    export_ical,
+    export_json,
+    export_markdown,
+    export_stats,
+    stream_sessions,
+)
+
+# Spooled formats stay in memory up to this size before moving to disk
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+
+def _table_json(db: DBSession, model) -> bytes:
+    rows = db.exec(select(model)).all()
+    return json.dumps(
+        [row.model_dump(mode="json") for row in rows], indent=2, ensure_ascii=False
+    ).encode()
+
+
+class _Paced:
+    """An exporter writing into a target, counting the rows it has taken."""
+
+    def __init__(
+        self,
+        exporter: Callable[[Iterable[Session]], Iterator[str]],
+        sessions: Iterable[Session],
+        target: BinaryIO,
+    ):
+        self.pieces = exporter(self._count(sessions))
+        self.target = target
+        self.rows = 0
+        self.done = False
+
+    def _count(self, sessions: Iterable[Session]) -> Iterator[Session]:
+        for session in sessions:
+            self.rows += 1
+            yield session
+
+    def advance(self, rows: int) -> None:
+        """Write pieces until the exporter has taken ``rows`` rows or finished."""
+        while not self.done and self.rows < rows:
+            piece = next(self.pieces, None)
+            if piece is None:
+                self.done = True
+            else:
+                self.target.write(piece.encode())
+
+
+def export_bundle() -> Iterator[bytes]:
+    """Stream a ZIP with sessions in every text format plus goals and tags."""
+    with DBSession(engine) as db:
+        stats = export_stats(db, None, None)
+        tables = {
+            "goals.json": _table_json(db, Goal),
+            "tags.json": _table_json(db, Tag),
+            "session_tags.json": _table_json(db, SessionTag),
+        }
+
+    branches = itertools.tee(stream_sessions(None, None, completed_only=False), 4)
+    spools = {
+        name: tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+        for name in ("sessions.csv", "sessions.ics", "journal.md")
+    }
+
+    sink = ChunkSink()
+    try:
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+            with bundle.open("sessions.json", "w") as entry:
+                exporters = [
+                    (lambda rows: export_json(rows, stats), entry),
+                    (export_csv, spools["sessions.csv"]),
+                    (export_ical, spools["sessions.ics"]),
+                    (export_markdown, spools["journal.md"]),
+                ]
+                paced = [
+                    _Paced(exporter, branch, target)
+                    for (exporter, target), branch in zip(exporters, branches)
+                ]
+
+                # Every exporter takes row n before any takes row n + 1, so
+                # the tee only holds the row in flight
+                for rows in itertools.count(1):
+                    for step in paced:
+                        step.advance(rows)
+                    if data := sink.drain():
+                        yield data
+                    if all(step.done for step in paced):
+                        break
+
+            for name, spool in spools.items():
+                spool.seek(0)
+                with bundle.open(name, "w") as entry:
+                    while chunk := spool.read(CHUNK_SIZE):
+                        entry.write(chunk)
+                        if data := sink.drain():
+                            yield data
+
+            for name, content in tables.items():
+                bundle.writestr(name, content)
+        yield sink.drain()
+    finally:
+        for spool in spools.values():
+            spool.close()
@@ -0,0 +1,187 @@
+"""Versioned read cache with strong ETags for JSON read endpoints.
+
+Every committed write bumps a process-wide data version. GET responses under
+the cached prefixes are stored in a bounded LRU keyed on (path, query,
+version, day), and a matching ``If-None-Match`` is answered with 304 before
+the route, and therefore the database, is touched.
+"""
+
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as ORMSession
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+
+from ..config import get_config
+
+CACHED_PREFIXES = (
+    "/api/stats",
+    "/api/goals",
+    "/api/tags",
+    "/api/sessions",
+    "/api/dashboard",
+    "/api/changes",
+)
+
+
+class DataVersion:
+    """Monotonic counter of committed writes, unique per process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0
+        # ETags from a previous process must never match this one
+        self._boot = uuid.uuid4().hex[:8]
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def token(self) -> str:
+        """Opaque identifier of the current data version."""
+        return f"{self._boot}-{self._value}"
+
+    def bump(self) -> int:
+        """Record that data changed; returns the new version."""
+        with self._lock:
+            self._value += 1
+            return self._value
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    content_type: str
+    # Custom X-* headers (e.g. pagination cursors) replayed on hits
+    extra_headers: dict = field(default_factory=dict)
+
+
+class ResponseCache:
+    """Thread-safe LRU of rendered responses."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, entry: CachedResponse) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+data_version = DataVersion()
+response_cache = ResponseCache(
+    max_entries=get_config().get("cache", {}).get("max_entries", 256)
+)
+
+
+# --- Version bumps on every committed ORM write -------------------------------
+
+
+@event.listens_for(ORMSession, "after_flush")
+def _mark_flush(session, flush_context) -> None:
+    if session.new or session.dirty or session.deleted:
+        session.info["data_changed"] = True
+
+
+@event.listens_for(ORMSession, "do_orm_execute")
+def _mark_dml(orm_execute_state) -> None:
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        orm_execute_state.session.info["data_changed"] = True
+
+
+@event.listens_for(ORMSession, "after_commit")
+def _bump_on_commit(session) -> None:
+    if session.info.pop("data_changed", False):
+        data_version.bump()
+
+
+@event.listens_for(ORMSession, "after_rollback")
+def _reset_on_rollback(session) -> None:
+    session.info.pop("data_changed", None)
+
+
+# --- HTTP layer ---------------------------------------------------------------
+
+
+def _etag(key: str) -> str:
+    return '"' + hashlib.sha1(key.encode()).hexdigest()[:20] + '"'
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip() for tag in if_none_match.split(","))
+
+
+class ReadCacheMiddleware(BaseHTTPMiddleware):
+    """Serve cached GET responses and 304s for unchanged data."""
+
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        path = request.url.path
+        if request.method != "GET" or not path.startswith(CACHED_PREFIXES):
+            return await call_next(request)
+
+        # Results like streaks and goal windows also depend on the current day
+        today = datetime.now(UTC).date().isoformat()
+        query = "&".join(sorted(request.url.query.split("&")))
+        key = f"{path}?{query}|{data_version.token()}|{today}"
+        etag = _etag(key)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if _matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        cached = response_cache.get(key)
+        if cached is None:
+            response = await call_next(request)
+            if response.status_code != 200:
+                return response
+            body = b"".join([chunk async for chunk in response.body_iterator])
+            content_type = response.headers.get("content-type", "application/json")
+            extra = {
+                name: value
+                for name, value in response.headers.items()
+                if name.startswith("x-")
+            }
+            cached = CachedResponse(body, content_type, extra)
+            response_cache.put(key, cached)
+
+        headers.update(cached.extra_headers)
+        headers["Content-Type"] = cached.content_type
+        return Response(cached.body, headers=headers)
@@ -0,0 +1,81 @@
+"""Delta sync feed over the trigger-maintained change log.
+
+Each write to a synced table replaces that row's ``change_log`` entry with a
+new sequence number, so a device that last synced at ``N`` only needs the
+entries after ``N``: the current state of rows that changed and a tombstone
+for rows that were deleted. SQLite runs one write transaction at a time, so a
+committed sequence number is never followed by a smaller one committing later.
+"""
+
+from collections import defaultdict
+
+from sqlmodel import Session as DBSession, select
+
+from ..models.change import Change, ChangeFeed, ChangeLog
+from ..models.goal import Goal, GoalRead
+from ..models.session import Session, SessionRead
+from ..models.tag import Tag, TagRead
+
+# Feed entity -> (table model, read schema); session tags are keyed by their ids
+ENTITIES = {
+    "session": (Session, SessionRead),
+    "tag": (Tag, TagRead),
+    "goal": (Goal, GoalRead),
+}
+
+
+def _session_tag(key: str) -> dict:
+    session_id, tag_id = key.split(":")
+    return {"session_id": int(session_id), "tag_id": int(tag_id)}
+
+
+def _load(db: DBSession, entity: str, keys: list[str]) -> dict[str, dict]:
+    """Current state of the given rows, keyed like the change log."""
+    model, schema = ENTITIES[entity]
+    rows = db.exec(select(model).where(model.id.in_([int(k) for k in keys]))).all()
+    return {
+        str(row.id): schema.model_validate(row).model_dump(mode="json") for row in rows
+    }
+
+
+def changes_since(db: DBSession, since: int, limit: int) -> ChangeFeed:
+    """Changes with a sequence number above ``since``, oldest first."""
+    entries = db.exec(
+        select(ChangeLog)
+        .where(ChangeLog.seq > since)
+        .order_by(ChangeLog.seq)
+        .limit(limit + 1)
+    ).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    upserts = defaultdict(list)
+    for entry in entries:
+        if not entry.deleted and entry.entity in ENTITIES:
+            upserts[entry.entity].append(entry.key)
+    current = {entity: _load(db, entity, keys) for entity, keys in upserts.items()}
+
+    changes = []
+    for entry in entries:
+        if entry.deleted:
+            data = None
+        elif entry.entity == "session_tag":
+            data = _session_tag(entry.key)
+        else:
+            # Read in the same snapshot as the log, so the row is present
+            data = current[entry.entity].get(entry.key)
+        changes.append(
+            Change(
+                seq=entry.seq,
+                entity=entry.entity,
+                key=entry.key,
+                op="delete" if data is None else "upsert",
+                data=data,
+            )
+        )
+
+    return ChangeFeed(
+        changes=changes,
+        last_seq=entries[-1].seq if entries else since,
+        has_more=has_more,
+    )
@@ -0,0 +1,106 @@
+"""Columnar (Parquet and Arrow IPC) session exports.
+
+Sessions are written in typed record batches with the low-cardinality text
+columns dictionary-encoded, so analytics tools can load an export without
+parsing text. Requires the optional ``pyarrow`` package.
+"""
+
+import io
+from itertools import islice
+from typing import Iterable, Iterator
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pq = None
+
+from ..models.session import Session
+
+# Rows per record batch (and Parquet row group)
+BATCH_SIZE = 8192
+
+FORMATS = {
+    "parquet": ("application/vnd.apache.parquet", "mindfulness-sessions.parquet"),
+    "arrow": (
+        "application/vnd.apache.arrow.stream",
+        "mindfulness-sessions.arrows",
+    ),
+}
+
+
+def available() -> bool:
+    """Whether pyarrow is installed."""
+    return pa is not None
+
+
+def session_schema() -> "pa.Schema":
+    """Arrow schema of an exported session."""
+    labels = pa.dictionary(pa.int32(), pa.string())
+    timestamp = pa.timestamp("us", tz="UTC")
+    return pa.schema(
+        [
+            ("id", pa.int64()),
+            ("started_at", timestamp),
+            ("ended_at", timestamp),
+            ("planned_duration_seconds", pa.int32()),
+            ("actual_duration_seconds", pa.int32()),
+            ("completed", pa.bool_()),
+            ("visual_type", labels),
+            ("mood_before", labels),
+            ("mood_after", labels),
+            ("note", pa.string()),
+        ]
+    )
+
+
+def _record_batch(sessions: list[Session], schema: "pa.Schema") -> "pa.RecordBatch":
+    columns = [
+        pa.array([getattr(s, field.name) for s in sessions], type=field.type)
+        for field in schema
+    ]
+    return pa.record_batch(columns, schema=schema)
+
+
+class ChunkSink(io.RawIOBase):
+    """Write-only file that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        self._parts: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def export_columnar(sessions: Iterable[Session], fmt: str) -> Iterator[bytes]:
+    """Export sessions as a Parquet file or an Arrow IPC stream, batch by batch."""
+    schema = session_schema()
+    sink = ChunkSink()
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    elif fmt == "arrow":
+        writer = pa.ipc.new_stream(sink, schema)
+    else:
+        raise ValueError(f"Unknown columnar format: {fmt}")
+
+    sessions = iter(sessions)
+    with writer:
+        while batch := list(islice(sessions, BATCH_SIZE)):
+            writer.write_batch(_record_batch(batch, schema))
+            if data := sink.drain():
+                yield data
+    yield sink.drain()
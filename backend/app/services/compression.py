@@ -0,0 +1,66 @@
+"""Streaming compression for export downloads.
+
+gzip always works (zlib is in the standard library); zstd is offered only when
+the optional ``zstandard`` package is installed. The first chunk of a stream is
+flushed right away so clients still get their first byte immediately.
+"""
+
+import zlib
+from typing import Iterable, Iterator, Optional
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# Preferred first when a client accepts several
+ENCODINGS = ("zstd", "gzip") if zstandard else ("gzip",)
+FILE_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+MEDIA_TYPES = {"gzip": "application/gzip", "zstd": "application/zstd"}
+
+
+def accepted_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the best supported encoding from an Accept-Encoding header."""
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        params = params.strip()
+        try:
+            q = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            q = 0.0
+        weights[name.strip().lower()] = q
+
+    def weight(name: str) -> float:
+        return weights.get(name, weights.get("*", 0.0))
+
+    best = max(ENCODINGS, key=weight)
+    return best if weight(best) > 0 else None
+
+
+def _compressor(encoding: str):
+    """Return a compressor object and its flush mode for ending a block."""
+    if encoding == "gzip":
+        # wbits=31 writes the gzip header and trailer
+        return zlib.compressobj(6, zlib.DEFLATED, 31), zlib.Z_SYNC_FLUSH
+    if encoding == "zstd" and zstandard:
+        compressor = zstandard.ZstdCompressor(level=3).compressobj()
+        return compressor, zstandard.COMPRESSOBJ_FLUSH_BLOCK
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def compress(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """Compress a stream of chunks, flushing after the first one."""
+    compressor, flush_block = _compressor(encoding)
+    first = True
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if first:
+            data += compressor.flush(flush_block)
+            first = False
+        if data:
+            yield data
+    yield compressor.flush()
@@ -1,11 +1,28 @@
 """Discord webhook service for notifications."""
 
+import logging
 from datetime import datetime
 from typing import Optional
 
 import httpx
+from sqlmodel import Session as DBSession
 
 from ..models.session import Session
+from . import outbox
+from .outbound import outbound
+from .writer import writer
+
+logger = logging.getLogger(__name__)
+
+# Streak lengths worth announcing, and how they are named
+STREAK_MILESTONES = {
+    7: "1 Week",
+    14: "2 Weeks",
+    30: "1 Month",
+    60: "2 Months",
+    100: "100 Days",
+    365: "1 Year",
+}
 
 
 class DiscordService:
@@ -23,7 +40,7 @@ class DiscordService:
         message: str,
         embed: Optional[dict] = None,
     ) -> bool:
-        """Send a message to the Discord webhook."""
+        """Send a message to the Discord webhook right away, without retries."""
         if not self.webhook_url:
             return False
 
@@ -32,18 +49,38 @@ class DiscordService:
             payload["embeds"] = [embed]
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.webhook_url,
-                    json=payload,
-                    headers={"Content-Type": "application/json"},
-                )
-                return response.status_code in (200, 204)
-        except Exception:
+            response = await outbound.post(
+                self.webhook_url,
+                json=payload,
+                headers={"Content-Type": "application/json"},
+            )
+            return response.status_code in (200, 204)
+        except httpx.HTTPError as e:
+            logger.warning(f"Discord webhook failed: {e}")
             return False
 
-    async def notify_session_complete(self, session: Session) -> bool:
-        """Notify when a meditation session is completed."""
+    def enqueue(
+        self, db: DBSession, embed: Optional[dict] = None, message: str = ""
+    ) -> bool:
+        """Add a message to the outbox in the caller's transaction.
+
+        Returns False if no webhook is set. The dispatcher only sees the message
+        once the caller commits, so wake it afterwards.
+        """
+        if not self.webhook_url:
+            return False
+        outbox.enqueue(db, self.webhook_url, embed, message)
+        return True
+
+    async def queue(self, embed: Optional[dict] = None, message: str = "") -> bool:
+        """Queue a message in the durable outbox; False if no webhook is set."""
+        queued = await writer.run_async(lambda db: self.enqueue(db, embed, message))
+        if queued:
+            outbox.dispatcher.wake()
+        return queued
+
+    def session_complete_embed(self, session: Session) -> dict:
+        """Embed announcing a completed meditation session."""
         duration_min = (session.actual_duration_seconds or 0) // 60
 
         embed = {
@@ -75,29 +112,29 @@ class DiscordService:
                 }
             )
 
-        return await self.send_webhook("", embed)
+        return embed
 
-    async def notify_streak_milestone(self, streak: int) -> bool:
-        """Notify when a streak milestone is reached."""
-        milestones = {
-            7: "1 Week",
-            14: "2 Weeks",
-            30: "1 Month",
-            60: "2 Months",
-            100: "100 Days",
-        }
-        milestone_name = milestones.get(streak)
+    def streak_milestone_embed(self, streak: int) -> Optional[dict]:
+        """Embed announcing a streak milestone; None if the streak isn't one."""
+        milestone_name = STREAK_MILESTONES.get(streak)
 
         if not milestone_name:
-            return False
+            return None
 
-        embed = {
+        return {
             "title": f"🔥 Streak Milestone: {milestone_name}!",
             "description": f"You've meditated for {streak} days in a row!",
             "color": 0xF59E0B,  # Amber
         }
 
-        return await self.send_webhook("", embed)
+    def goal_reached_embed(self, goal_type: str, target_value: int) -> dict:
+        """Embed announcing that a goal's target was reached."""
+        period, _, metric = goal_type.partition("_")
+        return {
+            "title": "🎯 Goal Reached!",
+            "description": f"{period.capitalize()} goal of {target_value} {metric} met.",
+            "color": 0x10B981,  # Green
+        }
 
     async def send_weekly_summary(self, stats: dict) -> bool:
         """Send a weekly meditation summary."""
@@ -123,7 +160,7 @@ class DiscordService:
             ],
         }
 
-        return await self.send_webhook("", embed)
+        return await self.queue(embed)
 
 
 # Global instance (webhook URL loaded from config/env)
@@ -0,0 +1,70 @@
+"""In-process event bus for reacting to writes off the request path.
+
+Routes publish an event once their write has committed. Every subscriber runs
+as its own task on the event loop, so slow reactions (webhooks, goal checks)
+neither delay the response nor hold each other up; failures are logged.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, NamedTuple
+
+from ..models.goal import GoalProgress
+from ..models.session import Session
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Any], Awaitable[None]]
+
+
+class SessionCompleted(NamedTuple):
+    """A session was marked completed."""
+
+    session: Session
+    # Current streak right after the completion committed
+    streak: int
+    # Whether this completion made its day count towards the streak
+    streak_extended: bool
+    # Goals whose target this completion crossed
+    goals_reached: tuple[GoalProgress, ...] = ()
+
+
+class EventBus:
+    """Dispatches published events to the async handlers subscribed to them."""
+
+    def __init__(self):
+        self._subscribers: dict[type, list[Handler]] = defaultdict(list)
+        self._tasks: set[asyncio.Task] = set()
+
+    def subscribe(self, event_type: type) -> Callable[[Handler], Handler]:
+        """Decorator registering a handler for an event type."""
+
+        def register(handler: Handler) -> Handler:
+            self._subscribers[event_type].append(handler)
+            return handler
+
+        return register
+
+    def publish(self, event: Any) -> None:
+        """Start every subscriber of the event; must be called on the loop."""
+        loop = asyncio.get_running_loop()
+        for handler in self._subscribers[type(event)]:
+            task = loop.create_task(self._run(handler, event))
+            # Hold a reference until the task is done so it isn't collected
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, handler: Handler, event: Any) -> None:
+        try:
+            await handler(event)
+        except Exception:
+            logger.exception(f"{handler.__name__} failed on {type(event).__name__}")
+
+    async def drain(self) -> None:
+        """Wait for all running handlers, including ones they publish."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+bus = EventBus()
@@ -1,89 +1,191 @@
-"""Export service for generating data exports in various formats."""
+"""Export service for generating data exports in various formats.
+
+Every exporter is a generator over an iterable of sessions that yields the
+document piece by piece, so an export never has to be held in memory and can
+be streamed to the client as the rows come off the database cursor.
+"""
 
 import csv
-import io
 import json
-from datetime import datetime
-from typing import List
+import textwrap
+from datetime import UTC, datetime, timedelta
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional
+
+from sqlmodel import Session as DBSession, select
 
+from ..database import engine
 from ..models.session import Session
+from . import aggregates, columnar
 
+# Chunks are coalesced up to this size before being handed to the response
+CHUNK_SIZE = 64 * 1024
 
-def export_json(sessions: List[Session], stats: dict) -> str:
-    """Export all data as JSON."""
-    data = {
-        "exported_at": datetime.utcnow().isoformat(),
-        "stats": stats,
-        "sessions": [
-            {
-                "id": s.id,
-                "started_at": s.started_at.isoformat() if s.started_at else None,
-                "ended_at": s.ended_at.isoformat() if s.ended_at else None,
-                "planned_duration_seconds": s.planned_duration_seconds,
-                "actual_duration_seconds": s.actual_duration_seconds,
-                "completed": s.completed,
-                "visual_type": s.visual_type,
-                "mood_before": s.mood_before,
-                "mood_after": s.mood_after,
-                "note": s.note,
-            }
-            for s in sessions
-        ],
+# Rows fetched from the cursor per round trip while streaming
+YIELD_PER = 500
+
+
+def parse_bound(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO date bound, treating values without an offset as UTC."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=UTC)
+
+
+def stream_sessions(
+    from_date: Optional[str],
+    to_date: Optional[str],
+    completed_only: bool = True,
+) -> Iterator[Session]:
+    """Yield sessions in a date range, newest first, from a cursor.
+
+    Only completed sessions unless ``completed_only`` is False. Opens its own
+    database session because it is consumed while the response streams,
+    after the request's dependencies may already have been closed.
+    """
+    query = select(Session)
+    if completed_only:
+        query = query.where(Session.completed == True)
+
+    start, end = parse_bound(from_date), parse_bound(to_date)
+    if start:
+        query = query.where(Session.started_at >= start)
+    if end:
+        query = query.where(Session.started_at <= end)
+
+    query = query.order_by(Session.started_at.desc())
+    with DBSession(engine) as db:
+        yield from db.exec(query.execution_options(yield_per=YIELD_PER))
+
+
+def export_stats(
+    db: DBSession,
+    from_date: Optional[str],
+    to_date: Optional[str],
+) -> dict:
+    """Calculate stats for the same date range as the exported sessions."""
+    start = parse_bound(from_date)
+    # The export range is inclusive of `to`, aggregates take an exclusive end
+    end = parse_bound(to_date) + timedelta(microseconds=1) if to_date else None
+    totals = aggregates.completed_totals(db, start, end)
+    return {
+        "total_sessions": totals.sessions,
+        "total_minutes": totals.minutes,
     }
-    return json.dumps(data, indent=2, ensure_ascii=False)
 
 
-def export_csv(sessions: List[Session]) -> str:
-    """Export sessions as CSV."""
-    output = io.StringIO()
-    writer = csv.writer(output)
+def buffered(pieces: Iterable[str], chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Coalesce small pieces into chunks; the first piece is sent immediately."""
+    pieces = iter(pieces)
+    for piece in pieces:
+        yield piece.encode()
+        break
 
-    # Header
-    writer.writerow(
-        [
-            "id",
-            "started_at",
-            "ended_at",
-            "planned_duration_min",
-            "actual_duration_min",
-            "completed",
-            "visual_type",
-            "mood_before",
-            "mood_after",
-            "note",
-        ]
+    buffer: list[str] = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield "".join(buffer).encode()
+            buffer.clear()
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode()
+
+
+def session_record(s: Session) -> dict:
+    """The JSON representation of a single session."""
+    return {
+        "id": s.id,
+        "started_at": s.started_at.isoformat() if s.started_at else None,
+        "ended_at": s.ended_at.isoformat() if s.ended_at else None,
+        "planned_duration_seconds": s.planned_duration_seconds,
+        "actual_duration_seconds": s.actual_duration_seconds,
+        "completed": s.completed,
+        "visual_type": s.visual_type,
+        "mood_before": s.mood_before,
+        "mood_after": s.mood_after,
+        "note": s.note,
+    }
+
+
+def export_json(sessions: Iterable[Session], stats: dict) -> Iterator[str]:
+    """Export all data as JSON."""
+    header = json.dumps(
+        {"exported_at": datetime.utcnow().isoformat(), "stats": stats},
+        indent=2,
+        ensure_ascii=False,
     )
+    # Reopen the header object to append the sessions array
+    yield header[:-2] + ',\n  "sessions": ['
 
-    # Data rows
+    separator = "\n"
     for s in sessions:
-        writer.writerow(
-            [
-                s.id,
-                s.started_at.isoformat() if s.started_at else "",
-                s.ended_at.isoformat() if s.ended_at else "",
-                s.planned_duration_seconds // 60 if s.planned_duration_seconds else "",
-                s.actual_duration_seconds // 60 if s.actual_duration_seconds else "",
-                "Yes" if s.completed else "No",
-                s.visual_type or "",
-                s.mood_before or "",
-                s.mood_after or "",
-                s.note or "",
-            ]
-        )
-
-    return output.getvalue()
-
-
-def export_ical(sessions: List[Session]) -> str:
-    """Export sessions as iCal format."""
-    lines = [
-        "BEGIN:VCALENDAR",
-        "VERSION:2.0",
-        "PRODID:-//Mindfulness App//EN",
-        "CALSCALE:GREGORIAN",
-        "METHOD:PUBLISH",
+        record = json.dumps(session_record(s), indent=2, ensure_ascii=False)
+        yield separator + textwrap.indent(record, "    ")
+        separator = ",\n"
+
+    yield "\n  ]\n}" if separator == ",\n" else "]\n}"
+
+
+CSV_HEADER = [
+    "id",
+    "started_at",
+    "ended_at",
+    "planned_duration_min",
+    "actual_duration_min",
+    "completed",
+    "visual_type",
+    "mood_before",
+    "mood_after",
+    "note",
+]
+
+
+class _Echo:
+    """File-like object whose write returns the line for csv.writer."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def csv_row(s: Session) -> list:
+    """The CSV columns of a single session."""
+    return [
+        s.id,
+        s.started_at.isoformat() if s.started_at else "",
+        s.ended_at.isoformat() if s.ended_at else "",
+        s.planned_duration_seconds // 60 if s.planned_duration_seconds else "",
+        s.actual_duration_seconds // 60 if s.actual_duration_seconds else "",
+        "Yes" if s.completed else "No",
+        s.visual_type or "",
+        s.mood_before or "",
+        s.mood_after or "",
+        s.note or "",
     ]
 
+
+def export_csv(sessions: Iterable[Session]) -> Iterator[str]:
+    """Export sessions as CSV."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADER)
+    for s in sessions:
+        yield writer.writerow(csv_row(s))
+
+
+def export_ical(sessions: Iterable[Session]) -> Iterator[str]:
+    """Export sessions as iCal format."""
+    yield "\r\n".join(
+        [
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            "PRODID:-//Mindfulness App//EN",
+            "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH",
+        ]
+    )
+
     for s in sessions:
         if not s.started_at:
             continue
@@ -91,61 +193,96 @@ def export_ical(sessions: List[Session]) -> str:
         duration_min = (s.actual_duration_seconds or s.planned_duration_seconds) // 60
         end_time = s.ended_at or s.started_at
 
-        lines.extend(
-            [
-                "BEGIN:VEVENT",
-                f"UID:mindfulness-{s.id}@app",
-                f"DTSTART:{s.started_at.strftime('%Y%m%dT%H%M%SZ')}",
-                f"DTEND:{end_time.strftime('%Y%m%dT%H%M%SZ')}",
-                f"SUMMARY:Meditation ({duration_min} min)",
-                f"DESCRIPTION:{s.note or 'Meditation session'}",
-                "STATUS:CONFIRMED" if s.completed else "STATUS:TENTATIVE",
-                "END:VEVENT",
-            ]
-        )
-
-    lines.append("END:VCALENDAR")
-    return "\r\n".join(lines)
-
-
-def export_markdown(sessions: List[Session]) -> str:
-    """Export as human-readable markdown journal."""
-    lines = [
-        "# Mindfulness Journal",
-        "",
-        f"*Exported on {datetime.utcnow().strftime('%Y-%m-%d')}*",
-        "",
-    ]
+        lines = [
+            "BEGIN:VEVENT",
+            f"UID:mindfulness-{s.id}@app",
+            f"DTSTART:{s.started_at.strftime('%Y%m%dT%H%M%SZ')}",
+            f"DTEND:{end_time.strftime('%Y%m%dT%H%M%SZ')}",
+            f"SUMMARY:Meditation ({duration_min} min)",
+            f"DESCRIPTION:{s.note or 'Meditation session'}",
+            "STATUS:CONFIRMED" if s.completed else "STATUS:TENTATIVE",
+            "END:VEVENT",
+        ]
+        yield "\r\n" + "\r\n".join(lines)
 
-    # Group by date
-    by_date: dict = {}
+    yield "\r\nEND:VCALENDAR"
+
+
+def export_markdown(sessions: Iterable[Session]) -> Iterator[str]:
+    """Export as human-readable markdown journal.
+
+    Sessions must arrive newest first; a heading is written whenever the day
+    changes, so days are never buffered.
+    """
+    yield "\n".join(
+        [
+            "# Mindfulness Journal",
+            "",
+            f"*Exported on {datetime.utcnow().strftime('%Y-%m-%d')}*",
+            "",
+        ]
+    )
+
+    current_date = None
     for s in sessions:
         if not s.started_at:
             continue
         date_str = s.started_at.strftime("%Y-%m-%d")
-        if date_str not in by_date:
-            by_date[date_str] = []
-        by_date[date_str].append(s)
+        lines = []
+        if date_str != current_date:
+            current_date = date_str
+            lines += [f"## {date_str}", ""]
 
-    for date_str in sorted(by_date.keys(), reverse=True):
-        lines.append(f"## {date_str}")
-        lines.append("")
+        duration_min = (s.actual_duration_seconds or s.planned_duration_seconds) // 60
+        time_str = s.started_at.strftime("%H:%M")
+        status = "✓" if s.completed else "○"
 
-        for s in by_date[date_str]:
-            duration_min = (
-                s.actual_duration_seconds or s.planned_duration_seconds
-            ) // 60
-            time_str = s.started_at.strftime("%H:%M")
-            status = "✓" if s.completed else "○"
-
-            lines.append(f"### {time_str} - {duration_min} min {status}")
-            if s.visual_type:
-                lines.append(f"*Visual: {s.visual_type}*")
-            if s.mood_after:
-                lines.append(f"*Mood: {s.mood_after}*")
-            if s.note:
-                lines.append("")
-                lines.append(s.note)
+        lines.append(f"### {time_str} - {duration_min} min {status}")
+        if s.visual_type:
+            lines.append(f"*Visual: {s.visual_type}*")
+        if s.mood_after:
+            lines.append(f"*Mood: {s.mood_after}*")
+        if s.note:
             lines.append("")
+            lines.append(s.note)
+        lines.append("")
+        yield "\n" + "\n".join(lines)
+
+
+class ExportFormat(NamedTuple):
+    media_type: str
+    filename: str
+    # Renders (sessions, stats) into encoded chunks
+    render: Callable[[Iterable[Session], dict], Iterator[bytes]]
+
 
-    return "\n".join(lines)
+FORMATS: dict[str, ExportFormat] = {
+    "json": ExportFormat(
+        "application/json",
+        "mindfulness-export.json",
+        lambda sessions, stats: buffered(export_json(sessions, stats)),
+    ),
+    "csv": ExportFormat(
+        "text/csv",
+        "mindfulness-sessions.csv",
+        lambda sessions, stats: buffered(export_csv(sessions)),
+    ),
+    "ical": ExportFormat(
+        "text/calendar",
+        "mindfulness.ics",
+        lambda sessions, stats: buffered(export_ical(sessions)),
+    ),
+    "markdown": ExportFormat(
+        "text/markdown",
+        "mindfulness-journal.md",
+        lambda sessions, stats: buffered(export_markdown(sessions)),
+    ),
+    "parquet": ExportFormat(
+        *columnar.FORMATS["parquet"],
+        lambda sessions, stats: columnar.export_columnar(sessions, "parquet"),
+    ),
+    "arrow": ExportFormat(
+        *columnar.FORMATS["arrow"],
+        lambda sessions, stats: columnar.export_columnar(sessions, "arrow"),
+    ),
+}
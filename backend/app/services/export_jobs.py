@@ -0,0 +1,288 @@
+"""Background export jobs with an on-disk artifact cache.
+
+A job renders an export in a worker thread into a file, so the HTTP request
+that asked for it returns immediately and the download is served from disk
+(with Range support) instead of holding a database connection while a slow
+client reads. Finished files are cached by (format, range, compression, data
+version); asking again for unchanged data returns the cached file at once.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Iterable, Iterator, Literal, Optional
+
+from pydantic import BaseModel, Field, computed_field, field_validator
+from sqlmodel import Session as DBSession
+
+from ..config import get_config
+from ..database import PROJECT_ROOT, engine
+from . import columnar, compression
+from .cache import data_version
+from .export import FORMATS, export_stats, stream_sessions
+
+logger = logging.getLogger(__name__)
+
+JobStatus = Literal["pending", "running", "completed", "failed"]
+
+# Names of the files the artifact cache owns in its directory
+ARTIFACT_SUFFIX = ".export"
+RENDER_PREFIX = ".render-"
+
+
+class ExportJobCreate(BaseModel):
+    """Schema for requesting an export job."""
+
+    format: str = "json"
+    from_date: Optional[str] = None
+    to_date: Optional[str] = None
+    compress: Optional[str] = None
+
+    @field_validator("compress")
+    @classmethod
+    def _none_means_uncompressed(cls, value: Optional[str]) -> Optional[str]:
+        return None if value in ("", "none") else value
+
+
+class ExportJob(BaseModel):
+    """State of a background export."""
+
+    id: str
+    format: str
+    from_date: Optional[str] = None
+    to_date: Optional[str] = None
+    compress: Optional[str] = None
+    status: JobStatus = "pending"
+    cached: bool = False
+    rows_done: int = 0
+    rows_total: int = 0
+    size_bytes: int = 0
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    finished_at: Optional[datetime] = None
+    key: str = Field(exclude=True)
+
+    @computed_field
+    @property
+    def progress_percent(self) -> float:
+        if self.status == "completed":
+            return 100.0
+        if not self.rows_total:
+            return 0.0
+        return round(min(100.0, self.rows_done / self.rows_total * 100), 1)
+
+    @property
+    def filename(self) -> str:
+        name = FORMATS[self.format].filename
+        return name + compression.FILE_SUFFIXES.get(self.compress or "", "")
+
+    @property
+    def media_type(self) -> str:
+        if self.compress:
+            return compression.MEDIA_TYPES[self.compress]
+        return FORMATS[self.format].media_type
+
+
+class ArtifactCache:
+    """Size-bounded LRU of rendered export files in one directory."""
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, Path] = OrderedDict()
+        self._sizes: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def clear(self) -> int:
+        """Delete files left by a previous process; returns how many.
+
+        Keys embed a per-process data version, so old files can never match.
+        Only names this cache writes are touched, in case the directory is
+        shared.
+        """
+        if not self.directory.is_dir():
+            return 0
+        removed = 0
+        for pattern in (f"*{ARTIFACT_SUFFIX}", f"{RENDER_PREFIX}*.part"):
+            for leftover in self.directory.glob(pattern):
+                if leftover.is_file():
+                    leftover.unlink(missing_ok=True)
+                    removed += 1
+        return removed
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self._sizes.values())
+
+    def get(self, key: str) -> Optional[Path]:
+        """Return the cached file for a key and mark it recently used."""
+        with self._lock:
+            path = self._entries.get(key)
+            if path is None:
+                return None
+            if not path.exists():
+                self._forget(key)
+                return None
+            self._entries.move_to_end(key)
+            return path
+
+    def temp_file(self):
+        """Open a scratch file in the cache directory for rendering into."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return tempfile.NamedTemporaryFile(
+            dir=self.directory, prefix=RENDER_PREFIX, suffix=".part", delete=False
+        )
+
+    def put(self, key: str, rendered: Path) -> Path:
+        """Move a rendered file into the cache and evict down to the size limit."""
+        path = self.directory / f"{key}{ARTIFACT_SUFFIX}"
+        os.replace(rendered, path)
+        with self._lock:
+            self._entries[key] = path
+            self._sizes[key] = path.stat().st_size
+            self._entries.move_to_end(key)
+            # Never evict the entry just added, even if it alone is too big
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                oldest = next(iter(self._entries))
+                self._entries[oldest].unlink(missing_ok=True)
+                self._forget(oldest)
+        return path
+
+    def _forget(self, key: str) -> None:
+        self._entries.pop(key, None)
+        self._sizes.pop(key, None)
+
+
+def _counted(sessions: Iterable, job: ExportJob) -> Iterator:
+    for session in sessions:
+        job.rows_done += 1
+        yield session
+
+
+class ExportJobManager:
+    """Run export jobs on a small worker pool and track their progress."""
+
+    def __init__(self, cache: ArtifactCache, workers: int = 2, max_jobs: int = 100):
+        self.cache = cache
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="export"
+        )
+        self._jobs: OrderedDict[str, ExportJob] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def artifact_key(self, request: ExportJobCreate) -> str:
+        """Cache key for a request against the current data version."""
+        parts = [
+            request.format,
+            request.from_date or "",
+            request.to_date or "",
+            request.compress or "",
+            data_version.token(),
+        ]
+        return hashlib.sha256("|".join(parts).encode()).hexdigest()[:32]
+
+    def submit(self, request: ExportJobCreate) -> ExportJob:
+        """Start a job, or reuse a cached artifact or identical running job."""
+        key = self.artifact_key(request)
+        with self._lock:
+            for job in self._jobs.values():
+                if job.key == key and job.status in ("pending", "running"):
+                    return job
+
+            job = ExportJob(id=uuid.uuid4().hex, key=key, **request.model_dump())
+            cached = self.cache.get(key)
+            if cached is not None:
+                job.status = "completed"
+                job.cached = True
+                job.size_bytes = cached.stat().st_size
+                job.finished_at = job.created_at
+            else:
+                self._executor.submit(self._run, job)
+
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+        return job
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        return self._jobs.get(job_id)
+
+    def artifact(self, job: ExportJob) -> Optional[Path]:
+        """Path of a finished job's file, or None if it was evicted."""
+        if job.status != "completed":
+            return None
+        return self.cache.get(job.key)
+
+    def start(self) -> None:
+        """Clear artifacts a previous process left behind."""
+        removed = self.cache.clear()
+        if removed:
+            logger.info(f"Removed {removed} stale export files")
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: ExportJob) -> None:
+        job.status = "running"
+        scratch = None
+        try:
+            with DBSession(engine) as db:
+                stats = export_stats(db, job.from_date, job.to_date)
+            job.rows_total = stats["total_sessions"]
+
+            sessions = _counted(stream_sessions(job.from_date, job.to_date), job)
+            chunks = FORMATS[job.format].render(sessions, stats)
+            if job.compress:
+                chunks = compression.compress(chunks, job.compress)
+
+            with self.cache.temp_file() as scratch:
+                for chunk in chunks:
+                    scratch.write(chunk)
+            path = self.cache.put(job.key, Path(scratch.name))
+            job.size_bytes = path.stat().st_size
+            job.status = "completed"
+        except Exception as e:
+            logger.error(f"Export job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = "failed"
+            if scratch is not None:
+                Path(scratch.name).unlink(missing_ok=True)
+        finally:
+            job.finished_at = datetime.now(UTC)
+
+
+def validate(request: ExportJobCreate) -> Optional[str]:
+    """Return why a job request can't be served, or None if it can."""
+    if request.format not in FORMATS:
+        return f"Unknown export format: {request.format}"
+    if request.format in columnar.FORMATS and not columnar.available():
+        return f"{request.format.title()} export requires pyarrow"
+    if request.compress and request.compress not in compression.ENCODINGS:
+        return f"Unsupported compression: {request.compress}"
+    return None
+
+
+def _cache_directory(settings: dict) -> Path:
+    directory = Path(
+        os.environ.get("MINDFULNESS_EXPORT_DIR")
+        or settings.get("cache_dir", "./backend/data/exports")
+    )
+    return directory if directory.is_absolute() else PROJECT_ROOT / directory
+
+
+_settings = get_config().get("export", {})
+export_jobs = ExportJobManager(
+    ArtifactCache(
+        _cache_directory(_settings),
+        max_bytes=_settings.get("cache_max_mb", 512) * 1024 * 1024,
+    ),
+    workers=_settings.get("job_workers", 2),
+)
@@ -0,0 +1,264 @@
+"""Bulk import of sessions from the app's own JSON and CSV exports.
+
+Uploads are parsed incrementally: JSON objects are decoded one at a time from
+the ``sessions`` array, CSV rows come off ``csv.DictReader``. Rows are inserted
+in chunks with ``INSERT OR IGNORE`` through the write coordinator, so sessions
+already present (same started_at and planned duration, enforced by a unique
+index) are skipped. Daily rollups and streaks are rebuilt once at the end.
+"""
+
+import asyncio
+import codecs
+import csv
+import io
+import json
+import queue
+import re
+import time
+from datetime import UTC, datetime
+from itertools import islice
+from typing import BinaryIO, Iterator, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import insert
+from sqlmodel import Session as DBSession
+
+from ..models.session import Session
+from . import rollup
+from .writer import writer
+
+# Rows per INSERT executemany (and per write transaction)
+INSERT_CHUNK = 1000
+READ_SIZE = 64 * 1024
+MAX_REPORTED_ERRORS = 10
+
+_SESSIONS_ARRAY = re.compile(r'"sessions"\s*:\s*\[')
+_WHITESPACE = re.compile(r"[\s,]*")
+
+
+class InvalidImport(ValueError):
+    """The upload can't be parsed as the requested format."""
+
+
+class ImportReport(BaseModel):
+    """Outcome of a bulk import."""
+
+    format: str
+    rows_read: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    errors: list[str] = []
+    seconds: float = 0.0
+    rows_per_second: float = 0.0
+
+
+class UploadPipe(io.RawIOBase):
+    """Blocking reader over body chunks pushed from the event loop.
+
+    The request body is fed in on the loop while the parser reads from a
+    worker thread, so parsing and inserting overlap with the upload and only
+    a few chunks are ever held in memory.
+    """
+
+    def __init__(self, max_chunks: int = 16):
+        self._chunks: queue.Queue[bytes] = queue.Queue(maxsize=max_chunks)
+        self._pending = b""
+        self._eof = False
+        self.abandoned = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending and not self._eof:
+            self._pending = self._chunks.get()
+            # An empty chunk marks the end of the body
+            self._eof = not self._pending
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    async def feed(self, chunk: bytes) -> None:
+        """Queue a body chunk, waiting off the loop while the reader catches up."""
+        if not chunk or self.abandoned:
+            return
+        try:
+            self._chunks.put_nowait(chunk)
+        except queue.Full:
+            await asyncio.to_thread(self._put, chunk)
+
+    async def finish(self) -> None:
+        """Signal the end of the body."""
+        await asyncio.to_thread(self._put, b"")
+
+    def _put(self, chunk: bytes) -> None:
+        while not self.abandoned:
+            try:
+                self._chunks.put(chunk, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+
+# --- Incremental parsers ------------------------------------------------------
+
+
+def _text_chunks(stream: BinaryIO) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    while chunk := stream.read(READ_SIZE):
+        yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
+
+
+def iter_json_records(stream: BinaryIO) -> Iterator[dict]:
+    """Yield session objects from a JSON export or a bare JSON array."""
+    decoder = json.JSONDecoder()
+    chunks = _text_chunks(stream)
+    buffer = ""
+
+    def more() -> bool:
+        """Append the next chunk to the buffer; False at the end of input."""
+        nonlocal buffer
+        for chunk in chunks:
+            buffer += chunk
+            if chunk:
+                return True
+        return False
+
+    # Find the start of the sessions array
+    position = None
+    while position is None:
+        stripped = buffer.lstrip()
+        if stripped.startswith("["):
+            position = len(buffer) - len(stripped) + 1
+        elif match := _SESSIONS_ARRAY.search(buffer):
+            position = match.end()
+        elif not more():
+            raise InvalidImport("No sessions array found")
+
+    while True:
+        position = _WHITESPACE.match(buffer, position).end()
+        if position >= len(buffer):
+            if not more():
+                raise InvalidImport("Unexpected end of JSON input")
+            continue
+        if buffer[position] == "]":
+            return
+        try:
+            record, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as e:
+            # Most likely the object continues in the next chunk
+            if more():
+                continue
+            raise InvalidImport(f"Invalid JSON: {e}") from e
+        if not isinstance(record, dict):
+            raise InvalidImport("Sessions must be JSON objects")
+        yield record
+        # Drop what has been consumed so the buffer stays small
+        buffer, position = buffer[end:], 0
+
+
+def iter_csv_records(stream: BinaryIO) -> Iterator[dict]:
+    """Yield rows of a CSV export as dicts keyed by header."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        yield from csv.DictReader(text)
+    finally:
+        # Leave the underlying upload open for the caller
+        text.detach()
+
+
+PARSERS = {"json": iter_json_records, "csv": iter_csv_records}
+
+
+# --- Row conversion -------------------------------------------------------------
+
+
+def _timestamp(value) -> Optional[datetime]:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=UTC)
+
+
+def _seconds(record: dict, field: str) -> Optional[int]:
+    """Duration from `<field>_seconds`, or from the CSV's `<field>_min`."""
+    seconds = record.get(f"{field}_seconds")
+    if seconds not in (None, ""):
+        return int(seconds)
+    minutes = record.get(f"{field}_min")
+    if minutes not in (None, ""):
+        return int(minutes) * 60
+    return None
+
+
+def _completed(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("yes", "true", "1")
+    return bool(value)
+
+
+def to_row(record: dict, now: datetime) -> dict:
+    """Convert an exported session record into insertable column values."""
+    started_at = _timestamp(record.get("started_at"))
+    planned = _seconds(record, "planned_duration")
+    if started_at is None or planned is None:
+        raise ValueError("started_at and planned duration are required")
+    return {
+        "started_at": started_at,
+        "ended_at": _timestamp(record.get("ended_at")),
+        "planned_duration_seconds": planned,
+        "actual_duration_seconds": _seconds(record, "actual_duration"),
+        "completed": _completed(record.get("completed")),
+        "visual_type": record.get("visual_type") or None,
+        "mood_before": record.get("mood_before") or None,
+        "mood_after": record.get("mood_after") or None,
+        "note": record.get("note") or None,
+        "created_at": now,
+    }
+
+
+# --- Import -------------------------------------------------------------------
+
+
+def _insert_chunk(db: DBSession, rows: list[dict]) -> int:
+    result = db.execute(insert(Session.__table__).prefix_with("OR IGNORE"), rows)
+    return result.rowcount
+
+
+def import_sessions(stream: BinaryIO, fmt: str) -> ImportReport:
+    """Parse an upload and insert its sessions; blocks until committed."""
+    if fmt not in PARSERS:
+        raise InvalidImport(f"Unsupported import format: {fmt}")
+
+    report = ImportReport(format=fmt)
+    started = time.perf_counter()
+    now = datetime.now(UTC)
+
+    def rows() -> Iterator[dict]:
+        for record in PARSERS[fmt](stream):
+            report.rows_read += 1
+            try:
+                yield to_row(record, now)
+            except (TypeError, ValueError) as e:
+                report.invalid += 1
+                if len(report.errors) < MAX_REPORTED_ERRORS:
+                    report.errors.append(f"Row {report.rows_read}: {e}")
+
+    valid = rows()
+    try:
+        while chunk := list(islice(valid, INSERT_CHUNK)):
+            report.inserted += writer.run(lambda db: _insert_chunk(db, chunk))
+    except InvalidImport as e:
+        raise InvalidImport(f"{e} (after importing {report.inserted} sessions)")
+    finally:
+        if report.inserted:
+            writer.run(rollup.rebuild)
+
+    report.duplicates = report.rows_read - report.invalid - report.inserted
+    report.seconds = round(time.perf_counter() - started, 3)
+    if report.seconds:
+        report.rows_per_second = round(report.rows_read / report.seconds, 1)
+    return report
@@ -2,21 +2,123 @@
 
 Note: Requires GEMINI_API_KEY environment variable to be configured.
 The Gemini 2.0 Flash model supports audio generation.
+
+Tracks are stored content-addressed as ``<sha256>.mp3``, so identical audio
+is kept once and filenames never collide. The response is never held in
+memory whole: its text is scanned as it streams in, and the base64 audio
+string is decoded in small blocks straight into a temporary file that is
+renamed into place once complete.
 """
 
+import base64
+import binascii
+import hashlib
 import os
-import time
+import re
+import tempfile
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 import httpx
 
+from .outbound import outbound
+
+API_URL = (
+    "https://generativelanguage.googleapis.com/v1beta/models/"
+    "gemini-2.0-flash-exp:generateContent"
+)
+
+# The audio is the "data" string of the first "inlineData" part
+_INLINE_DATA = re.compile(r'"inlineData"\s*:\s*\{')
+_DATA_VALUE = re.compile(r'"data"\s*:\s*"')
+# Text kept between chunks while looking for a key split across them
+_SCAN_TAIL = 256
+
+
+def request_key(prompt: str, duration_seconds: int) -> str:
+    """Hash identifying generation requests that would produce the same track."""
+    normalized = re.sub(r"\s+", " ", prompt).strip().lower()
+    return hashlib.sha256(f"{duration_seconds}|{normalized}".encode()).hexdigest()
+
+
+class TrackWriter:
+    """Decodes base64 text in blocks into a temp file named by its digest."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        fd, self._temp = tempfile.mkstemp(dir=directory, suffix=".part")
+        self._file = os.fdopen(fd, "wb")
+        self._digest = hashlib.sha256()
+        self._pending = ""
+        self.size = 0
+
+    def write_bytes(self, audio: bytes) -> None:
+        self._file.write(audio)
+        self._digest.update(audio)
+        self.size += len(audio)
+
+    def write_base64(self, text: str) -> None:
+        """Decode the next piece of a base64 string; pieces may split anywhere."""
+        # JSON may escape "/" and wrap long strings with escaped newlines
+        text = self._pending + text.replace("\\/", "/").replace("\\n", "")
+        whole = len(text) - len(text) % 4
+        self._pending = text[whole:]
+        if whole:
+            self.write_bytes(base64.b64decode(text[:whole], validate=True))
+
+    def commit(self) -> str:
+        """Move the finished track into place; returns its filename."""
+        if self._pending:
+            raise ValueError("Truncated base64 audio")
+        self._file.close()
+        filename = f"{self._digest.hexdigest()}.mp3"
+        # Same digest, same audio: an existing file can simply be kept
+        os.replace(self._temp, self.directory / filename)
+        return filename
+
+    def discard(self) -> None:
+        self._file.close()
+        Path(self._temp).unlink(missing_ok=True)
+
+
+async def stream_inline_audio(chunks: AsyncIterator[str], track: TrackWriter) -> bool:
+    """Feed the first inline audio string of a streamed response into a track.
+
+    Returns False if the response has no inline audio.
+    """
+    buffer = ""
+    patterns = [_INLINE_DATA, _DATA_VALUE]
+    async for chunk in chunks:
+        buffer += chunk
+        while patterns:
+            match = patterns[0].search(buffer)
+            if match is None:
+                buffer = buffer[-_SCAN_TAIL:]
+                break
+            buffer = buffer[match.end() :]
+            patterns.pop(0)
+        if patterns:
+            continue
+
+        # Inside the string: base64 never contains a quote, so the next
+        # one ends it
+        end = buffer.find('"')
+        if end != -1:
+            track.write_base64(buffer[:end])
+            return True
+        # Hold back a trailing backslash; its escape continues in the next chunk
+        keep = 1 if buffer.endswith("\\") else 0
+        track.write_base64(buffer[: len(buffer) - keep])
+        buffer = buffer[len(buffer) - keep :]
+    return False
+
 
 class MusicGenService:
     """Service for AI music generation using Google Gemini."""
 
     def __init__(self):
         self.api_key = os.environ.get("GEMINI_API_KEY")
+        self.api_url = API_URL
         self.output_dir = Path("./sounds/music/generated")
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
@@ -28,58 +130,53 @@ class MusicGenService:
         if not self.api_key:
             return None
 
-        try:
-            full_prompt = f"""Generate ambient meditation music.
+        full_prompt = f"""Generate ambient meditation music.
 Style: {prompt}
 Duration: {duration_seconds} seconds
 Requirements: No vocals, slow tempo, calming, suitable for meditation and mindfulness practice.
 The music should help listeners relax and focus on their breathing."""
 
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                response = await client.post(
-                    f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key={self.api_key}",
-                    json={
-                        "contents": [{"parts": [{"text": full_prompt}]}],
-                        "generationConfig": {
-                            "response_mime_type": "audio/mp3",
-                        },
+        track = TrackWriter(self.output_dir)
+        try:
+            async with outbound.stream(
+                "POST",
+                self.api_url,
+                params={"key": self.api_key},
+                json={
+                    "contents": [{"parts": [{"text": full_prompt}]}],
+                    "generationConfig": {
+                        "response_mime_type": "audio/mp3",
                     },
-                )
-
+                },
+                # Audio generation takes far longer than the default timeout
+                timeout=120.0,
+            ) as response:
                 if response.status_code != 200:
-                    print(f"Gemini API error: {response.status_code} - {response.text}")
+                    error = (await response.aread())[:500].decode(errors="replace")
+                    print(f"Gemini API error: {response.status_code} - {error}")
                     return None
+                if not await stream_inline_audio(response.aiter_text(), track):
+                    return None
+            filename = track.commit()
+            track = None
+            return filename
 
-                data = response.json()
-
-                # Extract audio data from response
-                if "candidates" in data and len(data["candidates"]) > 0:
-                    candidate = data["candidates"][0]
-                    if "content" in candidate and "parts" in candidate["content"]:
-                        for part in candidate["content"]["parts"]:
-                            if "inlineData" in part:
-                                import base64
-
-                                audio_data = base64.b64decode(
-                                    part["inlineData"]["data"]
-                                )
-                                filename = f"meditation_{int(time.time())}.mp3"
-                                filepath = self.output_dir / filename
-
-                                with open(filepath, "wb") as f:
-                                    f.write(audio_data)
-
-                                return filename
-
-                return None
-
-        except Exception as e:
+        except (binascii.Error, ValueError, OSError, httpx.HTTPError) as e:
             print(f"Music generation error: {e}")
             return None
-
-    async def check_status(self, job_id: str) -> dict:
-        """Check the status of a generation job."""
-        return {"status": "not_implemented"}
+        finally:
+            if track is not None:
+                track.discard()
+
+    def store(self, audio: bytes) -> str:
+        """Save audio under its digest; returns the filename."""
+        track = TrackWriter(self.output_dir)
+        track.write_bytes(audio)
+        return track.commit()
+
+    def has_track(self, filename: str) -> bool:
+        """Whether a generated track is still on disk."""
+        return bool(filename) and (self.output_dir / filename).is_file()
 
 
 # Global instance
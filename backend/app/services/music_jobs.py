@@ -0,0 +1,140 @@
+"""Background queue for music generation jobs.
+
+Generation takes minutes, so ``POST /api/music/generate`` only inserts a
+pending ``GeneratedMusic`` row and queues its id. A fixed pool of worker
+tasks on the event loop picks jobs up, moves them through ``generating`` to
+``completed`` or ``failed`` and records the filename or error. Jobs left
+pending or mid-generation by a restart are queued again on startup.
+"""
+
+import asyncio
+import contextlib
+import logging
+from typing import Optional
+
+from sqlmodel import Session as DBSession, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..config import get_config
+from ..database import async_engine
+from ..models.generated_music import GeneratedMusic
+from .music_gen import music_gen_service
+from .writer import writer
+
+logger = logging.getLogger(__name__)
+
+
+def _claim(db: DBSession, music_id: int) -> Optional[GeneratedMusic]:
+    """Mark a queued job as generating; None if it is gone or already done."""
+    music = db.get(GeneratedMusic, music_id)
+    if music is None or music.status not in ("pending", "generating"):
+        return None
+    music.status = "generating"
+    db.add(music)
+    return music
+
+
+def _finish(
+    db: DBSession,
+    music_id: int,
+    filename: Optional[str],
+    error: Optional[str],
+) -> None:
+    music = db.get(GeneratedMusic, music_id)
+    if music is None:
+        # Deleted while generating
+        return
+    music.status = "completed" if filename else "failed"
+    music.filename = filename or ""
+    music.error = error
+    db.add(music)
+
+
+def _unfinished(db: DBSession) -> list[int]:
+    """Jobs a previous process queued or started but never finished."""
+    return list(
+        db.exec(
+            select(GeneratedMusic.id)
+            .where(GeneratedMusic.status.in_(("pending", "generating")))
+            .order_by(GeneratedMusic.created_at)
+        ).all()
+    )
+
+
+class MusicJobQueue:
+    """Fixed-size pool of worker tasks draining queued generation jobs."""
+
+    def __init__(self, workers: int = 2):
+        self.workers = workers
+        self._queue: Optional[asyncio.Queue[int]] = None
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> int:
+        """Start the workers and requeue unfinished jobs; returns how many."""
+        if self.running:
+            return 0
+        self._queue = asyncio.Queue()
+        async with AsyncSession(async_engine) as db:
+            unfinished = await db.run_sync(_unfinished)
+        for music_id in unfinished:
+            self._queue.put_nowait(music_id)
+        if unfinished:
+            logger.info(f"Requeued {len(unfinished)} unfinished music jobs")
+
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._work()) for _ in range(self.workers)]
+        return len(unfinished)
+
+    async def stop(self) -> None:
+        """Cancel the workers; interrupted jobs are requeued on the next start."""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+        self._queue = None
+
+    def submit(self, music_id: int) -> None:
+        """Queue a pending job; without running workers it waits for startup."""
+        if self._queue is not None:
+            self._queue.put_nowait(music_id)
+
+    async def join(self) -> None:
+        """Wait until every queued job has been processed."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def _work(self) -> None:
+        while True:
+            music_id = await self._queue.get()
+            try:
+                await self.process(music_id)
+            except Exception:
+                logger.exception(f"Music job {music_id} crashed")
+            finally:
+                self._queue.task_done()
+
+    async def process(self, music_id: int) -> None:
+        """Run one job from pending to completed or failed."""
+        music = await writer.run_async(lambda db: _claim(db, music_id))
+        if music is None:
+            return
+
+        try:
+            filename = await music_gen_service.generate(
+                music.prompt, music.duration_seconds
+            )
+            error = None if filename else "Generation failed"
+        except Exception as e:
+            filename, error = None, str(e)
+
+        await writer.run_async(lambda db: _finish(db, music_id, filename, error))
+        logger.info(f"Music job {music_id} {'completed' if filename else 'failed'}")
+
+
+music_jobs = MusicJobQueue(**get_config().get("music", {}))
@@ -0,0 +1,40 @@
+"""Notifications about completions, streaks and goals.
+
+Messages are queued in the webhook outbox by the write that completed the
+session; the event subscriber only wakes the outbox dispatcher. Imported once
+at startup so the subscriber registers with the event bus.
+"""
+
+import logging
+
+from sqlmodel import Session as DBSession
+
+from . import outbox
+from .discord import STREAK_MILESTONES, discord_service
+from .events import SessionCompleted, bus
+
+logger = logging.getLogger(__name__)
+
+
+def queue_notifications(db: DBSession, event: SessionCompleted) -> int:
+    """Queue the messages a completion announces; returns how many.
+
+    Runs in the transaction that completed the session, so the messages are
+    committed with it and survive a crash right after the commit.
+    """
+    embeds = [discord_service.session_complete_embed(event.session)]
+    # Only the session that extended the streak announces it, not later ones
+    if event.streak_extended and event.streak in STREAK_MILESTONES:
+        embeds.append(discord_service.streak_milestone_embed(event.streak))
+    for goal in event.goals_reached:
+        logger.info(f"Goal {goal.goal_id} reached")
+        embeds.append(
+            discord_service.goal_reached_embed(goal.goal_type, goal.target_value)
+        )
+    return sum(discord_service.enqueue(db, embed) for embed in embeds)
+
+
+@bus.subscribe(SessionCompleted)
+async def deliver_notifications(event: SessionCompleted) -> None:
+    # The messages were committed with the session; only delivery is left
+    outbox.dispatcher.wake()
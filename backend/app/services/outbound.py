@@ -0,0 +1,169 @@
+"""Shared outbound HTTP client for Discord webhooks and the music generation API.
+
+One ``httpx.AsyncClient`` lives as long as the app, so notifications and API
+calls reuse pooled keep-alive connections (multiplexed over HTTP/2 when the
+optional ``h2`` package is installed) instead of paying a new TCP and TLS
+handshake on every call. Concurrent requests per host are capped, and latency
+and connection reuse are counted per host for ``/api/metrics``.
+"""
+
+import asyncio
+import contextlib
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from ..config import get_config
+from .writer import percentiles
+
+try:
+    import h2
+except ImportError:  # pragma: no cover - optional dependency
+    h2 = None
+
+
+class HostStats:
+    """Request, error, connection and latency counters for one host."""
+
+    def __init__(self, samples: int = 256):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self._latencies: deque[float] = deque(maxlen=samples)
+
+    def record(self, seconds: float, opened: bool, failed: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            self.errors += failed
+            if opened:
+                self.connections_opened += 1
+            else:
+                self.connections_reused += 1
+            self._latencies.append(seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "connections_opened": self.connections_opened,
+                "connections_reused": self.connections_reused,
+                "latency_ms": percentiles(self._latencies),
+            }
+
+
+class OutboundClient:
+    """Pooled async HTTP client with per-host concurrency caps and stats."""
+
+    def __init__(
+        self,
+        timeout_seconds: float = 10.0,
+        connect_timeout_seconds: float = 5.0,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry_seconds: float = 30.0,
+        max_connections_per_host: int = 4,
+        http2: bool = True,
+    ):
+        self.timeout = httpx.Timeout(timeout_seconds, connect=connect_timeout_seconds)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry_seconds,
+        )
+        self.max_connections_per_host = max_connections_per_host
+        self.http2 = http2 and h2 is not None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+        self._stats: dict[str, HostStats] = {}
+        self._stats_lock = threading.Lock()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            # The app runs on one loop; a client (and its pool) can't cross
+            # loops, which only happens with TestClient's per-request loops
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout, limits=self.limits, http2=self.http2
+            )
+            self._loop = loop
+            self._host_slots = {}
+        return self._client
+
+    def _host_stats(self, host: str) -> HostStats:
+        with self._stats_lock:
+            if host not in self._stats:
+                self._stats[host] = HostStats()
+            return self._stats[host]
+
+    async def start(self) -> None:
+        """Create the client on the running loop; also done lazily on first use."""
+        self._get_client()
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+    @contextlib.asynccontextmanager
+    async def stream(
+        self, method: str, url: str, **kwargs
+    ) -> AsyncIterator[httpx.Response]:
+        """Send a request and yield the response with its body unread.
+
+        The host's concurrency slot is held, and latency measured, until the
+        block exits. Raises httpx.HTTPError.
+        """
+        client = self._get_client()
+        host = httpx.URL(url).host
+        stats = self._host_stats(host)
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.max_connections_per_host)
+
+        opened = False
+
+        async def trace(event: str, info: dict) -> None:
+            nonlocal opened
+            if event == "connection.connect_tcp.complete":
+                opened = True
+
+        async with self._host_slots[host]:
+            started = time.perf_counter()
+            failed = True
+            try:
+                async with client.stream(
+                    method, url, extensions={"trace": trace}, **kwargs
+                ) as response:
+                    yield response
+                failed = response.is_server_error
+            finally:
+                stats.record(time.perf_counter() - started, opened, failed)
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request through the shared pool; raises httpx.HTTPError."""
+        async with self.stream(method, url, **kwargs) as response:
+            await response.aread()
+        return response
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    def snapshot(self) -> dict:
+        """Per-host counters."""
+        with self._stats_lock:
+            hosts = dict(self._stats)
+        return {
+            "http2": self.http2,
+            "hosts": {host: stats.snapshot() for host, stats in hosts.items()},
+        }
+
+
+outbound = OutboundClient(**get_config().get("http", {}))
@@ -0,0 +1,237 @@
+"""Durable webhook outbox and its rate-limited delivery task.
+
+Notifications are written to ``webhook_outbox`` instead of being posted
+inline, so a Discord outage or a restart loses nothing. One dispatcher task
+drains due messages oldest first, packing up to ten embeds for the same
+webhook into a single request, spacing requests by a minimum interval and
+pausing for as long as a 429's ``Retry-After`` asks. Failed sends are retried
+with jittered exponential backoff; after ``max_attempts`` (or a rejection
+that retrying can't fix) the message is parked as ``failed``.
+"""
+
+import asyncio
+import contextlib
+import logging
+import random
+from datetime import UTC, datetime, timedelta
+from typing import Optional
+
+import httpx
+from sqlalchemy import delete, func
+from sqlmodel import Session as DBSession, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..config import get_config
+from ..database import async_engine
+from ..models.outbox import WebhookMessage
+from .outbound import outbound
+from .writer import writer
+
+logger = logging.getLogger(__name__)
+
+# Discord accepts at most ten embeds per message
+MAX_EMBEDS = 10
+
+
+def enqueue(
+    db: DBSession, url: str, embed: Optional[dict] = None, content: str = ""
+) -> WebhookMessage:
+    """Add a message to the outbox; delivered after the caller commits."""
+    message = WebhookMessage(url=url, embed=embed, content=content)
+    db.add(message)
+    db.flush()
+    return message
+
+
+def retry_after(response: httpx.Response) -> float:
+    """Seconds a 429 response asks to wait, from its body or header."""
+    try:
+        return float(response.json()["retry_after"])
+    except (ValueError, KeyError, TypeError):
+        pass
+    try:
+        return float(response.headers.get("Retry-After", 1))
+    except ValueError:
+        return 1.0
+
+
+def _due_batch(db: DBSession, now: datetime, size: int) -> list[WebhookMessage]:
+    """Oldest due message plus other embed-only messages for the same webhook."""
+    due = (
+        select(WebhookMessage)
+        .where(
+            WebhookMessage.status == "pending", WebhookMessage.next_attempt_at <= now
+        )
+        .order_by(WebhookMessage.id)
+    )
+    first = db.exec(due.limit(1)).first()
+    if first is None:
+        return []
+    if first.content:
+        # Messages with text are sent alone so no text is dropped
+        return [first]
+    same_webhook = due.where(
+        WebhookMessage.url == first.url, WebhookMessage.content == ""
+    )
+    return list(db.exec(same_webhook.limit(size)).all())
+
+
+def _next_due(db: DBSession) -> Optional[datetime]:
+    return db.exec(
+        select(func.min(WebhookMessage.next_attempt_at)).where(
+            WebhookMessage.status == "pending"
+        )
+    ).one()
+
+
+def _delivered(db: DBSession, ids: list[int]) -> None:
+    db.exec(delete(WebhookMessage).where(WebhookMessage.id.in_(ids)))
+
+
+class OutboxDispatcher:
+    """Background task that delivers outbox messages."""
+
+    def __init__(
+        self,
+        min_interval_seconds: float = 0.5,
+        max_attempts: int = 8,
+        backoff_base_seconds: float = 2.0,
+        backoff_max_seconds: float = 300.0,
+        max_embeds: int = MAX_EMBEDS,
+    ):
+        self.min_interval = min_interval_seconds
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base_seconds
+        self.backoff_max = backoff_max_seconds
+        self.max_embeds = min(max_embeds, MAX_EMBEDS)
+        self.stats = {
+            "requests": 0,
+            "delivered": 0,
+            "retried": 0,
+            "rate_limited": 0,
+            "failed": 0,
+        }
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self) -> None:
+        """Start delivering on the running loop."""
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop delivering; undelivered messages stay in the outbox."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    def wake(self) -> None:
+        """Look for due messages now instead of at the next scheduled time."""
+        if self._task is not None and not self._task.done():
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def backoff(self, attempts: int) -> float:
+        """Full-jitter exponential delay before retry number ``attempts``."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempts))
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                pause = await self.send_next()
+            except Exception:
+                logger.exception("Webhook outbox delivery failed")
+                pause = self.backoff_base
+            if pause is not None:
+                # Pacing and Retry-After pauses aren't cut short by new messages
+                await asyncio.sleep(pause)
+                continue
+
+            async with AsyncSession(async_engine) as db:
+                next_due = await db.run_sync(_next_due)
+            timeout = None
+            if next_due is not None:
+                timeout = max(0.0, (next_due - datetime.now(UTC)).total_seconds())
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), timeout)
+
+    async def send_next(self) -> Optional[float]:
+        """Send one batch of due messages.
+
+        Returns how long to wait before sending again, or None if nothing
+        was due.
+        """
+        async with AsyncSession(async_engine) as db:
+            batch = await db.run_sync(_due_batch, datetime.now(UTC), self.max_embeds)
+        if not batch:
+            return None
+
+        ids = [message.id for message in batch]
+        payload: dict = {"content": batch[0].content}
+        embeds = [message.embed for message in batch if message.embed]
+        if embeds:
+            payload["embeds"] = embeds
+
+        self.stats["requests"] += 1
+        try:
+            response = await outbound.post(batch[0].url, json=payload)
+        except httpx.HTTPError as e:
+            await self._retry(ids, f"{type(e).__name__}: {e}")
+            return self.min_interval
+
+        if response.status_code == 429:
+            self.stats["rate_limited"] += 1
+            return max(self.min_interval, retry_after(response))
+        if response.is_success:
+            await writer.run_async(lambda db: _delivered(db, ids))
+            self.stats["delivered"] += len(ids)
+            if response.headers.get("X-RateLimit-Remaining") == "0":
+                # Bucket is empty: wait for it to refill instead of hitting a 429
+                reset = response.headers.get("X-RateLimit-Reset-After", "0")
+                with contextlib.suppress(ValueError):
+                    return max(self.min_interval, float(reset))
+            return self.min_interval
+
+        error = f"HTTP {response.status_code}: {response.text[:200]}"
+        if response.is_server_error:
+            await self._retry(ids, error)
+        else:
+            # Other 4xx (bad URL, deleted webhook, invalid embed) won't recover
+            await self._retry(ids, error, give_up=True)
+        return self.min_interval
+
+    async def _retry(self, ids: list[int], error: str, give_up: bool = False) -> None:
+        now = datetime.now(UTC)
+
+        def write(db: DBSession) -> int:
+            failed = 0
+            messages = db.exec(
+                select(WebhookMessage).where(WebhookMessage.id.in_(ids))
+            ).all()
+            for message in messages:
+                message.attempts += 1
+                message.last_error = error
+                if give_up or message.attempts >= self.max_attempts:
+                    message.status = "failed"
+                    failed += 1
+                else:
+                    delay = self.backoff(message.attempts)
+                    message.next_attempt_at = now + timedelta(seconds=delay)
+                db.add(message)
+            return failed
+
+        failed = await writer.run_async(write)
+        self.stats["failed"] += failed
+        self.stats["retried"] += len(ids) - failed
+        if failed:
+            logger.warning(f"Gave up on {failed} webhook messages: {error}")
+
+
+dispatcher = OutboxDispatcher(**get_config().get("webhooks", {}))
@@ -0,0 +1,173 @@
+"""Goal progress evaluated from the daily rollups.
+
+Active goals are grouped by the window they are measured over (today, this
+week) and every window is summed by one conditional aggregate over
+``daily_rollup``, so the cost no longer grows with the number of goals.
+History is a single grouped scan of the rollups over the requested range.
+"""
+
+from datetime import date, timedelta
+from typing import Optional, Sequence
+
+from sqlalchemy import and_, case, func
+from sqlmodel import Session as DBSession, select
+
+from ..models.goal import Goal, GoalPeriod, GoalProgress
+from ..models.rollup import DailyRollup
+from ..models.session import Session
+from . import rollup
+from .aggregates import Totals
+
+# Goal type prefix -> period length in days; weeks start on Monday
+PERIOD_DAYS = {"daily": 1, "weekly": 7}
+
+# Longest history served in one request (two years of daily periods)
+MAX_HISTORY_DAYS = 731
+
+
+def goal_period(goal_type: str) -> Optional[str]:
+    """The period a goal type is measured over, or None if unknown."""
+    period = goal_type.split("_", 1)[0]
+    return period if period in PERIOD_DAYS else None
+
+
+def period_start(period: str, day: date) -> date:
+    """First day of the period containing a day."""
+    if period == "weekly":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def goal_window(goal_type: str, today: date) -> Optional[tuple[date, date]]:
+    """Return the [start, end) day range a goal type is measured over."""
+    period = goal_period(goal_type)
+    if period is None:
+        return None
+    start = period_start(period, today)
+    return start, start + timedelta(days=PERIOD_DAYS[period])
+
+
+def pick_value(goal_type: str, totals: Totals) -> int:
+    """Select the metric a goal type tracks from a set of totals."""
+    if goal_type.endswith("_minutes"):
+        return totals.minutes
+    elif goal_type.endswith("_sessions"):
+        return totals.sessions
+    return 0
+
+
+def _percent(value: int, target: int) -> float:
+    return round(min(100.0, (value / target) * 100), 1) if target > 0 else 0
+
+
+def build_progress(goal: Goal, current: int) -> GoalProgress:
+    """Build the progress response for a goal and its current value."""
+    return GoalProgress(
+        goal_id=goal.id,
+        goal_type=goal.goal_type,
+        target_value=goal.target_value,
+        current_value=current,
+        progress_percent=_percent(current, goal.target_value),
+    )
+
+
+def window_totals(
+    db: DBSession, windows: set[tuple[date, date]]
+) -> dict[tuple[date, date], Totals]:
+    """Totals for each [start, end) window from one rollup aggregate."""
+    if not windows:
+        return {}
+    ordered = sorted(windows)
+    columns = []
+    for start, end in ordered:
+        in_window = and_(DailyRollup.day >= start, DailyRollup.day < end)
+        for column in (DailyRollup.sessions, DailyRollup.minutes):
+            columns.append(func.coalesce(func.sum(case((in_window, column))), 0))
+
+    row = db.exec(
+        select(*columns).where(
+            DailyRollup.day >= ordered[0][0],
+            DailyRollup.day < max(end for _, end in ordered),
+        )
+    ).one()
+    return {
+        window: Totals(sessions=row[2 * i], minutes=row[2 * i + 1])
+        for i, window in enumerate(ordered)
+    }
+
+
+def current_progress(
+    db: DBSession, goals: Sequence[Goal], today: date
+) -> list[GoalProgress]:
+    """Progress of each goal over its current window."""
+    windows = {goal.id: goal_window(goal.goal_type, today) for goal in goals}
+    totals = window_totals(db, {w for w in windows.values() if w is not None})
+
+    progress = []
+    for goal in goals:
+        window = windows[goal.id]
+        current = pick_value(goal.goal_type, totals[window]) if window else 0
+        progress.append(build_progress(goal, current))
+    return progress
+
+
+def goals_reached(db: DBSession, session: Session) -> list[GoalProgress]:
+    """Active goals whose target a just-completed session crossed.
+
+    Must run in the transaction that completed the session, so the rollups
+    hold exactly the earlier completions plus this one.
+    """
+    item = rollup.contribution(session)
+    if item is None:
+        return []
+    goals = db.exec(select(Goal).where(Goal.is_active == True)).all()
+    added = Totals(sessions=1, minutes=item.minutes)
+
+    reached = []
+    # The completed day may not be today for sessions recorded offline
+    for goal, state in zip(goals, current_progress(db, goals, item.day)):
+        before = state.current_value - pick_value(goal.goal_type, added)
+        if before < goal.target_value <= state.current_value:
+            reached.append(state)
+    return reached
+
+
+def history(db: DBSession, goal: Goal, start: date, end: date) -> list[GoalPeriod]:
+    """Attainment for every period overlapping [start, end], oldest first."""
+    period = goal_period(goal.goal_type)
+    if period is None or end < start:
+        return []
+    first = period_start(period, start)
+
+    if period == "weekly":
+        # Monday on or before the day
+        bucket = func.date(DailyRollup.day, "weekday 0", "-6 days")
+    else:
+        bucket = func.date(DailyRollup.day)
+    rows = db.exec(
+        select(bucket, func.sum(DailyRollup.sessions), func.sum(DailyRollup.minutes))
+        .where(DailyRollup.day >= first, DailyRollup.day <= end)
+        .group_by(bucket)
+    ).all()
+    totals = {
+        date.fromisoformat(day): Totals(sessions=sessions, minutes=minutes)
+        for day, sessions, minutes in rows
+    }
+
+    length = timedelta(days=PERIOD_DAYS[period])
+    periods = []
+    day = first
+    while day <= end:
+        value = pick_value(goal.goal_type, totals.get(day, Totals(0, 0)))
+        periods.append(
+            GoalPeriod(
+                start=day,
+                end=day + length,
+                value=value,
+                target_value=goal.target_value,
+                achieved=value >= goal.target_value,
+                progress_percent=_percent(value, goal.target_value),
+            )
+        )
+        day += length
+    return periods
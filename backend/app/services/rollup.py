@@ -0,0 +1,112 @@
+"""Daily rollup maintenance for completed meditation sessions.
+
+Every session write records its contribution to ``daily_rollup`` in the same
+transaction, so stats can be read from one small row per day instead of
+scanning the full session history.
+"""
+
+from datetime import UTC, date
+from typing import NamedTuple, Optional
+
+from sqlalchemy import delete
+from sqlmodel import Session as DBSession, select
+
+from ..models.rollup import DailyRollup
+from ..models.session import Session
+from . import aggregates, streaks
+
+
+class Contribution(NamedTuple):
+    """What a single session adds to its day's rollup row."""
+
+    day: date
+    minutes: int
+    mood: Optional[str]
+
+
+def contribution(session: Session) -> Optional[Contribution]:
+    """Return the rollup contribution of a session, or None if it doesn't count."""
+    if not session.completed or session.started_at is None:
+        return None
+    started_at = session.started_at
+    if started_at.tzinfo is not None:
+        # Rows read back from SQLite are naive UTC; new ones may carry an offset
+        started_at = started_at.astimezone(UTC)
+    return Contribution(
+        day=started_at.date(),
+        minutes=(session.actual_duration_seconds or 0) // 60,
+        mood=session.mood_after,
+    )
+
+
+def apply(db: DBSession, item: Optional[Contribution], sign: int) -> None:
+    """Add (sign=1) or remove (sign=-1) a contribution from its rollup row."""
+    if item is None:
+        return
+
+    row = db.get(DailyRollup, item.day)
+    is_new = row is None
+    if is_new:
+        if sign < 0:
+            return
+        row = DailyRollup(day=item.day)
+
+    row.minutes += sign * item.minutes
+    row.sessions += sign * 1
+    if item.mood:
+        moods = dict(row.mood_counts or {})
+        moods[item.mood] = moods.get(item.mood, 0) + sign
+        if moods[item.mood] <= 0:
+            del moods[item.mood]
+        row.mood_counts = moods
+
+    if row.sessions <= 0:
+        if row in db.new:
+            db.expunge(row)
+        elif row in db:
+            db.delete(row)
+            streaks.day_removed(db, item.day)
+        return
+    db.add(row)
+    if is_new:
+        streaks.day_added(db, item.day)
+
+
+def replace(
+    db: DBSession,
+    before: Optional[Contribution],
+    after: Optional[Contribution],
+) -> None:
+    """Swap a session's old contribution for its new one."""
+    if before == after:
+        return
+    apply(db, before, -1)
+    apply(db, after, 1)
+
+
+def rebuild(db: DBSession) -> int:
+    """Recompute every rollup row, and the streak state, from the session table.
+
+    Returns the number of days written. The caller is responsible for committing.
+    """
+    db.exec(delete(DailyRollup))
+
+    totals = aggregates.daily_totals(db)
+    moods = aggregates.daily_mood_counts(db)
+    for row in totals:
+        db.add(
+            DailyRollup(
+                day=row.day,
+                minutes=row.minutes,
+                sessions=row.sessions,
+                mood_counts=moods.get(row.day, {}),
+            )
+        )
+    db.flush()
+    streaks.rebuild(db)
+    return len(totals)
+
+
+def is_empty(db: DBSession) -> bool:
+    """Check whether the rollup table has no rows yet."""
+    return db.exec(select(DailyRollup.day).limit(1)).first() is None
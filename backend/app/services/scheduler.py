@@ -1,48 +1,40 @@
 """Scheduler service for periodic tasks."""
 
 import logging
-from datetime import UTC, date, datetime, timedelta
+from datetime import UTC, datetime, timedelta
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-from sqlmodel import Session, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..config import get_config
-from ..models.session import Session as MeditationSession
+from ..database import async_engine
+from . import aggregates, streaks
 from .discord import discord_service
 
 logger = logging.getLogger(__name__)
 
 scheduler = AsyncIOScheduler()
 
-config = get_config()
-db_url = config.get("database", {}).get("url", "sqlite:///./mindfulness.db")
-engine = create_engine(db_url)
-
 
 async def send_daily_reminder() -> None:
     """Check if user meditated today, send reminder if not."""
     try:
-        with Session(engine) as db:
-            today = date.today()
-            today_start = datetime.combine(today, datetime.min.time())
-            session_today = db.exec(
-                select(MeditationSession).where(
-                    MeditationSession.started_at >= today_start,
-                    MeditationSession.completed == True,
-                )
-            ).first()
-
-            if not session_today:
-                await discord_service.send_webhook(
-                    "",
+        async with AsyncSession(async_engine) as db:
+            today = datetime.now(UTC).date()
+            today_start = datetime.combine(today, datetime.min.time(), tzinfo=UTC)
+            today_totals = await db.run_sync(
+                aggregates.completed_totals, start=today_start
+            )
+
+            if not today_totals.sessions:
+                await discord_service.queue(
                     {
                         "title": "Time for Mindfulness",
                         "description": "You haven't meditated today. Take a moment for yourself.",
                         "color": 0x6366F1,
                     },
                 )
-                logger.info("Daily reminder sent")
+                logger.info("Daily reminder queued")
     except Exception as e:
         logger.error(f"Failed to send daily reminder: {e}")
 
@@ -50,21 +42,15 @@ async def send_daily_reminder() -> None:
 async def send_weekly_summary() -> None:
     """Send weekly stats summary."""
     try:
-        with Session(engine) as db:
+        async with AsyncSession(async_engine) as db:
             week_ago = datetime.now(UTC) - timedelta(days=7)
-            sessions = db.exec(
-                select(MeditationSession).where(
-                    MeditationSession.started_at >= week_ago,
-                    MeditationSession.completed == True,
-                )
-            ).all()
+            totals = await db.run_sync(aggregates.completed_totals, start=week_ago)
+            current_streak, _ = await db.run_sync(streaks.current_and_longest)
 
             stats = {
-                "sessions": len(sessions),
-                "minutes": sum(
-                    (s.actual_duration_seconds or 0) // 60 for s in sessions
-                ),
-                "streak": 0,  # Would need streak calculation
+                "sessions": totals.sessions,
+                "minutes": totals.minutes,
+                "streak": current_streak,
             }
 
             await discord_service.send_weekly_summary(stats)
@@ -0,0 +1,70 @@
+"""Session write operations, run inside the write coordinator's transactions.
+
+Each function takes the batch's database session and only flushes; the
+coordinator commits. Rollup rows are kept in step with every change.
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import delete
+from sqlmodel import Session as DBSession
+
+from ..models.session import Session, SessionCreate
+from ..models.tag import SessionTag
+from . import rollup
+
+
+def create(
+    db: DBSession, data: SessionCreate, started_at: Optional[datetime] = None
+) -> Session:
+    """Insert a new session and count it in the daily rollup."""
+    session = Session.model_validate(data)
+    if started_at is not None:
+        # Sessions recorded offline keep the time they actually started
+        session.started_at = started_at
+    db.add(session)
+    rollup.apply(db, rollup.contribution(session), 1)
+    db.flush()
+    return session
+
+
+def update(
+    db: DBSession, session_id: int, changes: dict
+) -> Optional[tuple[Session, bool]]:
+    """Apply changes to a session; returns it and whether it was just completed."""
+    session = db.get(Session, session_id)
+    if not session:
+        return None
+
+    was_incomplete = not session.completed
+    before = rollup.contribution(session)
+    for key, value in changes.items():
+        setattr(session, key, value)
+
+    db.add(session)
+    rollup.replace(db, before, rollup.contribution(session))
+    db.flush()
+    return session, was_incomplete and session.completed
+
+
+def remove(db: DBSession, session_id: int) -> bool:
+    """Delete a session, its tag links and its rollup contribution.
+
+    Returns False if the session doesn't exist.
+    """
+    session = db.get(Session, session_id)
+    if not session:
+        return False
+    rollup.apply(db, rollup.contribution(session), -1)
+    db.exec(delete(SessionTag).where(SessionTag.session_id == session_id))
+    db.delete(session)
+    db.flush()
+    return True
+
+
+def set_tags(db: DBSession, session_id: int, tag_ids: List[int]) -> None:
+    """Replace the tags attached to a session."""
+    db.exec(delete(SessionTag).where(SessionTag.session_id == session_id))
+    db.add_all(SessionTag(session_id=session_id, tag_id=tag_id) for tag_id in tag_ids)
+    db.flush()
@@ -0,0 +1,163 @@
+"""Incremental streak engine backed by the daily rollup.
+
+A day counts towards a streak when it has a ``daily_rollup`` row. The rollup
+service calls ``day_added`` / ``day_removed`` whenever a day gains its first
+or loses its last completed session, so appending today's session is O(1)
+and editing history only walks the run around the edited day.
+"""
+
+from datetime import UTC, date, datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlmodel import Session as DBSession, select
+
+from ..models.rollup import DailyRollup
+from ..models.streak import StreakState
+
+ONE_DAY = timedelta(days=1)
+_WALK_CHUNK = 64
+
+
+def get_state(db: DBSession) -> StreakState:
+    """Get or create the streak state row."""
+    state = db.get(StreakState, 1)
+    if state is None:
+        state = StreakState(id=1)
+        db.add(state)
+    return state
+
+
+def current_and_longest(db: DBSession) -> tuple[int, int]:
+    """Return the (current, longest) streak as of today."""
+    state = db.get(StreakState, 1)
+    if state is None or state.last_active is None:
+        return 0, 0
+
+    # A run only stays current while today or yesterday is active
+    today = datetime.now(UTC).date()
+    current = state.current_length if state.last_active >= today - ONE_DAY else 0
+    return current, state.longest
+
+
+def _is_active(db: DBSession, day: date) -> bool:
+    return db.get(DailyRollup, day) is not None
+
+
+def _run_edge(db: DBSession, day: date, step: int) -> date:
+    """Walk from an active day while neighbours are active; return the far end."""
+    edge = day
+    while True:
+        column = DailyRollup.day
+        if step < 0:
+            query = select(column).where(column < edge).order_by(column.desc())
+        else:
+            query = select(column).where(column > edge).order_by(column)
+        days = db.exec(query.limit(_WALK_CHUNK)).all()
+
+        for d in days:
+            if abs((d - edge).days) != 1:
+                return edge
+            edge = d
+        if len(days) < _WALK_CHUNK:
+            return edge
+
+
+def _scan(days: Iterable[date]) -> tuple[Optional[date], int, int, Optional[date]]:
+    """Single pass over ascending days: (run_start, run_length, longest, last)."""
+    run_start: Optional[date] = None
+    run_length = 0
+    longest = 0
+    last: Optional[date] = None
+
+    for d in days:
+        if last is not None and d - last == ONE_DAY:
+            run_length += 1
+        else:
+            run_start = d
+            run_length = 1
+        longest = max(longest, run_length)
+        last = d
+
+    return run_start, run_length, longest, last
+
+
+def rebuild(db: DBSession) -> StreakState:
+    """Recompute streak state from every active day in the rollup."""
+    days = db.exec(select(DailyRollup.day).order_by(DailyRollup.day)).all()
+    state = get_state(db)
+    state.run_start, state.current_length, state.longest, state.last_active = _scan(
+        days
+    )
+    db.add(state)
+    return state
+
+
+def day_added(db: DBSession, day: date) -> None:
+    """Update streak state after a day gained its first completed session."""
+    state = get_state(db)
+    last = state.last_active
+
+    if last is None or day - last > ONE_DAY:
+        # First activity or a gap: a new run starts today
+        state.run_start = day
+        state.current_length = 1
+        state.last_active = day
+    elif day - last == ONE_DAY:
+        state.current_length += 1
+        state.last_active = day
+    else:
+        # Back-filled history: merge the runs on either side of the day
+        start = _run_edge(db, day, -1)
+        end = _run_edge(db, day, 1)
+        if end == last:
+            state.run_start = start
+            state.current_length = (end - start).days + 1
+        state.longest = max(state.longest, (end - start).days + 1)
+
+    state.longest = max(state.longest, state.current_length)
+    db.add(state)
+
+
+def day_removed(db: DBSession, day: date) -> None:
+    """Update streak state after a day lost its last completed session."""
+    state = get_state(db)
+    last = state.last_active
+    if last is None:
+        return
+
+    left_start = left_end = None
+    if _is_active(db, day - ONE_DAY):
+        left_end = day - ONE_DAY
+        left_start = _run_edge(db, left_end, -1)
+    right_end = None
+    if _is_active(db, day + ONE_DAY):
+        right_end = _run_edge(db, day + ONE_DAY, 1)
+
+    left_length = (left_end - left_start).days + 1 if left_end else 0
+    right_length = (right_end - day).days if right_end else 0
+    old_length = left_length + 1 + right_length
+
+    if day == last:
+        if left_end is not None:
+            state.run_start = left_start
+            state.current_length = left_length
+            state.last_active = left_end
+        else:
+            previous = db.exec(
+                select(DailyRollup.day)
+                .where(DailyRollup.day < day)
+                .order_by(DailyRollup.day.desc())
+            ).first()
+            state.last_active = previous
+            state.run_start = _run_edge(db, previous, -1) if previous else None
+            state.current_length = (
+                (previous - state.run_start).days + 1 if previous else 0
+            )
+    elif right_end == last:
+        state.run_start = day + ONE_DAY
+        state.current_length = right_length
+
+    db.add(state)
+    # Only a full rescan can tell what the new longest run is
+    if old_length >= state.longest:
+        rebuild(db)
@@ -0,0 +1,132 @@
+"""Apply batched offline writes from the PWA exactly once.
+
+Every operation carries a client-generated idempotency key. Applied keys are
+recorded in ``sync_receipt`` in the same transaction as the write itself, so a
+batch that is retried after a dropped response replays as a no-op and returns
+the original server ids. Receipts older than ``sync.receipt_ttl_days`` are
+pruned to keep the table small.
+"""
+
+from datetime import UTC, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session as DBSession, select
+
+from ..config import get_config
+from ..models.session import Session, SessionCreate, SessionUpdate
+from ..models.sync import SyncOperation, SyncReceipt, SyncResponse, SyncResult
+from . import session_store
+
+RECEIPT_TTL = timedelta(days=get_config().get("sync", {}).get("receipt_ttl_days", 30))
+
+
+class InvalidOperation(ValueError):
+    """An operation in a batch can't be applied; the batch is rolled back."""
+
+    def __init__(self, index: int, message: str, conflict: bool = False):
+        super().__init__(f"Operation {index}: {message}")
+        self.index = index
+        self.conflict = conflict
+
+
+def _resolve(db: DBSession, op: SyncOperation, id_map: dict[str, int]) -> Optional[int]:
+    """Server id of the session an operation refers to."""
+    if op.session_id is not None:
+        return op.session_id
+    if op.client_id is None:
+        return None
+    if op.client_id in id_map:
+        return id_map[op.client_id]
+    receipt = db.exec(
+        select(SyncReceipt).where(
+            SyncReceipt.client_id == op.client_id, SyncReceipt.op == "create"
+        )
+    ).first()
+    return receipt.session_id if receipt else None
+
+
+def _started_at(data: dict) -> Optional[datetime]:
+    value = data.get("started_at")
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    # Stored as UTC: days are counted in UTC by the rollup and its rebuild
+    return parsed.astimezone(UTC) if parsed.tzinfo else parsed.replace(tzinfo=UTC)
+
+
+def _apply(
+    db: DBSession, op: SyncOperation, id_map: dict[str, int]
+) -> tuple[Optional[int], bool]:
+    """Apply one operation; returns the session id and whether it was found."""
+    if op.op == "create":
+        session = session_store.create(
+            db, SessionCreate.model_validate(op.data), _started_at(op.data)
+        )
+        changes = SessionUpdate.model_validate(op.data).model_dump(exclude_unset=True)
+        if changes:
+            session_store.update(db, session.id, changes)
+        return session.id, True
+
+    session_id = _resolve(db, op, id_map)
+    if session_id is None:
+        return None, False
+    if op.op == "update":
+        changes = SessionUpdate.model_validate(op.data).model_dump(exclude_unset=True)
+        return session_id, session_store.update(db, session_id, changes) is not None
+    if op.op == "tag":
+        if db.get(Session, session_id) is None:
+            return session_id, False
+        session_store.set_tags(db, session_id, op.tag_ids)
+        return session_id, True
+    return session_id, session_store.remove(db, session_id)
+
+
+def apply_batch(db: DBSession, operations: list[SyncOperation]) -> SyncResponse:
+    """Apply operations in order, skipping any whose key was already applied."""
+    results = []
+    id_map: dict[str, int] = {}
+
+    for index, op in enumerate(operations):
+        receipt = db.get(SyncReceipt, op.key)
+        if receipt is not None:
+            result = SyncResult(
+                key=op.key,
+                status="replayed",
+                client_id=receipt.client_id,
+                session_id=receipt.session_id,
+            )
+        else:
+            try:
+                session_id, found = _apply(db, op, id_map)
+                db.add(
+                    SyncReceipt(
+                        key=op.key,
+                        op=op.op,
+                        client_id=op.client_id,
+                        session_id=session_id,
+                    )
+                )
+                db.flush()
+            except ValueError as e:
+                # Includes pydantic validation errors and bad timestamps
+                raise InvalidOperation(index, str(e)) from e
+            except IntegrityError as e:
+                raise InvalidOperation(
+                    index, "session already exists", conflict=True
+                ) from e
+            result = SyncResult(
+                key=op.key,
+                status="applied" if found else "not_found",
+                client_id=op.client_id,
+                session_id=session_id,
+            )
+
+        if result.client_id and result.session_id:
+            id_map[result.client_id] = result.session_id
+        results.append(result)
+
+    cutoff = datetime.now(UTC) - RECEIPT_TTL
+    db.exec(delete(SyncReceipt).where(SyncReceipt.created_at < cutoff))
+    return SyncResponse(results=results, id_map=id_map)
@@ -0,0 +1,245 @@
+"""Single-writer queue that group-commits database writes.
+
+SQLite allows one writer at a time, so concurrent request handlers that each
+commit their own transaction queue up on the database lock and, under bursts,
+fail with "database is locked". Routes instead submit a write operation, a
+callable taking a ``Session``, to the coordinator. One dedicated thread drains
+the queue, runs every operation that arrived within a short window inside its
+own SAVEPOINT, commits the batch once, and resolves each caller's future with
+that operation's result or exception.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, NamedTuple, Optional, TypeVar
+
+from sqlalchemy import Engine, inspect
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session
+
+from ..config import get_config
+from ..database import engine
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+WriteOp = Callable[[Session], T]
+
+
+class _Job(NamedTuple):
+    op: WriteOp
+    future: Future
+    submitted: float
+
+
+class WriterStats:
+    """Batch size and queue latency counters for the write coordinator."""
+
+    def __init__(self, samples: int = 1024):
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.writes = 0
+        self.failed_writes = 0
+        self.max_batch_size = 0
+        self._queue_latencies: deque[float] = deque(maxlen=samples)
+        self._commit_latencies: deque[float] = deque(maxlen=samples)
+
+    def record(
+        self, size: int, failed: int, waits: list[float], commit_seconds: float
+    ) -> None:
+        with self._lock:
+            self.batches += 1
+            self.writes += size
+            self.failed_writes += failed
+            self.max_batch_size = max(self.max_batch_size, size)
+            self._queue_latencies.extend(waits)
+            self._commit_latencies.append(commit_seconds)
+
+    def snapshot(self) -> dict:
+        """Current counters plus p50/p99 latencies in milliseconds."""
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "writes": self.writes,
+                "failed_writes": self.failed_writes,
+                "mean_batch_size": (
+                    round(self.writes / self.batches, 2) if self.batches else 0.0
+                ),
+                "max_batch_size": self.max_batch_size,
+                "queue_latency_ms": percentiles(self._queue_latencies),
+                "commit_latency_ms": percentiles(self._commit_latencies),
+            }
+
+
+def percentiles(samples: deque[float]) -> dict:
+    """p50/p99 of latency samples in seconds, as milliseconds."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"p50": 0.0, "p99": 0.0}
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000, 3)
+
+    return {"p50": pick(0.5), "p99": pick(0.99)}
+
+
+class WriteCoordinator:
+    """Funnel writes through one thread and commit them in batches."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        batch_window_ms: float = 2.0,
+        max_batch_size: int = 64,
+    ):
+        self.engine = engine
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.stats = WriterStats()
+        self._queue: queue.Queue[Optional[_Job]] = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    # --- Submitting -------------------------------------------------------
+
+    def submit(self, op: WriteOp) -> Future:
+        """Queue a write; the future resolves once its batch has committed."""
+        self.start()
+        future: Future = Future()
+        self._queue.put(_Job(op, future, time.perf_counter()))
+        return future
+
+    def run(self, op: WriteOp[T]) -> T:
+        """Queue a write and block the calling thread until it commits."""
+        return self.submit(op).result()
+
+    async def run_async(self, op: WriteOp[T]) -> T:
+        """Queue a write and await its commit without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(op))
+
+    # --- Lifecycle --------------------------------------------------------
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the writer thread if it isn't running yet."""
+        if self.running:
+            return
+        with self._lock:
+            if self.running:
+                return
+            self._thread = threading.Thread(
+                target=self._loop, name="db-writer", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Drain queued writes and stop the writer thread."""
+        with self._lock:
+            if not self.running:
+                return
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    # --- Writer thread ----------------------------------------------------
+
+    def _collect(self, first: _Job) -> tuple[list[_Job], bool]:
+        """Gather jobs arriving within the batch window after the first one."""
+        batch = [first]
+        deadline = time.perf_counter() + self.batch_window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                job = (
+                    self._queue.get(timeout=remaining)
+                    if remaining > 0
+                    else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+            if job is None:
+                return batch, True
+            batch.append(job)
+        return batch, False
+
+    def _loop(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stopping = self._collect(first)
+            self._commit(batch)
+
+    def _commit(self, batch: list[_Job]) -> None:
+        started = time.perf_counter()
+        waits = [started - job.submitted for job in batch]
+        outcomes: list[tuple[bool, object]] = []
+
+        try:
+            with Session(self.engine, expire_on_commit=False) as db:
+                for job in batch:
+                    if not job.future.set_running_or_notify_cancel():
+                        outcomes.append((False, None))
+                        continue
+                    try:
+                        # A failing op only rolls back its own savepoint
+                        with db.begin_nested():
+                            result = job.op(db)
+                        outcomes.append((True, result))
+                    except Exception as exc:
+                        outcomes.append((False, exc))
+                db.commit()
+                if not all(ok for ok, _ in outcomes):
+                    self._reload_expired(db)
+        except Exception as exc:
+            logger.error(f"Write batch of {len(batch)} failed to commit: {exc}")
+            for job in batch:
+                if job.future.running():
+                    job.future.set_exception(exc)
+            self.stats.record(len(batch), len(batch), waits, 0.0)
+            return
+
+        failed = 0
+        for job, (ok, value) in zip(batch, outcomes):
+            if not job.future.running():
+                continue
+            if ok:
+                job.future.set_result(value)
+            else:
+                failed += 1
+                job.future.set_exception(value)
+        self.stats.record(len(batch), failed, waits, time.perf_counter() - started)
+
+    @staticmethod
+    def _reload_expired(db: Session) -> None:
+        """Reload objects a rolled-back savepoint expired, before they detach.
+
+        Rolling back a failed op expires whatever it touched, which may be an
+        object an earlier op in the batch returned. Callers read results after
+        the session closes, so expired attributes can't be loaded lazily.
+        """
+        for obj in list(db.identity_map.values()):
+            if not inspect(obj).expired_attributes:
+                continue
+            try:
+                db.refresh(obj)
+            except SQLAlchemyError as exc:
+                # E.g. a later op in the batch deleted the row
+                logger.warning(f"Could not reload {obj!r} after commit: {exc}")
+
+
+_settings = get_config().get("writer", {})
+writer = WriteCoordinator(
+    engine,
+    batch_window_ms=_settings.get("batch_window_ms", 2.0),
+    max_batch_size=_settings.get("max_batch_size", 64),
+)
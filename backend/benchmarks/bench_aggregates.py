@@ -0,0 +1,168 @@
+"""Benchmark stats aggregation: ORM materialization vs SQL aggregates.
+
+Seeds a throwaway SQLite database with N sessions and compares the old
+"select(Session).all() and sum in Python" approach with the shared
+aggregation queries in ``app.services.aggregates``.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_aggregates --sizes 100000 1000000
+"""
+
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app import migrations
+from app.models.session import Session as MeditationSession
+from app.services import aggregates
+
+MOODS = ["calm", "happy", "peaceful", "neutral", "tired", None]
+INSERT_CHUNK = 20_000
+
+
+def seed(engine, count: int) -> None:
+    """Insert `count` sessions spread over the last five years."""
+    rng = random.Random(count)
+    now = datetime.now(UTC)
+    table = MeditationSession.__table__
+
+    with engine.begin() as conn:
+        for offset in range(0, count, INSERT_CHUNK):
+            rows = []
+            for _ in range(min(INSERT_CHUNK, count - offset)):
+                started = now - timedelta(
+                    seconds=rng.randrange(5 * 365 * 86400),
+                    microseconds=rng.randrange(1_000_000),
+                )
+                planned = rng.choice([300, 600, 900, 1200, 1800])
+                completed = rng.random() < 0.9
+                rows.append(
+                    {
+                        "planned_duration_seconds": planned,
+                        "started_at": started,
+                        "ended_at": started + timedelta(seconds=planned),
+                        "actual_duration_seconds": planned if completed else None,
+                        "completed": completed,
+                        "mood_after": rng.choice(MOODS),
+                        "created_at": started,
+                    }
+                )
+            conn.execute(insert(table), rows)
+
+
+# --- Before: full ORM materialization, aggregated in Python -------------------
+
+
+def orm_summary(db: Session) -> tuple[int, int]:
+    sessions = db.exec(
+        select(MeditationSession).where(MeditationSession.completed == True)
+    ).all()
+    return len(sessions), sum((s.actual_duration_seconds or 0) // 60 for s in sessions)
+
+
+def orm_heatmap(db: Session) -> dict:
+    cutoff = datetime.now(UTC) - timedelta(days=365)
+    sessions = db.exec(
+        select(MeditationSession).where(
+            MeditationSession.completed == True,
+            MeditationSession.started_at >= cutoff,
+        )
+    ).all()
+    by_date: dict = defaultdict(lambda: [0, 0])
+    for s in sessions:
+        entry = by_date[s.started_at.date()]
+        entry[0] += (s.actual_duration_seconds or 0) // 60
+        entry[1] += 1
+    return by_date
+
+
+def orm_weekly(db: Session) -> tuple[int, int]:
+    week_ago = datetime.now(UTC) - timedelta(days=7)
+    sessions = db.exec(
+        select(MeditationSession).where(
+            MeditationSession.started_at >= week_ago,
+            MeditationSession.completed == True,
+        )
+    ).all()
+    return len(sessions), sum((s.actual_duration_seconds or 0) // 60 for s in sessions)
+
+
+# --- After: shared SQL aggregation layer --------------------------------------
+
+
+def sql_summary(db: Session) -> aggregates.Totals:
+    return aggregates.completed_totals(db)
+
+
+def sql_heatmap(db: Session) -> list:
+    return aggregates.daily_totals(db, start=datetime.now(UTC) - timedelta(days=365))
+
+
+def sql_weekly(db: Session) -> aggregates.Totals:
+    return aggregates.completed_totals(db, start=datetime.now(UTC) - timedelta(days=7))
+
+
+CASES: list[tuple[str, Callable, Callable]] = [
+    ("summary", orm_summary, sql_summary),
+    ("heatmap (365d)", orm_heatmap, sql_heatmap),
+    ("weekly", orm_weekly, sql_weekly),
+]
+
+
+def measure(engine, fn: Callable) -> tuple[float, float]:
+    """Return (seconds, peak MiB) for one call on a fresh session."""
+    with Session(engine) as db:
+        start = time.perf_counter()
+        fn(db)
+        elapsed = time.perf_counter() - start
+
+    with Session(engine) as db:
+        tracemalloc.start()
+        fn(db)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return elapsed, peak / (1024 * 1024)
+
+
+def run(size: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        SQLModel.metadata.create_all(engine)
+        seed(engine, size)
+        # Indexes and planner stats, as a real database would have them
+        migrations.run(engine)
+
+        print(f"\n{size:,} sessions")
+        print(f"{'query':<16}{'before':>22}{'after':>22}{'speedup':>10}")
+        for name, before, after in CASES:
+            b_time, b_mem = measure(engine, before)
+            a_time, a_mem = measure(engine, after)
+            print(
+                f"{name:<16}"
+                f"{b_time * 1000:>10.1f} ms {b_mem:>7.1f} MiB"
+                f"{a_time * 1000:>10.1f} ms {a_mem:>7.1f} MiB"
+                f"{b_time / a_time:>9.1f}x"
+            )
+        engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size)
+
+
+if __name__ == "__main__":
+    main()
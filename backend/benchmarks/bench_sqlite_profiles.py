@@ -0,0 +1,142 @@
+"""Benchmark mixed read/write throughput for SQLite tuning profiles.
+
+Each profile gets a fresh database seeded with sessions. Concurrent client
+threads then run a mix of stats reads and session writes for a fixed
+duration. The "tuned" profile is whatever ``database.sqlite`` in
+config/config.yaml currently says.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_sqlite_profiles --clients 8 --seconds 5
+"""
+
+import argparse
+import random
+import tempfile
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, select
+
+from app import migrations
+from app.config import get_config
+from app.database import create_sqlite_engine
+from app.models.session import Session as MeditationSession
+from app.services import aggregates
+
+from .bench_aggregates import seed
+
+PROFILES: dict[str, dict] = {
+    # sqlite3 defaults: rollback journal, synchronous=FULL, 2 MiB cache
+    "default": {},
+    "wal": {"journal_mode": "WAL", "synchronous": "NORMAL", "busy_timeout": 5000},
+    "tuned": get_config().get("database", {}).get("sqlite", {}),
+}
+
+
+def read_op(db: Session) -> None:
+    aggregates.completed_totals(db, start=datetime.now(UTC) - timedelta(days=7))
+    db.exec(
+        select(MeditationSession)
+        .order_by(MeditationSession.started_at.desc())
+        .limit(50)
+    ).all()
+
+
+def write_op(db: Session) -> None:
+    db.add(
+        MeditationSession(
+            planned_duration_seconds=600,
+            completed=True,
+            actual_duration_seconds=600,
+        )
+    )
+    db.commit()
+
+
+def client(engine, deadline: float, write_ratio: float, stats: dict, seed_: int):
+    rng = random.Random(seed_)
+    reads = writes = errors = 0
+    latencies = []
+    while time.perf_counter() < deadline:
+        is_write = rng.random() < write_ratio
+        start = time.perf_counter()
+        try:
+            with Session(engine) as db:
+                write_op(db) if is_write else read_op(db)
+        except OperationalError:
+            # "database is locked" after the busy timeout ran out
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - start)
+        if is_write:
+            writes += 1
+        else:
+            reads += 1
+
+    with stats["lock"]:
+        stats["reads"] += reads
+        stats["writes"] += writes
+        stats["errors"] += errors
+        stats["latencies"].extend(latencies)
+
+
+def run_profile(name: str, settings: dict, args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_sqlite_engine(f"sqlite:///{Path(tmp) / 'bench.db'}", settings)
+        migrations.run(engine)
+        seed(engine, args.sessions)
+
+        stats = {
+            "lock": threading.Lock(),
+            "reads": 0,
+            "writes": 0,
+            "errors": 0,
+            "latencies": [],
+        }
+        deadline = time.perf_counter() + args.seconds
+        threads = [
+            threading.Thread(
+                target=client, args=(engine, deadline, args.write_ratio, stats, i)
+            )
+            for i in range(args.clients)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    latencies = sorted(stats["latencies"]) or [0.0]
+    p99 = latencies[int(len(latencies) * 0.99) - 1] if len(latencies) > 1 else 0.0
+    total = stats["reads"] + stats["writes"]
+    print(
+        f"{name:<10}{total / args.seconds:>10.0f} ops/s"
+        f"{stats['reads'] / args.seconds:>10.0f} r/s"
+        f"{stats['writes'] / args.seconds:>10.0f} w/s"
+        f"{p99 * 1000:>10.1f} ms p99"
+        f"{stats['errors']:>8} locked"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--sessions", type=int, default=50_000)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES))
+    args = parser.parse_args()
+
+    print(
+        f"{args.clients} clients, {args.write_ratio:.0%} writes, "
+        f"{args.sessions:,} seeded sessions, {args.seconds:g}s per profile"
+    )
+    for name in args.profiles:
+        run_profile(name, PROFILES[name], args)
+
+
+if __name__ == "__main__":
+    main()
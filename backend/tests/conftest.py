@@ -1,10 +1,20 @@
 """Pytest fixtures for test configuration."""
 
-import pytest
-from fastapi.testclient import TestClient
+import os
+import tempfile
 
-from app.database import init_db
-from app.main import app
+# Point the app at a throwaway database before it builds its engine
+_TEST_DB_DIR = tempfile.mkdtemp(prefix="mindfulness-tests-")
+os.environ["MINDFULNESS_DATABASE_URL"] = f"sqlite:///{_TEST_DB_DIR}/test.db"
+os.environ["MINDFULNESS_EXPORT_DIR"] = f"{_TEST_DB_DIR}/exports"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+from sqlmodel import Session, SQLModel, create_engine  # noqa: E402
+
+from app.database import init_db  # noqa: E402
+from app.main import app  # noqa: E402
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -18,3 +28,14 @@ def setup_database():
 def client():
     """Create a test client for API testing."""
     return TestClient(app)
+
+
+@pytest.fixture
+def memory_db():
+    """Yield a session on an isolated in-memory database."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
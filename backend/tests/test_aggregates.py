@@ -0,0 +1,82 @@
+"""Test the shared SQL aggregation queries."""
+
+from datetime import UTC, date, datetime, timedelta
+
+from app.models.session import Session
+from app.services import aggregates
+
+DAY = datetime(2024, 3, 1, 8, 0, tzinfo=UTC)
+
+
+def _seed(db) -> None:
+    db.add(
+        Session(
+            planned_duration_seconds=600,
+            started_at=DAY,
+            completed=True,
+            actual_duration_seconds=599,
+            mood_after="calm",
+        )
+    )
+    db.add(
+        Session(
+            planned_duration_seconds=600,
+            started_at=DAY + timedelta(hours=2),
+            completed=True,
+            actual_duration_seconds=1200,
+            mood_after="calm",
+        )
+    )
+    db.add(
+        Session(
+            planned_duration_seconds=600,
+            started_at=DAY + timedelta(days=1),
+            completed=True,
+            actual_duration_seconds=300,
+            mood_after="tired",
+        )
+    )
+    # Incomplete sessions never count
+    db.add(
+        Session(
+            planned_duration_seconds=600,
+            started_at=DAY,
+            completed=False,
+            actual_duration_seconds=600,
+        )
+    )
+    db.commit()
+
+
+def test_completed_totals(memory_db):
+    _seed(memory_db)
+    assert aggregates.completed_totals(memory_db) == (3, 9 + 20 + 5)
+
+
+def test_completed_totals_range_is_half_open(memory_db):
+    _seed(memory_db)
+    totals = aggregates.completed_totals(
+        memory_db, start=DAY, end=DAY + timedelta(days=1)
+    )
+    assert totals == (2, 29)
+
+
+def test_daily_totals(memory_db):
+    _seed(memory_db)
+    assert aggregates.daily_totals(memory_db) == [
+        (date(2024, 3, 1), 2, 29),
+        (date(2024, 3, 2), 1, 5),
+    ]
+
+
+def test_daily_mood_counts(memory_db):
+    _seed(memory_db)
+    assert aggregates.daily_mood_counts(memory_db) == {
+        date(2024, 3, 1): {"calm": 2},
+        date(2024, 3, 2): {"tired": 1},
+    }
+
+
+def test_empty_totals(memory_db):
+    assert aggregates.completed_totals(memory_db) == (0, 0)
+    assert aggregates.daily_totals(memory_db) == []
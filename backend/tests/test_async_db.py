@@ -0,0 +1,87 @@
+"""Tests that async code paths never run sync database I/O on the event loop.
+
+Writes go through the write coordinator's thread; reads on the loop use the
+async engine.
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import event
+
+from app.database import engine
+from app.services import scheduler
+from app.services.discord import discord_service
+
+
+@pytest.fixture
+def loop_violations():
+    """Record every statement the sync engine runs on an event loop thread."""
+    violations = []
+
+    def check(conn, cursor, statement, parameters, context, executemany):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        violations.append(statement)
+
+    event.listen(engine, "before_cursor_execute", check)
+    yield violations
+    event.remove(engine, "before_cursor_execute", check)
+
+
+@pytest.fixture
+def quiet_discord(monkeypatch):
+    """Enable notifications but capture the messages instead of queueing them."""
+    sent = []
+
+    def enqueue(db, embed=None, message=""):
+        sent.append(embed)
+        return True
+
+    monkeypatch.setattr(discord_service, "webhook_url", "http://127.0.0.1:9/hook")
+    monkeypatch.setattr(discord_service, "enqueue", enqueue)
+    return sent
+
+
+def test_update_session_stays_off_the_sync_engine(
+    client, loop_violations, quiet_discord
+):
+    """Completing a session runs its streak, goal and outbox work on the writer."""
+    created = client.post(
+        "/api/sessions/", json={"planned_duration_seconds": 300}
+    ).json()
+
+    response = client.patch(
+        f"/api/sessions/{created['id']}",
+        json={"completed": True, "actual_duration_seconds": 300},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["completed"] is True
+    assert quiet_discord
+    assert loop_violations == []
+
+
+def test_generate_music_stays_off_the_sync_engine(client, loop_violations):
+    """Queueing music generation writes through the coordinator, off the loop."""
+    response = client.post(
+        "/api/music/generate", json={"prompt": "rain", "duration_seconds": 60}
+    )
+
+    assert response.status_code == 202
+    assert response.json()["status"] == "pending"
+    assert loop_violations == []
+
+
+def test_scheduler_jobs_stay_off_the_sync_engine(loop_violations, quiet_discord):
+    """Reminder and weekly summary jobs query through the async engine."""
+
+    async def run_jobs():
+        await scheduler.send_daily_reminder()
+        await scheduler.send_weekly_summary()
+
+    asyncio.run(run_jobs())
+
+    assert loop_violations == []
@@ -0,0 +1,72 @@
+"""Test the versioned read cache and ETag handling."""
+
+from sqlalchemy import event
+
+from app.database import engine
+from app.services.cache import CachedResponse, ResponseCache, data_version
+
+
+def test_repeated_read_returns_same_etag(client):
+    """Unchanged data yields the same strong ETag."""
+    first = client.get("/api/stats/summary")
+    second = client.get("/api/stats/summary")
+    assert first.status_code == second.status_code == 200
+    assert first.headers["etag"].startswith('"')
+    assert first.headers["etag"] == second.headers["etag"]
+    assert first.json() == second.json()
+
+
+def test_if_none_match_returns_304_without_queries(client):
+    """A matching If-None-Match is answered without touching the database."""
+    etag = client.get("/api/tags/").headers["etag"]
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/api/tags/", headers={"If-None-Match": etag})
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert statements == []
+
+
+def test_write_invalidates_cached_reads(client):
+    """Any committed write bumps the version and changes the ETag."""
+    before = client.get("/api/sessions/?limit=5")
+    version = data_version.value
+
+    client.post("/api/sessions/", json={"planned_duration_seconds": 300})
+
+    assert data_version.value > version
+    after = client.get(
+        "/api/sessions/?limit=5", headers={"If-None-Match": before.headers["etag"]}
+    )
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
+    assert after.json() != before.json()
+
+
+def test_query_params_are_part_of_the_key(client):
+    """Different parameters get different ETags."""
+    a = client.get("/api/stats/heatmap?days=30").headers["etag"]
+    b = client.get("/api/stats/heatmap?days=60").headers["etag"]
+    assert a != b
+
+
+def test_response_cache_evicts_least_recently_used():
+    """The cache keeps at most max_entries, dropping the oldest unused one."""
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", CachedResponse(b"a", "application/json"))
+    cache.put("b", CachedResponse(b"b", "application/json"))
+    cache.get("a")
+    cache.put("c", CachedResponse(b"c", "application/json"))
+
+    assert cache.get("b") is None
+    assert cache.get("a").body == b"a"
+    assert cache.get("c").body == b"c"
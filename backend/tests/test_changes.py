@@ -0,0 +1,82 @@
+"""Tests for the delta sync feed."""
+
+from sqlalchemy import text
+
+from app.database import engine
+
+
+def latest_seq(client) -> int:
+    """Sequence number a fully synced device would hold."""
+    since = 0
+    while True:
+        feed = client.get(f"/api/changes/?since={since}&limit=5000").json()
+        since = feed["last_seq"]
+        if not feed["has_more"]:
+            return since
+
+
+def changes(client, since: int) -> list[tuple[str, str, str]]:
+    feed = client.get(f"/api/changes/?since={since}").json()
+    return [(c["entity"], c["key"], c["op"]) for c in feed["changes"]]
+
+
+def test_writes_appear_after_the_last_synced_sequence(client):
+    since = latest_seq(client)
+
+    session = client.post("/api/sessions/", json={"planned_duration_seconds": 60})
+    session_id = session.json()["id"]
+    tag_id = client.post("/api/tags/", json={"name_ko": "밤", "name_en": "Night"})
+    tag_id = tag_id.json()["id"]
+    client.post(f"/api/tags/sessions/{session_id}/tags", json=[tag_id])
+    client.patch(f"/api/sessions/{session_id}", json={"note": "edited"})
+
+    feed = client.get(f"/api/changes/?since={since}").json()
+
+    # The session changed twice but is reported once, at its latest sequence
+    assert [(c["entity"], c["op"]) for c in feed["changes"]] == [
+        ("tag", "upsert"),
+        ("session_tag", "upsert"),
+        ("session", "upsert"),
+    ]
+    assert feed["changes"][-1]["data"]["note"] == "edited"
+    assert feed["changes"][1]["data"] == {"session_id": session_id, "tag_id": tag_id}
+    assert feed["last_seq"] == feed["changes"][-1]["seq"]
+    assert changes(client, feed["last_seq"]) == []
+
+
+def test_deleting_a_session_leaves_tombstones_for_it_and_its_tags(client):
+    session_id = client.post(
+        "/api/sessions/", json={"planned_duration_seconds": 60}
+    ).json()["id"]
+    tag_id = client.post("/api/tags/", json={"name_ko": "비", "name_en": "Rain"})
+    tag_id = tag_id.json()["id"]
+    client.post(f"/api/tags/sessions/{session_id}/tags", json=[tag_id])
+    since = latest_seq(client)
+
+    client.delete(f"/api/sessions/{session_id}")
+
+    assert changes(client, since) == [
+        ("session_tag", f"{session_id}:{tag_id}", "delete"),
+        ("session", str(session_id), "delete"),
+    ]
+    with engine.connect() as conn:
+        orphans = conn.execute(
+            text("SELECT count(*) FROM sessiontag WHERE session_id = :id"),
+            {"id": session_id},
+        ).scalar_one()
+    assert orphans == 0
+
+
+def test_feed_is_paged_by_sequence(client):
+    since = latest_seq(client)
+    for _ in range(3):
+        client.post(
+            "/api/goals/", json={"goal_type": "daily_minutes", "target_value": 5}
+        )
+
+    first = client.get(f"/api/changes/?since={since}&limit=2").json()
+    second = client.get(f"/api/changes/?since={first['last_seq']}&limit=2").json()
+
+    assert len(first["changes"]) == 2 and first["has_more"]
+    assert len(second["changes"]) == 1 and not second["has_more"]
+    assert {c["entity"] for c in first["changes"] + second["changes"]} == {"goal"}
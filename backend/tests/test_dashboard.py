@@ -0,0 +1,32 @@
+"""Test the combined dashboard endpoint."""
+
+
+def test_dashboard_matches_individual_endpoints(client):
+    """Dashboard sections agree with the standalone endpoints."""
+    session_id = client.post(
+        "/api/sessions/", json={"planned_duration_seconds": 600}
+    ).json()["id"]
+    client.patch(
+        f"/api/sessions/{session_id}",
+        json={"completed": True, "actual_duration_seconds": 600},
+    )
+    client.post("/api/goals/", json={"goal_type": "daily_minutes", "target_value": 10})
+    client.post("/api/goals/", json={"goal_type": "weekly_sessions", "target_value": 3})
+
+    response = client.get("/api/dashboard/?days=90&recent=5")
+    assert response.status_code == 200
+    data = response.json()
+
+    assert data["summary"] == client.get("/api/stats/summary").json()
+    assert data["heatmap"] == client.get("/api/stats/heatmap?days=90").json()
+    assert data["streak"] == client.get("/api/stats/streak").json()
+    assert data["goals"] == client.get("/api/goals/progress/all").json()
+    assert len(data["recent_sessions"]) <= 5
+    assert data["recent_sessions"][0]["id"] == session_id
+
+
+def test_dashboard_without_recent_sessions(client):
+    """recent=0 returns no sessions but still returns stats."""
+    data = client.get("/api/dashboard/?recent=0").json()
+    assert data["recent_sessions"] == []
+    assert "total_sessions" in data["summary"]
@@ -0,0 +1,69 @@
+"""Test engine construction and the SQLite tuning profile."""
+
+import pytest
+from sqlalchemy import text
+
+from app.database import (
+    PROJECT_ROOT,
+    async_engine,
+    create_sqlite_engine,
+    engine,
+    resolve_database_url,
+)
+
+
+def _pragma(engine, name: str):
+    with engine.connect() as conn:
+        return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_pragmas_applied_on_connect(tmp_path):
+    engine = create_sqlite_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size": -8192,
+            "temp_store": "MEMORY",
+            "busy_timeout": 1234,
+            "pool_size": 2,
+        },
+    )
+    assert _pragma(engine, "journal_mode") == "wal"
+    assert _pragma(engine, "synchronous") == 1
+    assert _pragma(engine, "cache_size") == -8192
+    assert _pragma(engine, "temp_store") == 2
+    assert _pragma(engine, "busy_timeout") == 1234
+    assert engine.pool.size() == 2
+    engine.dispose()
+
+
+def test_unset_pragmas_keep_sqlite_defaults(tmp_path):
+    engine = create_sqlite_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    assert _pragma(engine, "journal_mode") == "delete"
+    engine.dispose()
+
+
+def test_invalid_pragma_value_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        create_sqlite_engine(
+            f"sqlite:///{tmp_path / 'test.db'}", {"journal_mode": "WAL; DROP"}
+        )
+
+
+def test_relative_sqlite_url_resolves_to_project_root():
+    url = resolve_database_url("sqlite:///./backend/data/mindfulness.db")
+    assert url == f"sqlite:///{PROJECT_ROOT / 'backend' / 'data' / 'mindfulness.db'}"
+
+
+def test_absolute_and_memory_urls_unchanged(tmp_path):
+    absolute = f"sqlite:///{tmp_path / 'x.db'}"
+    assert resolve_database_url(absolute) == absolute
+    assert resolve_database_url("sqlite://") == "sqlite://"
+
+
+def test_scheduler_shares_the_app_engine():
+    from app.services import scheduler
+
+    assert scheduler.async_engine is async_engine
+    assert async_engine.url.database == engine.url.database
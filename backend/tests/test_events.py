@@ -0,0 +1,108 @@
+"""Test the event bus and the session completion subscribers."""
+
+import asyncio
+from datetime import UTC, datetime
+
+from app.models.goal import Goal
+from app.models.session import SessionCreate
+from app.services import progress, session_store
+from app.services.events import EventBus, bus
+
+
+def test_handlers_run_independently():
+    events = EventBus()
+    seen = []
+
+    @events.subscribe(str)
+    async def broken(event):
+        raise RuntimeError("boom")
+
+    @events.subscribe(str)
+    async def slow(event):
+        await asyncio.sleep(0.01)
+        seen.append(event)
+
+    async def main():
+        events.publish("hello")
+        events.publish(42)  # nobody listens for ints
+        await events.drain()
+
+    asyncio.run(main())
+    assert seen == ["hello"]
+
+
+def test_completing_a_session_publishes_once(client, monkeypatch):
+    published = []
+    monkeypatch.setattr(bus, "publish", published.append)
+    ids = [
+        client.post("/api/sessions/", json={"planned_duration_seconds": 60}).json()[
+            "id"
+        ]
+        for _ in range(2)
+    ]
+
+    for session_id in ids:
+        done = {"completed": True, "actual_duration_seconds": 60}
+        client.patch(f"/api/sessions/{session_id}", json=done)
+    client.patch(f"/api/sessions/{ids[0]}", json={"note": "already completed"})
+
+    assert [event.session.id for event in published] == ids
+    # The second completion today doesn't extend the streak again
+    assert not published[1].streak_extended
+    assert published[1].streak == client.get("/api/stats/streak").json()["current"]
+
+
+def test_goal_is_reached_by_the_session_that_crosses_its_target(memory_db):
+    memory_db.add(Goal(goal_type="daily_minutes", target_value=10))
+    memory_db.add(Goal(goal_type="weekly_sessions", target_value=5))
+    memory_db.commit()
+
+    def complete(minutes: int) -> list[str]:
+        session = session_store.create(
+            memory_db,
+            SessionCreate(planned_duration_seconds=minutes * 60),
+            datetime.now(UTC),
+        )
+        session_store.update(
+            memory_db,
+            session.id,
+            {"completed": True, "actual_duration_seconds": minutes * 60},
+        )
+        return [g.goal_type for g in progress.goals_reached(memory_db, session)]
+
+    assert complete(6) == []
+    assert complete(5) == ["daily_minutes"]
+    assert complete(5) == []
+
+
+def test_only_the_crossing_completion_carries_the_goal(client, monkeypatch):
+    published = []
+    monkeypatch.setattr(bus, "publish", published.append)
+    goal = client.post(
+        "/api/goals/", json={"goal_type": "daily_minutes", "target_value": 1}
+    ).json()
+    [today] = [
+        p
+        for p in client.get("/api/goals/progress/all").json()
+        if p["goal_id"] == goal["id"]
+    ]
+    target = today["current_value"] + 10
+    client.patch(f"/api/goals/{goal['id']}", json={"target_value": target})
+    ids = [
+        client.post("/api/sessions/", json={"planned_duration_seconds": 360}).json()[
+            "id"
+        ]
+        for _ in range(2)
+    ]
+
+    try:
+        for session_id in ids:
+            done = {"completed": True, "actual_duration_seconds": 360}
+            client.patch(f"/api/sessions/{session_id}", json=done)
+    finally:
+        client.patch(f"/api/goals/{goal['id']}", json={"is_active": False})
+
+    reached = [
+        any(g.goal_id == goal["id"] for g in event.goals_reached) for event in published
+    ]
+    assert reached == [False, True]
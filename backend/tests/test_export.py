@@ -0,0 +1,272 @@
+"""Tests for the streaming export endpoints and exporters."""
+
+import csv
+import gzip
+import io
+import json
+import tracemalloc
+import zipfile
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.database import engine
+from app.models.session import Session
+from app.services import bundle, columnar, compression, rollup
+from app.services.export import CHUNK_SIZE, buffered, export_json, export_markdown
+from app.services.writer import writer
+
+
+def make_sessions(count: int):
+    """Lazily build completed sessions, one minute apart, newest first."""
+    start = datetime(2024, 6, 1, 23, 59, tzinfo=UTC)
+    for i in range(count):
+        yield Session(
+            id=count - i,
+            started_at=start - timedelta(minutes=i),
+            planned_duration_seconds=600,
+            actual_duration_seconds=600,
+            completed=True,
+            mood_after="calm",
+            note="Breathing with the rain outside " * 4,
+        )
+
+
+def complete_session(started_at: str) -> int:
+    """Record a finished session at a fixed time in the past."""
+
+    def write(db) -> int:
+        session = Session(
+            started_at=datetime.fromisoformat(started_at),
+            planned_duration_seconds=600,
+            actual_duration_seconds=600,
+            completed=True,
+            note="a, b",
+        )
+        db.add(session)
+        rollup.apply(db, rollup.contribution(session), 1)
+        db.flush()
+        return session.id
+
+    return writer.run(write)
+
+
+def test_json_export_streams_a_valid_document(client):
+    session_id = complete_session("2021-03-04T05:06:07+00:00")
+
+    response = client.get("/api/export/json?from=2021-03-04&to=2021-03-05")
+
+    assert response.status_code == 200
+    assert "attachment" in response.headers["content-disposition"]
+    data = json.loads(response.content)
+    assert data["stats"] == {"total_sessions": 1, "total_minutes": 10}
+    assert [s["id"] for s in data["sessions"]] == [session_id]
+
+
+def test_json_export_with_no_sessions_is_valid(client):
+    response = client.get("/api/export/json?from=1999-01-01&to=1999-01-02")
+
+    data = json.loads(response.content)
+    assert data["sessions"] == []
+    assert data["stats"]["total_sessions"] == 0
+
+
+def test_csv_export_quotes_notes(client):
+    session_id = complete_session("2021-03-05T05:06:07+00:00")
+
+    response = client.get("/api/export/csv?from=2021-03-05&to=2021-03-06")
+
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0][0] == "id"
+    assert rows[1][0] == str(session_id)
+    assert rows[1][-1] == "a, b"
+
+
+def test_ical_export_wraps_events(client):
+    complete_session("2021-03-06T05:06:07+00:00")
+
+    response = client.get("/api/export/ical?from=2021-03-06&to=2021-03-07")
+
+    lines = response.text.split("\r\n")
+    assert lines[0] == "BEGIN:VCALENDAR"
+    assert lines[-1] == "END:VCALENDAR"
+    assert lines.count("BEGIN:VEVENT") == 1
+
+
+def test_markdown_groups_sessions_by_day():
+    text = "".join(export_markdown(make_sessions(3 * 24 * 60)))
+
+    headings = [line for line in text.split("\n") if line.startswith("## ")]
+    assert headings == ["## 2024-06-01", "## 2024-05-31", "## 2024-05-30"]
+
+
+def test_export_memory_stays_flat():
+    """Peak memory stays bounded by a few chunks, well below the document size."""
+    tracemalloc.start()
+    total = 0
+    for chunk in buffered(export_json(make_sessions(3_000), {})):
+        total += len(chunk)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert total > 1_000_000
+    assert peak < 8 * CHUNK_SIZE < total
+
+
+def test_first_chunk_is_sent_before_rows_are_read():
+    def rows():
+        raise AssertionError("rows read before the header was sent")
+        yield
+
+    chunks = buffered(export_json(rows(), {"total_sessions": 0}))
+
+    assert next(chunks).startswith(b"{")
+
+
+def test_compress_flag_downloads_a_gzip_file(client):
+    complete_session("2021-03-07T05:06:07+00:00")
+
+    response = client.get("/api/export/csv?from=2021-03-07&to=2021-03-08&compress=gzip")
+
+    assert response.headers["content-type"] == "application/gzip"
+    assert "mindfulness-sessions.csv.gz" in response.headers["content-disposition"]
+    assert "content-encoding" not in response.headers
+    assert gzip.decompress(response.content).startswith(b"id,started_at")
+
+
+def test_accept_encoding_compresses_on_the_fly(client):
+    response = client.get("/api/export/json", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "stats" in response.json()
+
+
+def test_zstd_stream_round_trips():
+    zstandard = pytest.importorskip("zstandard")
+    chunks = [b"a" * 1000, b"b" * 1000, b"c"]
+
+    compressed = b"".join(compression.compress(chunks, "zstd"))
+
+    reader = zstandard.ZstdDecompressor().decompressobj()
+    assert reader.decompress(compressed) == b"".join(chunks)
+
+
+def test_accepted_encoding_respects_quality_values():
+    assert compression.accepted_encoding(None) is None
+    assert compression.accepted_encoding("br") is None
+    assert compression.accepted_encoding("gzip;q=0.5, identity") == "gzip"
+    assert compression.accepted_encoding("*;q=0, gzip;q=0") is None
+    if "zstd" in compression.ENCODINGS:
+        assert compression.accepted_encoding("gzip, zstd") == "zstd"
+        assert compression.accepted_encoding("gzip, zstd;q=0.1") == "gzip"
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_columnar_exports_are_typed(client, fmt):
+    pa = pytest.importorskip("pyarrow")
+    day = {"parquet": "2021-03-08", "arrow": "2021-03-09"}[fmt]
+    complete_session(f"{day}T05:06:07+00:00")
+
+    response = client.get(f"/api/export/{fmt}?from={day}&to={day}T23:59:59")
+
+    assert response.status_code == 200
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(pa.BufferReader(response.content))
+    else:
+        table = pa.ipc.open_stream(response.content).read_all()
+    assert table.num_rows == 1
+    assert table.schema.field("mood_after").type == pa.dictionary(
+        pa.int32(), pa.string()
+    )
+    assert table.schema.field("started_at").type == pa.timestamp("us", tz="UTC")
+    assert table.column("actual_duration_seconds").to_pylist() == [600]
+
+
+def test_columnar_export_spans_batches():
+    pytest.importorskip("pyarrow")
+    import pyarrow as pa
+
+    count = columnar.BATCH_SIZE + 10
+    data = b"".join(columnar.export_columnar(make_sessions(count), "arrow"))
+
+    table = pa.ipc.open_stream(data).read_all()
+    assert table.num_rows == count
+    assert table.column("mood_after").to_pylist()[-1] == "calm"
+
+
+def test_bundle_contains_every_format_from_one_scan(client):
+    complete_session("2021-03-10T05:06:07+00:00")
+    client.post("/api/tags/", json={"name_ko": "호흡", "name_en": "Breath"})
+    unfinished = client.post("/api/sessions/", json={"planned_duration_seconds": 60})
+    scans = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "FROM session" in statement and "ORDER BY" in statement:
+            scans.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/api/export/bundle")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    assert len(scans) == 1
+    bundle = zipfile.ZipFile(io.BytesIO(response.content))
+    assert sorted(bundle.namelist()) == [
+        "goals.json",
+        "journal.md",
+        "session_tags.json",
+        "sessions.csv",
+        "sessions.ics",
+        "sessions.json",
+        "tags.json",
+    ]
+    sessions = json.loads(bundle.read("sessions.json"))["sessions"]
+    rows = list(csv.reader(io.StringIO(bundle.read("sessions.csv").decode())))
+    assert len(rows) - 1 == len(sessions) >= 1
+    events = bundle.read("sessions.ics").decode().count("BEGIN:VEVENT")
+    assert events == len(sessions)
+    assert "Breath" in {tag["name_en"] for tag in json.loads(bundle.read("tags.json"))}
+    # A backup keeps sessions that were never completed
+    assert unfinished.json()["id"] in {s["id"] for s in sessions}
+
+
+def test_bundle_formats_advance_in_lockstep(monkeypatch):
+    count = 5000
+    produced = 0
+    lag = 0
+
+    def source(from_date, to_date, completed_only=True):
+        nonlocal produced
+        for session in make_sessions(count):
+            produced += 1
+            yield session
+
+    def tracked(exporter):
+        def export(sessions, *args):
+            def rows():
+                nonlocal lag
+                for taken, session in enumerate(sessions):
+                    # Rows the tee holds for this branch
+                    lag = max(lag, produced - taken)
+                    yield session
+
+            return exporter(rows(), *args)
+
+        return export
+
+    monkeypatch.setattr(bundle, "stream_sessions", source)
+    for name in ("export_json", "export_csv", "export_ical", "export_markdown"):
+        monkeypatch.setattr(bundle, name, tracked(getattr(bundle, name)))
+
+    data = b"".join(bundle.export_bundle())
+
+    archive = zipfile.ZipFile(io.BytesIO(data))
+    assert len(json.loads(archive.read("sessions.json"))["sessions"]) == count
+    assert archive.read("journal.md").decode().count("### ") == count
+    assert lag <= 2
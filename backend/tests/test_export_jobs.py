@@ -0,0 +1,115 @@
+"""Tests for background export jobs and the export artifact cache."""
+
+import gzip
+import json
+import time
+from pathlib import Path
+
+from app.services.export_jobs import ArtifactCache
+
+
+def wait_for(client, job: dict, timeout: float = 10.0) -> dict:
+    """Poll a job until it leaves the pending/running states."""
+    deadline = time.monotonic() + timeout
+    while job["status"] in ("pending", "running"):
+        assert time.monotonic() < deadline, "export job did not finish"
+        time.sleep(0.02)
+        job = client.get(f"/api/export/jobs/{job['id']}").json()
+    return job
+
+
+def start(client, **body) -> dict:
+    response = client.post("/api/export/jobs", json=body)
+    assert response.status_code == 202
+    return response.json()
+
+
+def test_job_renders_and_downloads(client):
+    client.post("/api/sessions/", json={"planned_duration_seconds": 300})
+
+    job = wait_for(client, start(client, format="json"))
+
+    assert job["status"] == "completed"
+    assert job["progress_percent"] == 100.0
+    assert job["rows_done"] == job["rows_total"]
+    response = client.get(f"/api/export/jobs/{job['id']}/download")
+    assert response.status_code == 200
+    assert "mindfulness-export.json" in response.headers["content-disposition"]
+    assert len(response.content) == job["size_bytes"]
+    assert "sessions" in json.loads(response.content)
+
+
+def test_unchanged_data_is_served_from_the_cache(client):
+    client.post("/api/sessions/", json={"planned_duration_seconds": 300})
+    first = wait_for(client, start(client, format="csv", compress="gzip"))
+
+    again = start(client, format="csv", compress="gzip")
+
+    assert again["status"] == "completed"
+    assert again["cached"] is True
+    assert again["id"] != first["id"]
+    body = client.get(f"/api/export/jobs/{again['id']}/download").content
+    assert gzip.decompress(body).startswith(b"id,started_at")
+
+
+def test_new_writes_invalidate_the_cached_artifact(client):
+    wait_for(client, start(client, format="markdown"))
+    client.post("/api/sessions/", json={"planned_duration_seconds": 300})
+
+    job = start(client, format="markdown")
+
+    assert job["cached"] is False
+
+
+def test_download_supports_range_requests(client):
+    job = wait_for(client, start(client, format="ical"))
+    url = f"/api/export/jobs/{job['id']}/download"
+    full = client.get(url).content
+
+    head = client.get(url, headers={"Range": "bytes=0-9"})
+    rest = client.get(url, headers={"Range": "bytes=10-"})
+
+    assert head.status_code == 206
+    assert head.content == full[:10]
+    assert rest.status_code == 206
+    assert head.content + rest.content == full
+
+
+def test_invalid_requests_are_rejected(client):
+    assert client.post("/api/export/jobs", json={"format": "pdf"}).status_code == 400
+    response = client.post("/api/export/jobs", json={"compress": "brotli"})
+    assert response.status_code == 400
+    assert client.get("/api/export/jobs/missing").status_code == 404
+
+
+def test_artifact_cache_evicts_least_recently_used(tmp_path):
+    cache = ArtifactCache(tmp_path / "exports", max_bytes=25)
+
+    def store(key: str) -> None:
+        with cache.temp_file() as scratch:
+            scratch.write(b"x" * 10)
+        cache.put(key, Path(scratch.name))
+
+    store("a")
+    store("b")
+    cache.get("a")  # "b" is now the least recently used
+    store("c")
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.total_bytes == 20
+    assert sorted(p.name for p in (tmp_path / "exports").iterdir()) == [
+        "a.export",
+        "c.export",
+    ]
+
+
+def test_clearing_the_cache_spares_unrelated_files(tmp_path):
+    (tmp_path / "notes.txt").write_text("keep me")
+    (tmp_path / "stale.export").write_bytes(b"old")
+    (tmp_path / ".render-abc.part").write_bytes(b"partial")
+    cache = ArtifactCache(tmp_path, max_bytes=25)
+
+    assert cache.clear() == 2
+    assert [p.name for p in tmp_path.iterdir()] == ["notes.txt"]
@@ -0,0 +1,95 @@
+"""Test goal progress and history."""
+
+from datetime import UTC, datetime
+
+from app.models.session import SessionCreate
+from app.services import session_store
+from app.services.writer import writer
+
+
+def add_completed(started_at: datetime, minutes: int) -> None:
+    def write(db):
+        session = session_store.create(
+            db, SessionCreate(planned_duration_seconds=minutes * 60), started_at
+        )
+        session_store.update(
+            db,
+            session.id,
+            {"completed": True, "actual_duration_seconds": minutes * 60},
+        )
+
+    writer.run(write)
+
+
+def test_progress_covers_every_active_goal(client):
+    add_completed(datetime.now(UTC), 7)
+    ids = [
+        client.post("/api/goals/", json={"goal_type": t, "target_value": 5}).json()[
+            "id"
+        ]
+        for t in ("daily_minutes", "daily_sessions", "weekly_minutes", "monthly_x")
+    ]
+
+    progress = {p["goal_id"]: p for p in client.get("/api/goals/progress/all").json()}
+
+    assert progress[ids[0]]["current_value"] >= 7
+    assert progress[ids[0]]["progress_percent"] == 100.0
+    assert progress[ids[1]]["current_value"] >= 1
+    assert progress[ids[2]]["current_value"] >= progress[ids[0]]["current_value"]
+    assert progress[ids[3]]["current_value"] == 0
+
+
+def test_weekly_history_buckets_by_monday(client):
+    # Mon 2019-03-04 .. Sun 2019-03-10, then Mon 2019-03-18
+    add_completed(datetime(2019, 3, 4, 7, tzinfo=UTC), 20)
+    add_completed(datetime(2019, 3, 10, 22, tzinfo=UTC), 15)
+    add_completed(datetime(2019, 3, 18, 7, tzinfo=UTC), 10)
+    goal_id = client.post(
+        "/api/goals/", json={"goal_type": "weekly_minutes", "target_value": 30}
+    ).json()["id"]
+
+    history = client.get(
+        f"/api/goals/{goal_id}/history?from=2019-03-06&to=2019-03-19"
+    ).json()
+
+    assert [(p["start"], p["value"], p["achieved"]) for p in history] == [
+        ("2019-03-04", 35, True),
+        ("2019-03-11", 0, False),
+        ("2019-03-18", 10, False),
+    ]
+    assert history[2]["progress_percent"] == 33.3
+
+
+def test_daily_history_and_errors(client):
+    add_completed(datetime(2019, 4, 2, 7, tzinfo=UTC), 5)
+    goal_id = client.post(
+        "/api/goals/", json={"goal_type": "daily_sessions", "target_value": 1}
+    ).json()["id"]
+
+    history = client.get(
+        f"/api/goals/{goal_id}/history?from=2019-04-01&to=2019-04-03"
+    ).json()
+
+    assert [p["achieved"] for p in history] == [False, True, False]
+    assert history[1]["end"] == "2019-04-03"
+    backwards = f"/api/goals/{goal_id}/history?from=2019-04-03&to=2019-04-01"
+    assert client.get(backwards).status_code == 400
+    assert client.get("/api/goals/999999/history").status_code == 404
+    too_long = f"/api/goals/{goal_id}/history?from=1900-01-01&to=2019-04-01"
+    assert client.get(too_long).status_code == 400
+
+
+def test_default_history_covers_at_most_two_years(client):
+    goal_id = client.post(
+        "/api/goals/",
+        json={
+            "goal_type": "daily_minutes",
+            "target_value": 5,
+            "start_date": "2000-01-01",
+        },
+    ).json()["id"]
+
+    history = client.get(f"/api/goals/{goal_id}/history").json()
+
+    assert len(history) == 731
+    assert history[-1]["start"] == datetime.now(UTC).date().isoformat()
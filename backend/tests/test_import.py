@@ -0,0 +1,126 @@
+"""Tests for the bulk session import endpoint and parsers."""
+
+import io
+import json
+
+import pytest
+
+from app.services import importer
+
+
+def export_document(*sessions: dict) -> str:
+    """Build a document shaped like the JSON export."""
+    return json.dumps(
+        {"exported_at": "2024-01-01T00:00:00", "stats": {}, "sessions": list(sessions)},
+        indent=2,
+    )
+
+
+def session(day: str, minutes: int = 10, **extra) -> dict:
+    return {
+        "started_at": f"{day}T07:00:00+00:00",
+        "planned_duration_seconds": minutes * 60,
+        "actual_duration_seconds": minutes * 60,
+        "completed": True,
+        "mood_after": "calm",
+        **extra,
+    }
+
+
+def test_json_import_inserts_and_updates_stats(client):
+    before = client.get("/api/stats/summary").json()
+    body = export_document(session("2019-02-01"), session("2019-02-02", 20))
+
+    report = client.post("/api/import/", content=body).json()
+
+    assert report["format"] == "json"
+    assert (report["rows_read"], report["inserted"], report["duplicates"]) == (2, 2, 0)
+    assert report["rows_per_second"] > 0
+    after = client.get("/api/stats/summary").json()
+    assert after["total_sessions"] == before["total_sessions"] + 2
+    assert after["total_minutes"] == before["total_minutes"] + 30
+    heatmap = client.get("/api/stats/heatmap?days=100000").json()
+    assert {"date": "2019-02-02", "minutes": 20, "sessions": 1} in heatmap
+
+
+def test_reimporting_an_export_skips_duplicates(client):
+    body = export_document(session("2019-03-01"), session("2019-03-02"))
+    client.post("/api/import/", content=body)
+    exported = client.get("/api/export/json?from=2019-03-01&to=2019-03-03").content
+
+    report = client.post("/api/import/?format=json", content=exported).json()
+
+    assert report["rows_read"] == 2
+    assert report["inserted"] == 0
+    assert report["duplicates"] == 2
+
+
+def test_csv_import_reads_minutes_columns(client):
+    csv_body = (
+        "id,started_at,ended_at,planned_duration_min,actual_duration_min,"
+        "completed,visual_type,mood_before,mood_after,note\n"
+        '7,2019-04-01T06:00:00+00:00,,15,15,Yes,,,calm,"quiet, still"\n'
+        "8,,,10,10,Yes,,,,\n"
+    )
+
+    response = client.post(
+        "/api/import/", content=csv_body, headers={"Content-Type": "text/csv"}
+    )
+
+    report = response.json()
+    assert report["format"] == "csv"
+    assert (report["inserted"], report["invalid"]) == (1, 1)
+    assert report["errors"][0].startswith("Row 2")
+    exported = client.get("/api/export/json?from=2019-04-01&to=2019-04-02").json()
+    assert exported["sessions"][0]["planned_duration_seconds"] == 900
+    assert exported["sessions"][0]["note"] == "quiet, still"
+
+
+def test_malformed_json_is_rejected(client):
+    response = client.post("/api/import/", content='{"sessions": [{"started_at": ')
+
+    assert response.status_code == 400
+    assert client.post("/api/import/?format=xml", content="").status_code == 400
+
+
+def test_json_parser_handles_chunk_boundaries(monkeypatch):
+    monkeypatch.setattr(importer, "READ_SIZE", 7)
+    note = "긴 호흡 " * 20
+    body = export_document(session("2019-05-01", note=note), session("2019-05-02"))
+
+    records = list(importer.iter_json_records(io.BytesIO(body.encode())))
+
+    assert [r["started_at"][:10] for r in records] == ["2019-05-01", "2019-05-02"]
+    assert records[0]["note"] == note
+
+
+def test_json_parser_accepts_a_bare_array():
+    body = json.dumps([session("2019-06-01")])
+
+    records = list(importer.iter_json_records(io.BytesIO(body.encode())))
+
+    assert len(records) == 1
+
+
+@pytest.mark.parametrize("body", ["", "{}", '{"sessions": [1]}'])
+def test_json_parser_rejects_documents_without_sessions(body):
+    with pytest.raises(importer.InvalidImport):
+        list(importer.iter_json_records(io.BytesIO(body.encode())))
+
+
+def test_imported_row_reusing_a_deleted_id_is_synced_as_live(client):
+    created = client.post("/api/sessions/", json={"planned_duration_seconds": 60})
+    session_id = created.json()["id"]
+    client.delete(f"/api/sessions/{session_id}")
+    feed = client.get("/api/changes/?since=0&limit=5000").json()
+    while feed["has_more"]:
+        feed = client.get(f"/api/changes/?since={feed['last_seq']}&limit=5000").json()
+
+    # SQLite hands the freed highest id to the next inserted row
+    client.post("/api/import/", content=export_document(session("2019-05-01")))
+
+    changes = client.get(f"/api/changes/?since={feed['last_seq']}").json()["changes"]
+    assert client.get(f"/api/sessions/{session_id}").status_code == 200
+    assert [(c["entity"], c["key"], c["op"]) for c in changes] == [
+        ("session", str(session_id), "upsert")
+    ]
@@ -0,0 +1,158 @@
+"""Test the schema migration runner."""
+
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app import migrations
+from app.models.rollup import DailyRollup
+from app.models.session import Session as MeditationSession
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Engine on an empty database file."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    yield engine
+    engine.dispose()
+
+
+def _indexes(engine) -> set[str]:
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'index'")
+        ).all()
+    return {row[0] for row in rows}
+
+
+def test_fresh_database_reaches_latest_version(engine):
+    applied = migrations.run(engine)
+
+    assert applied == [m.name for m in migrations.MIGRATIONS]
+    with engine.connect() as conn:
+        assert migrations.current_version(conn) == migrations.LATEST_VERSION
+    assert {
+        "ix_session_completed_started_at",
+        "ix_session_started_at_id",
+        "ix_sessiontag_tag_id",
+        "ix_generatedmusic_status_created_at",
+        "ix_sync_receipt_client_id",
+        "ix_generatedmusic_request_key",
+    } <= _indexes(engine)
+
+
+def test_current_schema_is_skipped(engine):
+    migrations.run(engine)
+    assert migrations.run(engine) == []
+
+
+def test_existing_database_is_upgraded_and_backfilled(engine):
+    """A pre-migration database gets indexes and rollups from its sessions."""
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(
+            MeditationSession(
+                planned_duration_seconds=600,
+                started_at=datetime(2024, 5, 1, 7, tzinfo=UTC),
+                completed=True,
+                actual_duration_seconds=600,
+            )
+        )
+        db.commit()
+
+    migrations.run(engine)
+
+    with Session(engine) as db:
+        rows = db.exec(select(DailyRollup)).all()
+    assert [(r.day.isoformat(), r.sessions, r.minutes) for r in rows] == [
+        ("2024-05-01", 1, 10)
+    ]
+
+
+def test_range_aggregate_uses_covering_index(engine):
+    migrations.run(engine)
+    with engine.connect() as conn:
+        plan = conn.execute(
+            text(
+                "EXPLAIN QUERY PLAN SELECT date(started_at), "
+                "sum(coalesce(actual_duration_seconds, 0) / 60) FROM session "
+                "WHERE completed = 1 AND started_at >= :start "
+                "GROUP BY date(started_at)"
+            ),
+            {"start": "2024-01-01 00:00:00"},
+        ).all()
+    details = " ".join(row[-1] for row in plan)
+    assert "COVERING INDEX ix_session_completed_started_at" in details
+
+
+def test_duplicate_sessions_are_removed_before_the_unique_index(engine):
+    """Upgrading keeps the first of any sessions recorded twice."""
+    SQLModel.metadata.create_all(engine)
+    started = datetime(2024, 5, 2, 7, tzinfo=UTC)
+    with Session(engine) as db:
+        for _ in range(2):
+            db.add(
+                MeditationSession(
+                    planned_duration_seconds=600,
+                    started_at=started,
+                    completed=True,
+                    actual_duration_seconds=600,
+                )
+            )
+        db.commit()
+
+    migrations.run(engine)
+
+    with Session(engine) as db:
+        sessions = db.exec(select(MeditationSession)).all()
+        rollups = db.exec(select(DailyRollup)).all()
+    assert [s.id for s in sessions] == [1]
+    assert [(r.sessions, r.minutes) for r in rollups] == [(1, 10)]
+    assert "ux_session_started_at_planned" in _indexes(engine)
+
+
+def test_change_log_is_backfilled_and_orphaned_tags_removed(engine):
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(
+            MeditationSession(
+                planned_duration_seconds=600,
+                started_at=datetime(2024, 5, 3, 7, tzinfo=UTC),
+            )
+        )
+        db.commit()
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO tag (id, name_ko, name_en, color, is_default) VALUES (1, '숨', 'Breath', '#fff', 0)"
+            )
+        )
+        conn.execute(text("INSERT INTO sessiontag VALUES (1, 1), (99, 1)"))
+
+    migrations.run(engine)
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM tag WHERE id = 1"))
+        log = conn.execute(
+            text("SELECT entity, key, deleted FROM change_log ORDER BY seq")
+        ).all()
+    # The link to missing session 99 is gone; the later delete is a tombstone
+    assert log == [("session", "1", 0), ("session_tag", "1:1", 0), ("tag", "1", 1)]
+
+
+def test_reused_ids_replace_their_tombstone_under_insert_or_ignore(engine):
+    migrations.run(engine)
+    row = "(id, started_at, planned_duration_seconds, completed, created_at)"
+    values = "(1, '2024-05-03 07:00:00', 600, 0, '2024-05-03 07:00:00')"
+
+    with engine.begin() as conn:
+        conn.execute(text(f"INSERT INTO session {row} VALUES {values}"))
+        conn.execute(text("DELETE FROM session WHERE id = 1"))
+        # The importer's statement; its policy also governs the triggers
+        conn.execute(text(f"INSERT OR IGNORE INTO session {row} VALUES {values}"))
+        log = conn.execute(
+            text("SELECT entity, key, deleted FROM change_log ORDER BY seq")
+        ).all()
+    assert log == [("session", "1", 0)]
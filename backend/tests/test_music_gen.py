@@ -0,0 +1,120 @@
+"""Test streaming generated audio to disk against a local fake Gemini API."""
+
+import asyncio
+import base64
+import hashlib
+import threading
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services.music_gen import music_gen_service
+from app.services.outbound import outbound
+
+# 8 MB of audio sent as ~10.7 MB of base64; blocks are a multiple of 3 bytes
+# so each encodes on its own
+BLOCK = 3 * 21_846
+BLOCKS = 128
+
+
+def audio_block(i: int) -> bytes:
+    return hashlib.sha256(str(i).encode()).digest() * (BLOCK // 32) + bytes(BLOCK % 32)
+
+
+class FakeGemini(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        head, tail = self.server.body
+        size = len(head) + len(tail) + BLOCKS * (BLOCK // 3 * 4)
+        if self.server.escape_slashes:
+            size += sum(audio.count(b"/") for audio in self.server.encoded())
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(size))
+        self.end_headers()
+        self.wfile.write(head)
+        for encoded in self.server.encoded():
+            if self.server.escape_slashes:
+                encoded = encoded.replace(b"/", b"\\/")
+            self.wfile.write(encoded)
+        self.wfile.write(tail)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def gemini(monkeypatch, tmp_path):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGemini)
+    server.body = (
+        b'{"candidates": [{"content": {"parts": [{"text": "Here you go"}, '
+        b'{"inlineData": {"mimeType": "audio/mp3", "data": "',
+        b'"}}]}}], "usageMetadata": {"totalTokenCount": 42}}',
+    )
+    server.escape_slashes = False
+    server.encoded = lambda: (base64.b64encode(audio_block(i)) for i in range(BLOCKS))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(music_gen_service, "api_key", "test")
+    monkeypatch.setattr(
+        music_gen_service,
+        "api_url",
+        f"http://127.0.0.1:{server.server_address[1]}/generateContent",
+    )
+    monkeypatch.setattr(music_gen_service, "output_dir", tmp_path)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def generate() -> tuple[str, int]:
+    """Run generation; returns the filename and peak traced memory."""
+
+    async def main():
+        try:
+            return await music_gen_service.generate("rain", 60)
+        finally:
+            await outbound.aclose()
+
+    tracemalloc.start()
+    try:
+        filename = asyncio.run(main())
+        return filename, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def expected_digest() -> str:
+    digest = hashlib.sha256()
+    for i in range(BLOCKS):
+        digest.update(audio_block(i))
+    return digest.hexdigest()
+
+
+def test_audio_is_decoded_to_disk_in_constant_memory(gemini, tmp_path):
+    filename, peak = generate()
+
+    assert filename == f"{expected_digest()}.mp3"
+    assert (tmp_path / filename).stat().st_size == BLOCK * BLOCKS
+    assert list(tmp_path.glob("*.part")) == []
+    # The whole response would be over 10 MB
+    assert peak < 2 * 1024 * 1024
+
+
+def test_escaped_slashes_are_decoded(gemini, tmp_path):
+    gemini.escape_slashes = True
+
+    filename, _ = generate()
+
+    assert filename == f"{expected_digest()}.mp3"
+
+
+def test_responses_without_audio_leave_nothing_behind(gemini, tmp_path):
+    gemini.body = (b'{"candidates": [{"content": {"parts": [{"text": "', b'"}]}}]}')
+
+    filename, _ = generate()
+
+    assert filename is None
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,135 @@
+"""Test the background music generation queue."""
+
+import asyncio
+import hashlib
+
+from app.models.generated_music import GeneratedMusic
+from app.services import music_jobs as music_jobs_module
+from app.services.music_gen import music_gen_service
+from app.services.music_jobs import MusicJobQueue, music_jobs
+from app.services.writer import writer
+
+
+def add(db, music: GeneratedMusic) -> int:
+    db.add(music)
+    db.flush()
+    return music.id
+
+
+def test_generate_returns_a_pending_job(client):
+    response = client.post(
+        "/api/music/generate", json={"prompt": "rain", "duration_seconds": 30}
+    )
+
+    assert response.status_code == 202
+    music = response.json()
+    assert (music["status"], music["filename"], music["error"]) == ("pending", "", None)
+    status = client.get(f"/api/music/status/{music['id']}").json()
+    assert status["status"] == "pending"
+
+
+def test_workers_finish_jobs_and_recover_interrupted_ones(client, monkeypatch):
+    active = peak = 0
+
+    async def generate(prompt: str, duration_seconds: int = 120):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        if prompt == "broken":
+            raise RuntimeError("upstream said no")
+        return f"{prompt}.mp3"
+
+    monkeypatch.setattr(music_jobs_module.music_gen_service, "generate", generate)
+    ids = [
+        client.post("/api/music/generate", json={"prompt": p}).json()["id"]
+        for p in ("drizzle", "waves", "birds", "broken")
+    ]
+    # A job that was mid-generation when the previous process stopped
+    interrupted = writer.run(
+        lambda db: add(
+            db,
+            GeneratedMusic(
+                prompt="wind", duration_seconds=60, filename="", status="generating"
+            ),
+        )
+    )
+
+    queue = MusicJobQueue(workers=2)
+
+    async def main():
+        assert await queue.start() >= 5
+        await queue.join()
+        await queue.stop()
+
+    asyncio.run(main())
+
+    jobs = {i: client.get(f"/api/music/status/{i}").json() for i in ids}
+    assert [jobs[i]["status"] for i in ids] == ["completed"] * 3 + ["failed"]
+    assert jobs[ids[0]]["filename"] == "drizzle.mp3"
+    assert jobs[ids[3]]["error"] == "upstream said no"
+    assert client.get(f"/api/music/status/{interrupted}").json()["status"] == (
+        "completed"
+    )
+    assert peak == 2
+
+
+def test_identical_requests_share_one_job(client, monkeypatch):
+    submitted = []
+    monkeypatch.setattr(music_jobs, "submit", submitted.append)
+
+    first = client.post(
+        "/api/music/generate", json={"prompt": "Soft  Rain", "duration_seconds": 45}
+    )
+    second = client.post(
+        "/api/music/generate", json={"prompt": " soft rain", "duration_seconds": 45}
+    )
+    longer = client.post(
+        "/api/music/generate", json={"prompt": "soft rain", "duration_seconds": 90}
+    )
+
+    assert second.status_code == 202
+    assert second.json()["id"] == first.json()["id"]
+    assert longer.json()["id"] != first.json()["id"]
+    assert submitted == [first.json()["id"], longer.json()["id"]]
+
+
+def test_finished_tracks_are_served_without_regenerating(client, monkeypatch, tmp_path):
+    submitted = []
+    monkeypatch.setattr(music_jobs, "submit", submitted.append)
+    monkeypatch.setattr(music_gen_service, "output_dir", tmp_path)
+    request = {"prompt": "tibetan bowls", "duration_seconds": 120}
+    music_id = client.post("/api/music/generate", json=request).json()["id"]
+    filename = music_gen_service.store(b"ID3 fake audio")
+
+    def finish(db, music_id: int, status: str) -> None:
+        music = db.get(GeneratedMusic, music_id)
+        music.status, music.filename = status, filename
+        db.add(music)
+
+    writer.run(lambda db: finish(db, music_id, "completed"))
+    cached = client.post("/api/music/generate", json=request)
+
+    assert cached.status_code == 200
+    assert cached.json()["id"] == music_id
+    assert cached.json()["filename"] == filename
+    assert submitted == [music_id]
+
+    # A track whose file is gone, or whose job failed, is generated again
+    (tmp_path / filename).unlink()
+    retry = client.post("/api/music/generate", json=request).json()["id"]
+    writer.run(lambda db: finish(db, retry, "failed"))
+    again = client.post("/api/music/generate", json=request).json()["id"]
+    assert submitted == [music_id, retry, again]
+
+
+def test_tracks_are_stored_by_content(monkeypatch, tmp_path):
+    monkeypatch.setattr(music_gen_service, "output_dir", tmp_path)
+
+    first = music_gen_service.store(b"same audio")
+    second = music_gen_service.store(b"same audio")
+
+    assert first == second
+    assert first == hashlib.sha256(b"same audio").hexdigest() + ".mp3"
+    assert [p.name for p in tmp_path.iterdir()] == [first]
@@ -0,0 +1,93 @@
+"""Test the shared outbound HTTP client against a local stub server."""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services.discord import discord_service
+from app.services.outbound import OutboundClient, outbound
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        with server.lock:
+            server.bodies.append(body)
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+        time.sleep(server.delay)
+        with server.lock:
+            server.active -= 1
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.lock = threading.Lock()
+    server.bodies, server.active, server.peak, server.delay = [], 0, 0, 0.0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/hook"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_connections_are_reused(stub):
+    client = OutboundClient()
+
+    async def main():
+        for _ in range(3):
+            response = await client.post(stub.url, json={})
+            assert response.text == "ok"
+        await client.aclose()
+
+    asyncio.run(main())
+
+    stats = client.snapshot()["hosts"]["127.0.0.1"]
+    assert stats["requests"] == 3
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == 2
+    assert stats["latency_ms"]["p50"] > 0
+
+
+def test_concurrent_requests_per_host_are_capped(stub):
+    stub.delay = 0.05
+    client = OutboundClient(max_connections_per_host=2)
+
+    async def main():
+        await asyncio.gather(*(client.post(stub.url, json={}) for _ in range(6)))
+        await client.aclose()
+
+    asyncio.run(main())
+
+    assert len(stub.bodies) == 6
+    assert stub.peak == 2
+
+
+def test_discord_webhooks_use_the_shared_client(stub, monkeypatch):
+    monkeypatch.setattr(discord_service, "webhook_url", stub.url)
+    before = outbound.snapshot()["hosts"].get("127.0.0.1", {}).get("requests", 0)
+
+    async def main():
+        assert await discord_service.send_webhook("hello")
+        await outbound.aclose()
+
+    asyncio.run(main())
+
+    assert json.loads(stub.bodies[0]) == {"content": "hello"}
+    assert outbound.snapshot()["hosts"]["127.0.0.1"]["requests"] == before + 1
@@ -0,0 +1,170 @@
+"""Test the durable webhook outbox against a local fake webhook server."""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from app.database import engine
+from app.models.outbox import WebhookMessage
+from app.services import outbox
+from app.services.discord import discord_service
+from app.services.events import bus
+from app.services.outbound import outbound
+from app.services.outbox import OutboxDispatcher
+from app.services.writer import writer
+
+
+class FakeWebhook(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        with server.lock:
+            server.payloads.append(json.loads(body))
+            status, headers, reply = (
+                server.script.pop(0) if server.script else (204, {}, b"")
+            )
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+        server.received.set()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def webhook():
+    with Session(engine) as db:
+        db.exec(delete(WebhookMessage))
+        db.commit()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeWebhook)
+    server.lock = threading.Lock()
+    server.payloads, server.script = [], []
+    server.received = threading.Event()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/api/webhooks/1/x"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def queue(url: str, count: int) -> None:
+    for i in range(count):
+        writer.run(lambda db, i=i: outbox.enqueue(db, url, {"title": f"#{i}"}))
+
+
+def messages() -> list[WebhookMessage]:
+    with Session(engine) as db:
+        return list(db.exec(select(WebhookMessage)).all())
+
+
+def run(coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            await outbound.aclose()
+
+    return asyncio.run(main())
+
+
+def test_burst_is_coalesced_into_few_requests(webhook):
+    queue(webhook.url, 12)
+    dispatcher = OutboxDispatcher(min_interval_seconds=0)
+
+    async def drain():
+        while await dispatcher.send_next() is not None:
+            pass
+
+    run(drain())
+
+    assert [len(p["embeds"]) for p in webhook.payloads] == [10, 2]
+    titles = [e["title"] for p in webhook.payloads for e in p["embeds"]]
+    assert titles == [f"#{i}" for i in range(12)]
+    assert messages() == []
+
+
+def test_rate_limit_pauses_without_using_an_attempt(webhook):
+    queue(webhook.url, 1)
+    webhook.script.append((429, {}, b'{"retry_after": 1.5, "global": false}'))
+    dispatcher = OutboxDispatcher(min_interval_seconds=0)
+
+    assert run(dispatcher.send_next()) == 1.5
+    [pending] = messages()
+    assert (pending.status, pending.attempts) == ("pending", 0)
+
+    run(dispatcher.send_next())
+    assert messages() == []
+    assert dispatcher.stats["rate_limited"] == 1
+
+
+def test_server_errors_are_retried_then_parked(webhook):
+    queue(webhook.url, 1)
+    webhook.script += [(503, {}, b"down")] * 2
+    dispatcher = OutboxDispatcher(
+        min_interval_seconds=0, max_attempts=2, backoff_base_seconds=0
+    )
+
+    run(dispatcher.send_next())
+    [retrying] = messages()
+    assert (retrying.status, retrying.attempts) == ("pending", 1)
+
+    run(dispatcher.send_next())
+    [failed] = messages()
+    assert (failed.status, failed.attempts) == ("failed", 2)
+    assert failed.last_error == "HTTP 503: down"
+    assert run(dispatcher.send_next()) is None
+
+
+def test_rejected_messages_are_not_retried(webhook):
+    queue(webhook.url, 1)
+    webhook.script.append((400, {}, b'{"message": "Invalid Form Body"}'))
+
+    run(OutboxDispatcher(min_interval_seconds=0).send_next())
+
+    [failed] = messages()
+    assert (failed.status, failed.attempts) == ("failed", 1)
+
+
+def test_queued_notifications_are_delivered_by_the_dispatcher(webhook, monkeypatch):
+    monkeypatch.setattr(discord_service, "webhook_url", webhook.url)
+    dispatcher = OutboxDispatcher(min_interval_seconds=0)
+    monkeypatch.setattr(outbox, "dispatcher", dispatcher)
+
+    async def main():
+        dispatcher.start()
+        await discord_service.queue(discord_service.streak_milestone_embed(7))
+        await asyncio.to_thread(webhook.received.wait, 5)
+        await dispatcher.stop()
+
+    run(main())
+
+    assert webhook.payloads[0]["embeds"][0]["title"].startswith("🔥")
+
+
+def test_completion_messages_are_committed_with_the_session(
+    webhook, client, monkeypatch
+):
+    monkeypatch.setattr(discord_service, "webhook_url", webhook.url)
+    # Nothing runs after the commit: the messages must already be queued
+    monkeypatch.setattr(bus, "publish", lambda event: None)
+    created = client.post("/api/sessions/", json={"planned_duration_seconds": 300})
+
+    client.patch(
+        f"/api/sessions/{created.json()['id']}",
+        json={"completed": True, "actual_duration_seconds": 300},
+    )
+
+    titles = [message.embed["title"] for message in messages()]
+    assert "🧘 Meditation Complete" in titles
+    assert {message.url for message in messages()} == {webhook.url}
@@ -1,6 +1,14 @@
 """Test sessions API endpoints."""
 
+from datetime import UTC, datetime
+
 import pytest
+from sqlalchemy import text
+
+from app.database import engine
+from app.models.session import SessionCreate
+from app.services import session_store
+from app.services.writer import writer
 
 
 def test_create_session(client):
@@ -110,3 +118,68 @@ def test_delete_session_not_found(client):
     """DELETE /api/sessions/{id} returns 404 for non-existent session."""
     response = client.delete("/api/sessions/99999")
     assert response.status_code == 404
+
+
+def test_list_sessions_cursor_pagination(client):
+    """Following X-Next-Cursor walks the history without gaps or repeats."""
+    for _ in range(10):
+        client.post("/api/sessions/", json={"planned_duration_seconds": 60})
+    expected = [s["id"] for s in client.get("/api/sessions/?limit=100000").json()]
+
+    seen = []
+    response = client.get("/api/sessions/?limit=4")
+    while True:
+        seen.extend(s["id"] for s in response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+        response = client.get(f"/api/sessions/?limit=4&cursor={cursor}")
+
+    assert seen == expected
+    assert int(response.headers["x-total-estimate"]) >= len(expected)
+
+
+def test_list_sessions_last_page_has_no_cursor(client):
+    """A page shorter than the limit ends the listing."""
+    response = client.get("/api/sessions/?limit=100000")
+    assert "x-next-cursor" not in response.headers
+
+
+def test_list_sessions_invalid_cursor(client):
+    """A malformed cursor is rejected."""
+    response = client.get("/api/sessions/?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+def test_cursor_page_uses_index():
+    """Keyset pages are served from the (started_at, id) index."""
+    with engine.connect() as conn:
+        plan = conn.execute(
+            text(
+                "EXPLAIN QUERY PLAN SELECT * FROM session "
+                "WHERE started_at <= :ts AND (started_at < :ts OR id < :id) "
+                "ORDER BY started_at DESC, id DESC LIMIT 50"
+            ),
+            {"ts": "2030-01-01 00:00:00", "id": 1},
+        ).all()
+    details = " ".join(row[-1] for row in plan)
+    assert "ix_session_started_at_id" in details
+    assert "TEMP B-TREE" not in details
+
+
+def test_ranged_estimate_counts_incomplete_sessions(client):
+    """A date-filtered listing's estimate isn't limited to completed sessions."""
+    for hour in range(3):
+        started_at = datetime(2018, 7, 1, hour, tzinfo=UTC)
+        writer.run(
+            lambda db, started_at=started_at: session_store.create(
+                db, SessionCreate(planned_duration_seconds=60), started_at
+            )
+        )
+
+    response = client.get(
+        "/api/sessions/?from_date=2018-07-01T00:00:00Z&to_date=2018-07-01T23:00:00Z"
+    )
+
+    assert len(response.json()) == 3
+    assert response.headers["x-total-estimate"] == "3"
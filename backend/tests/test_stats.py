@@ -0,0 +1,100 @@
+"""Test stats API endpoints and daily rollup maintenance."""
+
+from datetime import UTC, datetime
+
+from sqlmodel import Session, select
+
+from app.database import engine
+from app.models.rollup import DailyRollup
+from app.services import rollup
+
+
+def _complete_session(client, seconds: int = 600, mood: str = "calm") -> int:
+    """Create a session and mark it completed, returning its id."""
+    session_id = client.post(
+        "/api/sessions/", json={"planned_duration_seconds": seconds}
+    ).json()["id"]
+    client.patch(
+        f"/api/sessions/{session_id}",
+        json={
+            "completed": True,
+            "actual_duration_seconds": seconds,
+            "mood_after": mood,
+        },
+    )
+    return session_id
+
+
+def _today_entry(client) -> dict:
+    """Return today's heatmap entry, or zeros if there is none."""
+    today = datetime.now(UTC).date().isoformat()
+    for entry in client.get("/api/stats/heatmap?days=1").json():
+        if entry["date"] == today:
+            return entry
+    return {"date": today, "minutes": 0, "sessions": 0}
+
+
+def _rollup_rows() -> list[tuple]:
+    with Session(engine) as db:
+        rows = db.exec(select(DailyRollup).order_by(DailyRollup.day)).all()
+        return [(r.day, r.minutes, r.sessions, r.mood_counts) for r in rows]
+
+
+def test_completing_session_updates_summary_and_heatmap(client):
+    """Completing a session is reflected in summary and heatmap."""
+    summary_before = client.get("/api/stats/summary").json()
+    today_before = _today_entry(client)
+
+    _complete_session(client, seconds=580)
+
+    summary_after = client.get("/api/stats/summary").json()
+    today_after = _today_entry(client)
+    assert summary_after["total_sessions"] == summary_before["total_sessions"] + 1
+    assert summary_after["total_minutes"] == summary_before["total_minutes"] + 9
+    assert today_after["sessions"] == today_before["sessions"] + 1
+    assert today_after["minutes"] == today_before["minutes"] + 9
+    assert summary_after["current_streak"] >= 1
+
+
+def test_incomplete_session_not_counted(client):
+    """Sessions that are never completed don't touch the rollup."""
+    before = client.get("/api/stats/summary").json()
+    client.post("/api/sessions/", json={"planned_duration_seconds": 300})
+    after = client.get("/api/stats/summary").json()
+    assert after["total_sessions"] == before["total_sessions"]
+
+
+def test_deleting_completed_session_reverts_rollup(client):
+    """Deleting a completed session removes its contribution."""
+    session_id = _complete_session(client, seconds=1200)
+    before = client.get("/api/stats/summary").json()
+
+    client.delete(f"/api/sessions/{session_id}")
+
+    after = client.get("/api/stats/summary").json()
+    assert after["total_sessions"] == before["total_sessions"] - 1
+    assert after["total_minutes"] == before["total_minutes"] - 20
+
+
+def test_rebuild_matches_incremental_rollup(client):
+    """A full rebuild yields the same rows the write path maintained."""
+    _complete_session(client, mood="happy")
+    session_id = _complete_session(client, mood="tired")
+    client.patch(f"/api/sessions/{session_id}", json={"mood_after": "calm"})
+
+    incremental = _rollup_rows()
+    with Session(engine) as db:
+        rollup.rebuild(db)
+        db.commit()
+
+    assert _rollup_rows() == incremental
+
+
+def test_streak_from_rollup(client):
+    """Streak endpoint agrees with the summary."""
+    _complete_session(client)
+    streak = client.get("/api/stats/streak").json()
+    summary = client.get("/api/stats/summary").json()
+    assert streak["current"] == summary["current_streak"]
+    assert streak["longest"] == summary["longest_streak"]
+    assert streak["current"] >= 1
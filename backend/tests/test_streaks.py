@@ -0,0 +1,82 @@
+"""Test the incremental streak engine against a full recomputation."""
+
+import random
+from datetime import date, timedelta
+
+from app.services import rollup, streaks
+from app.services.rollup import Contribution
+
+START = date(2024, 1, 1)
+
+
+def _expected(days: set[date]) -> tuple:
+    return streaks._scan(sorted(days))
+
+
+def _actual(db) -> tuple:
+    state = streaks.get_state(db)
+    return state.run_start, state.current_length, state.longest, state.last_active
+
+
+def _add(db, day: date) -> None:
+    rollup.apply(db, Contribution(day=day, minutes=10, mood=None), 1)
+    db.commit()
+
+
+def _remove(db, day: date) -> None:
+    rollup.apply(db, Contribution(day=day, minutes=10, mood=None), -1)
+    db.commit()
+
+
+def test_appending_consecutive_days_extends_run(memory_db):
+    for offset in range(5):
+        _add(memory_db, START + timedelta(days=offset))
+    assert _actual(memory_db) == (START, 5, 5, START + timedelta(days=4))
+
+
+def test_gap_starts_new_run_and_keeps_longest(memory_db):
+    for offset in [0, 1, 2, 5, 6]:
+        _add(memory_db, START + timedelta(days=offset))
+    assert _actual(memory_db) == (
+        START + timedelta(days=5),
+        2,
+        3,
+        START + timedelta(days=6),
+    )
+
+
+def test_backfill_merges_runs(memory_db):
+    for offset in [0, 1, 3, 4, 5]:
+        _add(memory_db, START + timedelta(days=offset))
+    _add(memory_db, START + timedelta(days=2))
+    assert _actual(memory_db) == (START, 6, 6, START + timedelta(days=5))
+
+
+def test_removing_middle_day_splits_run(memory_db):
+    days = {START + timedelta(days=offset) for offset in range(7)}
+    for day in sorted(days):
+        _add(memory_db, day)
+    _remove(memory_db, START + timedelta(days=2))
+    days.discard(START + timedelta(days=2))
+    assert _actual(memory_db) == _expected(days)
+
+
+def test_second_session_on_same_day_keeps_streak(memory_db):
+    _add(memory_db, START)
+    _add(memory_db, START)
+    _remove(memory_db, START)
+    assert _actual(memory_db) == (START, 1, 1, START)
+
+
+def test_random_edits_match_full_scan(memory_db):
+    rng = random.Random(42)
+    active: set[date] = set()
+    for _ in range(400):
+        day = START + timedelta(days=rng.randrange(60))
+        if day in active and rng.random() < 0.5:
+            _remove(memory_db, day)
+            active.discard(day)
+        elif day not in active:
+            _add(memory_db, day)
+            active.add(day)
+        assert _actual(memory_db) == _expected(active)
@@ -0,0 +1,164 @@
+"""Tests for the batched offline sync endpoint."""
+
+import uuid
+
+from sqlmodel import Session as DBSession, select
+
+from app.database import engine
+from app.models.rollup import DailyRollup
+from app.services import rollup
+
+
+def key() -> str:
+    return uuid.uuid4().hex
+
+
+def offline_batch(client_id: str, started_at: str, tag_id: int) -> list[dict]:
+    """A session recorded offline: created, finished and tagged."""
+    return [
+        {
+            "key": key(),
+            "op": "create",
+            "client_id": client_id,
+            "data": {"planned_duration_seconds": 600, "started_at": started_at},
+        },
+        {
+            "key": key(),
+            "op": "update",
+            "client_id": client_id,
+            "data": {"completed": True, "actual_duration_seconds": 600},
+        },
+        {"key": key(), "op": "tag", "client_id": client_id, "tag_ids": [tag_id]},
+    ]
+
+
+def make_tag(client) -> int:
+    return client.post(
+        "/api/tags/", json={"name_ko": "숨", "name_en": "Breath"}
+    ).json()["id"]
+
+
+def test_batch_is_applied_and_returns_server_ids(client):
+    tag_id = make_tag(client)
+    client_id = key()
+
+    response = client.post(
+        "/api/sync/",
+        json={"operations": offline_batch(client_id, "2020-01-05T06:00:00Z", tag_id)},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    session_id = body["id_map"][client_id]
+    assert [r["status"] for r in body["results"]] == ["applied"] * 3
+    assert {r["session_id"] for r in body["results"]} == {session_id}
+    session = client.get(f"/api/sessions/{session_id}").json()
+    assert session["completed"] is True
+    assert session["started_at"].startswith("2020-01-05T06:00:00")
+    tags = client.get(f"/api/tags/sessions/{session_id}/tags").json()
+    assert [t["id"] for t in tags] == [tag_id]
+    heatmap = client.get("/api/stats/heatmap?days=100000").json()
+    assert {"date": "2020-01-05", "minutes": 10, "sessions": 1} in heatmap
+
+
+def test_replayed_batch_is_a_no_op(client):
+    tag_id = make_tag(client)
+    client_id = key()
+    batch = {"operations": offline_batch(client_id, "2020-01-06T06:00:00Z", tag_id)}
+    first = client.post("/api/sync/", json=batch).json()
+    before = client.get("/api/stats/summary").json()
+
+    replay = client.post("/api/sync/", json=batch).json()
+
+    assert [r["status"] for r in replay["results"]] == ["replayed"] * 3
+    assert replay["id_map"] == first["id_map"]
+    assert client.get("/api/stats/summary").json() == before
+
+
+def test_later_batch_can_refer_to_an_earlier_client_id(client):
+    client_id = key()
+    create = {
+        "key": key(),
+        "op": "create",
+        "client_id": client_id,
+        "data": {"planned_duration_seconds": 300},
+    }
+    first = client.post("/api/sync/", json={"operations": [create]}).json()
+
+    note = {
+        "key": key(),
+        "op": "update",
+        "client_id": client_id,
+        "data": {"note": "hi"},
+    }
+    second = client.post("/api/sync/", json={"operations": [note]}).json()
+
+    session_id = first["id_map"][client_id]
+    assert second["results"][0]["session_id"] == session_id
+    assert client.get(f"/api/sessions/{session_id}").json()["note"] == "hi"
+
+
+def test_invalid_operation_rolls_back_the_whole_batch(client):
+    client_id = key()
+    operations = [
+        {
+            "key": key(),
+            "op": "create",
+            "client_id": client_id,
+            "data": {
+                "planned_duration_seconds": 300,
+                "started_at": "2020-01-07T06:00Z",
+            },
+        },
+        {"key": key(), "op": "create", "data": {"visual_type": "no duration"}},
+    ]
+
+    response = client.post("/api/sync/", json={"operations": operations})
+
+    assert response.status_code == 422
+    assert response.json()["detail"]["index"] == 1
+    retry = client.post("/api/sync/", json={"operations": operations[:1]}).json()
+    assert retry["results"][0]["status"] == "applied"
+
+
+def test_unknown_sessions_are_reported_not_found(client):
+    operations = [
+        {"key": key(), "op": "delete", "session_id": 999_999},
+        {"key": key(), "op": "update", "client_id": "never-created", "data": {}},
+    ]
+
+    body = client.post("/api/sync/", json={"operations": operations}).json()
+
+    assert [r["status"] for r in body["results"]] == ["not_found", "not_found"]
+
+
+def test_offset_timestamps_count_towards_their_utc_day(client):
+    create = {
+        "key": key(),
+        "op": "create",
+        "client_id": key(),
+        "data": {
+            "planned_duration_seconds": 600,
+            "started_at": "2024-01-01T23:30:00-05:00",
+            "completed": True,
+            "actual_duration_seconds": 600,
+        },
+    }
+
+    client.post("/api/sync/", json={"operations": [create]})
+
+    def days(db):
+        return {
+            row.day.isoformat(): (row.sessions, row.minutes)
+            for row in db.exec(select(DailyRollup)).all()
+        }
+
+    with DBSession(engine) as db:
+        incremental = days(db)
+        rollup.rebuild(db)
+        rebuilt = days(db)
+        db.rollback()
+
+    assert incremental["2024-01-02"] == (1, 10)
+    assert "2024-01-01" not in incremental
+    assert incremental == rebuilt
@@ -0,0 +1,137 @@
+"""Tests for the single-writer group commit coordinator."""
+
+import asyncio
+import threading
+
+import pytest
+from sqlmodel import Session as DBSession, SQLModel, select
+
+from app.database import create_sqlite_engine
+from app.models.rollup import DailyRollup
+from app.models.session import Session, SessionCreate
+from app.services import session_store
+from app.services.writer import WriteCoordinator
+
+
+@pytest.fixture
+def coordinator(tmp_path):
+    """A coordinator with a wide batch window on a fresh database file."""
+    engine = create_sqlite_engine(f"sqlite:///{tmp_path / 'writer.db'}")
+    SQLModel.metadata.create_all(engine)
+    coordinator = WriteCoordinator(engine, batch_window_ms=50, max_batch_size=16)
+    yield coordinator
+    coordinator.stop()
+
+
+def completed(minutes: int) -> SessionCreate:
+    return SessionCreate(planned_duration_seconds=minutes * 60)
+
+
+def test_concurrent_writes_share_batches(coordinator):
+    """Writes submitted together commit in fewer transactions than writes."""
+    results = []
+    barrier = threading.Barrier(20)
+
+    def worker():
+        barrier.wait()
+        results.append(
+            coordinator.run(lambda db: session_store.create(db, completed(10)).id)
+        )
+
+    threads = [threading.Thread(target=worker) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = coordinator.stats.snapshot()
+    assert sorted(results) == list(range(1, 21))
+    assert stats["writes"] == 20
+    assert stats["batches"] < 20
+    assert stats["max_batch_size"] > 1
+    assert stats["queue_latency_ms"]["p99"] > 0
+
+
+def test_failed_write_only_rolls_back_itself(coordinator):
+    """An exception in one write leaves the rest of its batch committed."""
+
+    def finish(db: DBSession) -> int:
+        session = session_store.create(db, completed(10))
+        session_store.update(
+            db, session.id, {"completed": True, "actual_duration_seconds": 600}
+        )
+        return session.id
+
+    def broken(db: DBSession) -> None:
+        session_store.update(db, 1, {"completed": True, "actual_duration_seconds": 60})
+        raise ValueError("boom")
+
+    first = coordinator.submit(finish)
+    failing = coordinator.submit(broken)
+    second = coordinator.submit(finish)
+
+    assert first.result() == 1
+    assert second.result() == 2
+    with pytest.raises(ValueError):
+        failing.result()
+
+    with DBSession(coordinator.engine) as db:
+        rows = db.exec(select(DailyRollup)).all()
+        sessions = db.exec(select(Session).order_by(Session.id)).all()
+    assert [s.actual_duration_seconds for s in sessions] == [600, 600]
+    assert sum(row.sessions for row in rows) == 2
+    assert sum(row.minutes for row in rows) == 20
+    assert coordinator.stats.snapshot()["failed_writes"] == 1
+
+
+def test_results_stay_readable_after_a_later_op_fails(coordinator):
+    """A failed op touching an earlier op's result doesn't leave it expired."""
+    coordinator.run(lambda db: session_store.create(db, completed(10)))
+
+    def annotate(db: DBSession) -> Session:
+        session, _ = session_store.update(db, 1, {"note": "kept"})
+        return session
+
+    def broken(db: DBSession) -> None:
+        session_store.update(db, 1, {"note": "rolled back"})
+        raise ValueError("boom")
+
+    annotated = coordinator.submit(annotate)
+    failing = coordinator.submit(broken)
+
+    with pytest.raises(ValueError):
+        failing.result()
+    session = annotated.result()
+    assert (session.id, session.note) == (1, "kept")
+
+
+def test_run_async_resolves_on_the_event_loop(coordinator):
+    async def create_two():
+        return await asyncio.gather(
+            coordinator.run_async(lambda db: session_store.create(db, completed(5))),
+            coordinator.run_async(lambda db: session_store.create(db, completed(5))),
+        )
+
+    created = asyncio.run(create_two())
+
+    assert {session.id for session in created} == {1, 2}
+
+
+def test_concurrent_session_posts_all_succeed(client):
+    """A burst of creates through the API all commit without lock errors."""
+    statuses = []
+
+    def post():
+        response = client.post("/api/sessions/", json={"planned_duration_seconds": 60})
+        statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=post) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert statuses == [200] * 16
+    metrics = client.get("/api/metrics/").json()
+    assert metrics["writer"]["writes"] >= 16
+    assert set(metrics["writer"]["queue_latency_ms"]) == {"p50", "p99"}
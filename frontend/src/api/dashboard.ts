@@ -0,0 +1,27 @@
+import { API_BASE } from "./config";
+import type { GoalProgress } from "./goals";
+import type { Session } from "./sessions";
+import type { HeatmapEntry, StatsSummary, StreakInfo } from "./stats";
+
+export interface Dashboard {
+  summary: StatsSummary;
+  heatmap: HeatmapEntry[];
+  streak: StreakInfo;
+  goals: GoalProgress[];
+  recent_sessions: Session[];
+}
+
+export async function getDashboard(
+  days: number = 365,
+  recent: number = 10,
+): Promise<Dashboard> {
+  const params = new URLSearchParams({
+    days: days.toString(),
+    recent: recent.toString(),
+  });
+  const res = await fetch(`${API_BASE}/api/dashboard/?${params}`);
+  if (!res.ok) {
+    throw new Error(`Failed to get dashboard: ${res.statusText}`);
+  }
+  return res.json();
+}
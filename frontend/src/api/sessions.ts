@@ -88,6 +88,32 @@ export async function listSessions(
   return res.json();
 }
 
+export interface SessionPage {
+  sessions: Session[];
+  nextCursor: string | null;
+  totalEstimate: number;
+}
+
+export async function listSessionsPage(
+  limit: number = 50,
+  cursor?: string,
+  completedOnly: boolean = false,
+): Promise<SessionPage> {
+  const params = new URLSearchParams({ limit: limit.toString() });
+  if (cursor) params.set("cursor", cursor);
+  if (completedOnly) params.set("completed_only", "true");
+
+  const res = await fetch(`${API_BASE}/api/sessions/?${params}`);
+  if (!res.ok) {
+    throw new Error(`Failed to list sessions: ${res.statusText}`);
+  }
+  return {
+    sessions: await res.json(),
+    nextCursor: res.headers.get("X-Next-Cursor"),
+    totalEstimate: Number(res.headers.get("X-Total-Estimate") ?? 0),
+  };
+}
+
 export async function deleteSession(id: number): Promise<{ ok: boolean }> {
   const res = await fetch(`${API_BASE}/api/sessions/${id}`, {
     method: "DELETE",
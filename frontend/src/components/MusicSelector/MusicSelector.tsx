@@ -60,6 +60,17 @@ export default function MusicSelector() {
     }
   };
 
+  // Generation runs in the background; poll until the job settles
+  const waitForTrack = async (id: number) => {
+    for (;;) {
+      await new Promise((resolve) => setTimeout(resolve, 3000));
+      const res = await fetch(`${API_BASE}/api/music/status/${id}`);
+      if (!res.ok) return;
+      const { status } = await res.json();
+      if (status === "completed" || status === "failed") return;
+    }
+  };
+
   const generateMusic = async (prompt: string) => {
     setGenerating(true);
     try {
@@ -69,6 +80,11 @@ export default function MusicSelector() {
         body: JSON.stringify({ prompt, duration_seconds: 120 }),
       });
       if (res.ok) {
+        const job: Track = await res.json();
+        // Repeated prompts come back already completed
+        if (job.status === "pending" || job.status === "generating") {
+          await waitForTrack(job.id);
+        }
         await fetchLibrary();
       }
     } catch {
@@ -1,7 +1,7 @@
 import { useEffect, useState } from "react";
 import { useTranslation } from "react-i18next";
 import { Link, useNavigate } from "react-router-dom";
-import { getStatsSummary, getHeatmap } from "../api/stats";
+import { getDashboard } from "../api/dashboard";
 import type { StatsSummary, HeatmapEntry } from "../api/stats";
 import Heatmap from "../components/Stats/Heatmap";
 import { Icons } from "../components/Icons";
@@ -45,12 +45,9 @@ export default function Home() {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const [summaryData, heatmapData] = await Promise.all([
-          getStatsSummary(),
-          getHeatmap(90),
-        ]);
-        setSummary(summaryData);
-        setHeatmap(heatmapData);
+        const dashboard = await getDashboard(90, 0);
+        setSummary(dashboard.summary);
+        setHeatmap(dashboard.heatmap);
       } catch {
         // Data fetch failed silently — UI shows loading/empty state
       } finally {
@@ -1,9 +1,9 @@
 import { useEffect, useState } from "react";
 import { useTranslation } from "react-i18next";
 import { Link } from "react-router-dom";
-import { getStatsSummary, getHeatmap } from "../api/stats";
+import { getDashboard } from "../api/dashboard";
 import type { StatsSummary, HeatmapEntry } from "../api/stats";
-import { listSessions, type Session } from "../api/sessions";
+import type { Session } from "../api/sessions";
 import Heatmap from "../components/Stats/Heatmap";
 import { Icons } from "../components/Icons";
 
@@ -20,14 +20,10 @@ export default function Insights() {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const [summaryData, heatmapData, sessionsData] = await Promise.all([
-          getStatsSummary(),
-          getHeatmap(),
-          listSessions(50),
-        ]);
-        setSummary(summaryData);
-        setHeatmap(heatmapData);
-        setSessions(sessionsData);
+        const dashboard = await getDashboard(365, 50);
+        setSummary(dashboard.summary);
+        setHeatmap(dashboard.heatmap);
+        setSessions(dashboard.recent_sessions);
       } catch {
         // Fetch failed silently — UI shows loading/empty state
       } finally {